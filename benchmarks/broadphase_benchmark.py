@@ -0,0 +1,136 @@
+"""
+POLTERPHYSICS
+broadphase_benchmark.py
+
+Compares the broadphase structures on every level of levels.json.
+
+Each level is simulated once (every grabable object receives the same shot) while the bounds of
+the objects are recorded frame by frame. The recording is then replayed on every structure, so
+they all see exactly the same motion and only the broadphase work (updateall + pairs) is timed.
+
+Usage (from the Polterphysics folder):
+    python benchmarks/broadphase_benchmark.py [frames]
+
+Last Updated: May 2025
+Python Version: 3.12+
+Dependencies: os, sys, time, pygame.math, core.world, core.physics_engine, objects.broadphase, objects.Quadtree
+"""
+
+import os
+import sys
+import time
+
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.getcwd())
+
+from pygame.math import Vector2
+from core.world import load_objects, load_levels, NOT_OBJECTS # No window nor sound card is needed
+from core.physics_engine import PhysicsEngine
+from objects.broadphase import create_broadphase
+from objects.Quadtree import CircleQ
+
+FRAMES = 300
+DT = 1 / 12
+SHOT = Vector2(300, -600)
+
+BACKENDS = {
+    "quadtree": {"type": "quadtree", "capacity": 20},
+    "loose quadtree": {"type": "quadtree", "capacity": 20, "loose": True},
+    "flat quadtree": {"type": "flatquadtree", "capacity": 20},
+    "flat loose": {"type": "flatquadtree", "capacity": 20, "loose": True},
+    "grid": {"type": "grid", "cell_size": 150},
+    "sap": {"type": "sap"},
+    "aabbtree": {"type": "aabbtree", "margin": 10},
+}
+
+
+class Bounds:
+    """
+    Stand-in for an object during the replay: only what a broadphase reads.
+
+    Attributes:
+        mincircle (CircleQ): Recorded bounds.
+        active (bool): Recorded activity (awake and grabable).
+        category, mask (int): Collision filter of the object.
+    """
+    def __init__(self, obj):
+        circle = obj.mincircle
+        self.mincircle = CircleQ(circle.x, circle.y, circle.radius)
+        self.active = False
+        self.category = obj.category
+        self.mask = obj.mask
+
+
+def record(data):
+    """
+    Simulates a level and records the bounds of its objects at every frame.
+
+    Parameters:
+        data (dict): Level description from levels.json.
+
+    Returns:
+        list: One list of (x, y, active) per frame, in object order.
+        list: The Bounds stand-ins, one per object.
+    """
+    engine = PhysicsEngine()
+    for name, infos in data.items():
+        if name not in NOT_OBJECTS:
+            engine.add_object(load_objects(infos))
+    for obj in engine.objects:
+        if obj.grabable:
+            obj.shape.velocity += SHOT / obj.shape.mass
+
+    frames = []
+    broadphase = create_broadphase()
+    for _ in range(FRAMES):
+        try:
+            engine.step(DT, broadphase)
+        except Exception as error: # Keep the frames recorded so far
+            print("  simulation stopped after {} frames: {}".format(len(frames), error))
+            break
+        frames.append([(obj.mincircle.x, obj.mincircle.y, obj.active) for obj in engine.objects])
+    return frames, [Bounds(obj) for obj in engine.objects]
+
+
+def replay(config, frames, bodies):
+    """
+    Replays a recording on a new broadphase.
+
+    Returns:
+        float: Average time of a frame in milliseconds.
+        int: Total number of reported pairs.
+    """
+    broadphase = create_broadphase(config)
+    elapsed = 0
+    pairs = 0
+    for frame in frames:
+        for body, (x, y, active) in zip(bodies, frame):
+            body.mincircle.x = x
+            body.mincircle.y = y
+            body.active = active
+        start = time.perf_counter()
+        broadphase.updateall(bodies)
+        interactions = broadphase.pairs(bodies)
+        elapsed += time.perf_counter() - start
+        pairs += sum(len(group) - 1 for group in interactions)
+    return 1000 * elapsed / max(len(frames), 1), pairs
+
+
+def main():
+    print("{:>5} {:>7}  ".format("level", "objects") + "".join("{:>16}".format(name) for name in BACKENDS))
+    totals = dict.fromkeys(BACKENDS, 0)
+    for level, data in load_levels().items():
+        frames, bodies = record(data)
+        results = {name: replay(config, frames, bodies) for name, config in BACKENDS.items()}
+        if len({pairs for _, pairs in results.values()}) != 1: # Every structure should find the same pairs (see broadphase_check.py)
+            print("  pairs found on level {}: ".format(level) + ", ".join("{} {}".format(name, pairs) for name, (_, pairs) in results.items()))
+        for name, (ms, _) in results.items():
+            totals[name] += ms
+        print("{:>5} {:>7}  ".format(level, len(bodies)) + "".join("{:>13.3f} ms".format(ms) for ms, _ in results.values()))
+    print("{:>5} {:>7}  ".format("total", "") + "".join("{:>13.3f} ms".format(ms) for ms in totals.values()))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        FRAMES = int(sys.argv[1])
+    main()
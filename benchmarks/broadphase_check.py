@@ -0,0 +1,185 @@
+"""
+POLTERPHYSICS
+broadphase_check.py
+
+Checks that every broadphase structure reports the same pairs as the spatial hash grid and the
+sweep-and-prune, which both test every overlapping bounding circle.
+
+The pairs are compared frame by frame on:
+- a long static floor with a small ball rolling off its end, in trees of capacity 2
+- a synthetic scene of moving balls, large static slabs and sleeping bodies, inside the world bounds
+- the motion recorded on every level of levels.json (see broadphase_benchmark.py)
+
+Usage (from the Polterphysics folder):
+    python benchmarks/broadphase_check.py [frames]
+
+Exits with status 1 when a structure misses or adds a pair.
+
+Last Updated: May 2025
+Python Version: 3.12+
+Dependencies: os, sys, random, core.world, objects.broadphase, objects.Quadtree, broadphase_benchmark
+"""
+
+import os
+import sys
+import random
+
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.getcwd())
+
+from core.world import load_levels
+from objects.broadphase import create_broadphase
+from objects.Quadtree import CircleQ
+import broadphase_benchmark
+
+FRAMES = 60
+REFERENCES = {
+    "grid": {"type": "grid", "cell_size": 150},
+    "sap": {"type": "sap"},
+}
+CHECKED = {
+    "quadtree": {"type": "quadtree", "capacity": 2},
+    "loose quadtree": {"type": "quadtree", "capacity": 2, "loose": True},
+    "flat quadtree": {"type": "flatquadtree", "capacity": 2},
+    "flat loose": {"type": "flatquadtree", "capacity": 2, "loose": True},
+    "quadtree 20": {"type": "quadtree", "capacity": 20},
+    "flat quadtree 20": {"type": "flatquadtree", "capacity": 20},
+    "aabbtree": {"type": "aabbtree", "margin": 10},
+}
+
+
+class Body:
+    """
+    Stand-in for an object: every structure gets its own copies, since the quadtrees keep a
+    handle in the objects they store.
+
+    Attributes:
+        index (int): Position of the body in the scene.
+        mincircle (CircleQ): Bounds of the body.
+        active (bool): Whether the body is awake and grabable.
+        category, mask (int): Collision filter of the body.
+    """
+    def __init__(self, index, radius, active, category=1, mask=~0):
+        self.index = index
+        self.mincircle = CircleQ(0, 0, radius)
+        self.active = active
+        self.category = category
+        self.mask = mask
+
+
+def pairset(broadphase, bodies):
+    """
+    Synchronises a structure with the bodies and lists its pairs.
+
+    Returns:
+        set: Pairs of body indices, as frozensets.
+    """
+    broadphase.updateall(bodies)
+    return {frozenset((group[0].index, other.index)) for group in broadphase.pairs(bodies) for other in group[1:]}
+
+
+def compare(frames, template):
+    """
+    Replays a scene on every structure and counts the pairs that differ from the references.
+
+    Parameters:
+        frames (list): One list of (x, y, active) per frame, in body order.
+        template (list): Bodies of the scene (radius, category and mask).
+
+    Returns:
+        dict: (frames differing, pairs missed, pairs added) of every checked structure.
+    """
+    structures = {}
+    for name, config in dict(REFERENCES, **CHECKED).items():
+        bodies = [Body(body.index, body.mincircle.radius, body.active, body.category, body.mask) for body in template]
+        structures[name] = (create_broadphase(config), bodies)
+
+    errors = {name: [0, 0, 0] for name in structures}
+    for frame in frames:
+        found = {}
+        for name, (broadphase, bodies) in structures.items():
+            for body, (x, y, active) in zip(bodies, frame):
+                body.mincircle.x = x
+                body.mincircle.y = y
+                body.active = active
+            found[name] = pairset(broadphase, bodies)
+        reference = found["grid"]
+        for name, pairs in found.items():
+            if pairs != reference:
+                errors[name][0] += 1
+                errors[name][1] += len(reference - pairs)
+                errors[name][2] += len(pairs - reference)
+    return errors
+
+
+def floor_scene():
+    """
+    A static floor from x=-900 to x=900 with two crates on it, and a ball rolling off its end.
+    The crates make the trees subdivide, so that the ball and the floor end up in different leaves.
+    """
+    bodies = [Body(0, 900.2, False), Body(1, 10, True), Body(2, 20, False), Body(3, 20, False)]
+    frames = [[(0, 510, False), (880 + 2 * i, 495, True), (-600, 480, False), (-500, 480, False)] for i in range(FRAMES)]
+    return frames, bodies
+
+
+def synthetic_scene(count=300):
+    """
+    Balls crossing a field of static slabs (some very large) and sleeping bodies. The balls wrap
+    around inside the world bounds (see objects/broadphase.py), outside of which the trees store nothing.
+    """
+    random.seed(0)
+    bodies = []
+    positions = []
+    velocities = []
+    for i in range(count):
+        kind = random.random()
+        if kind < 0.1: # Static slab, up to a floor crossing the world
+            bodies.append(Body(i, random.choice((60, 200, 600, 900)), False))
+            velocities.append((0, 0))
+        elif kind < 0.3: # Sleeping body
+            bodies.append(Body(i, random.uniform(5, 40), False))
+            velocities.append((0, 0))
+        else:
+            bodies.append(Body(i, random.uniform(5, 40), True))
+            velocities.append((random.uniform(-20, 20), random.uniform(-20, 40)))
+        positions.append((random.uniform(-800, 2200), random.uniform(-800, 1000)))
+    frames = []
+    for _ in range(FRAMES):
+        positions = [(-900 + (x + vx + 900) % 3100, -900 + (y + vy + 900) % 1900) for (x, y), (vx, vy) in zip(positions, velocities)]
+        frames.append([(x, y, body.active) for (x, y), body in zip(positions, bodies)])
+    return frames, bodies
+
+
+def level_scene(data):
+    """
+    The motion of a level, recorded with the same shot as broadphase_benchmark.py.
+    """
+    broadphase_benchmark.FRAMES = FRAMES
+    frames, recorded = broadphase_benchmark.record(data)
+    bodies = [Body(i, bounds.mincircle.radius, False, bounds.category, bounds.mask) for i, bounds in enumerate(recorded)]
+    return frames, bodies
+
+
+def main():
+    scenes = {"floor": floor_scene(), "synthetic": synthetic_scene()}
+    for level, data in load_levels().items():
+        scenes["level {}".format(level)] = level_scene(data)
+
+    failed = False
+    print("{:>10}  ".format("scene") + "".join("{:>18}".format(name) for name in CHECKED) + "{:>10}".format("sap"))
+    for scene, (frames, bodies) in scenes.items():
+        errors = compare(frames, bodies)
+        row = []
+        for name in list(CHECKED) + ["sap"]:
+            differing, missed, added = errors[name]
+            failed = failed or differing > 0
+            row.append("ok" if differing == 0 else "-{} +{}".format(missed, added))
+        print("{:>10}  ".format(scene) + "".join("{:>18}".format(cell) for cell in row[:-1]) + "{:>10}".format(row[-1]))
+    print("pairs missed (-) or added (+) compared with the grid" if failed else "every structure reports the pairs of the grid and the sweep-and-prune")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        FRAMES = int(sys.argv[1])
+    sys.exit(main())
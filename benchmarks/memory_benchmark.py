@@ -0,0 +1,122 @@
+"""
+POLTERPHYSICS
+memory_benchmark.py
+
+Measures the memory taken by the bodies of every level of levels.json, and by a synthetic
+world of 10 000 bodies with its broadphase.
+
+The memory is traced with tracemalloc while the objects are built, so the figures include
+the shapes, their vertices, their bounding circles and every list an object owns. The levels
+are built once beforehand, so that the per-level figures leave out the memo of the minimum
+enclosing circles shared by every level.
+
+Usage (from the Polterphysics folder):
+    python benchmarks/memory_benchmark.py [bodies]
+
+Last Updated: May 2025
+Python Version: 3.12+
+Dependencies: os, sys, random, tracemalloc, pygame.math, core.world, objects.object, objects.mincircle, objects.broadphase
+"""
+
+import os
+import sys
+import random
+import tracemalloc
+
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.getcwd())
+
+from pygame.math import Vector2
+from core.world import load_objects, load_levels, NOT_OBJECTS # No window nor sound card is needed
+from objects.object import Object
+from objects.mincircle import memoized
+from objects.broadphase import create_broadphase
+
+BODIES = 10000
+
+
+def traced(build):
+    """
+    Measures the memory allocated by a function and still held by its result.
+
+    Parameters:
+        build (callable): Function building the measured structures.
+
+    Returns:
+        object: The result of the function.
+        int: Bytes held by the result.
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def level_objects(data):
+    """
+    Builds the objects of a level.
+
+    Parameters:
+        data (dict): Level description from levels.json.
+
+    Returns:
+        list: The objects of the level.
+    """
+    return [load_objects(infos) for name, infos in data.items() if name not in NOT_OBJECTS]
+
+
+def synthetic_world(count):
+    """
+    Builds a world of boxes and balls laid out on a grid inside the broadphase bounds.
+
+    Parameters:
+        count (int): Number of bodies.
+
+    Returns:
+        list: The objects of the world.
+    """
+    random.seed(0)
+    objects = []
+    columns = int(count ** 0.5) + 1
+    for i in range(count):
+        x, y = 20 * (i % columns) - 900, 20 * (i // columns) - 900
+        size = random.uniform(4, 8)
+        if i % 2:
+            objects.append(Object(polygon=False, grabable=True, mass=1, radius=size, centroid=Vector2(x, y), name="ball"))
+        else:
+            vertices = [Vector2(x - size, y - size), Vector2(x + size, y - size), Vector2(x + size, y + size), Vector2(x - size, y + size)]
+            objects.append(Object(polygon=True, grabable=True, mass=1, vertices=vertices, name="box"))
+    return objects
+
+
+def main():
+    levels = load_levels() # Read before tracing, the figures only count the objects
+    # Circles are memoized by shape: the first build of the levels also fills the memo
+    _, size = traced(lambda: [level_objects(data) for data in levels.values()])
+    print("first build of every level: {} bytes, minimum enclosing circle memo: {} point sets".format(size, memoized.cache_info().currsize))
+    print("{:>6} {:>8} {:>12} {:>10}".format("level", "bodies", "bytes", "per body"))
+    total_bodies = total_bytes = 0
+    for level, data in levels.items():
+        objects, size = traced(lambda: level_objects(data))
+        total_bodies += len(objects)
+        total_bytes += size
+        print("{:>6} {:>8} {:>12} {:>10.0f}".format(level, len(objects), size, size / max(len(objects), 1)))
+    print("{:>6} {:>8} {:>12} {:>10.0f}".format("all", total_bodies, total_bytes, total_bytes / max(total_bodies, 1)))
+
+    objects, size = traced(lambda: synthetic_world(BODIES))
+    print("\nsynthetic world: {} bodies, {} bytes, {:.0f} bytes per body".format(len(objects), size, size / len(objects)))
+
+    def fill():
+        broadphase = create_broadphase()
+        broadphase.updateall(objects)
+        return broadphase
+    broadphase, size = traced(fill)
+    print("broadphase: {} bytes, {:.0f} bytes per body".format(size, size / len(objects)))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        BODIES = int(sys.argv[1])
+    main()
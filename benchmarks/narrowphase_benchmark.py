@@ -0,0 +1,97 @@
+"""
+POLTERPHYSICS
+narrowphase_benchmark.py
+
+Compares the GJK/EPA and SAT polygon/polygon colliders on every level of levels.json.
+
+Each level is simulated with the GJK collider (every grabable object receives the same shot).
+Every polygon/polygon pair reaching the narrowphase is also tested with SAT, on exactly the same
+state and with its own pair cache, so both colliders are timed on the same scenes.
+
+Usage (from the Polterphysics folder):
+    python benchmarks/narrowphase_benchmark.py [frames]
+
+Last Updated: May 2025
+Python Version: 3.12+
+Dependencies: os, sys, time, pygame.math, core.world, core.physics_engine, core.collision, objects.broadphase
+"""
+
+import os
+import sys
+import time
+
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.getcwd())
+
+from pygame.math import Vector2
+from core.world import load_objects, load_levels, NOT_OBJECTS # No window nor sound card is needed
+from core.physics_engine import PhysicsEngine
+from core.collision import collide_gjk, collide_sat, PairCache
+from objects.broadphase import create_broadphase
+
+FRAMES = 300
+DT = 1 / 12
+SHOT = Vector2(300, -600)
+
+
+class Comparison:
+    """
+    Polygon/polygon collider running GJK for the simulation and SAT on the side, timing both.
+
+    Attributes:
+        cache (PairCache): Pair cache of SAT.
+        pairs (int): Number of pairs tested.
+        hits (int): Number of pairs found colliding by GJK.
+        disagreements (int): Pairs where the colliders disagree on the collision (beyond 0.05 of depth).
+        gjk, sat (float): Time spent in each collider, in seconds.
+    """
+    def __init__(self):
+        self.cache = PairCache()
+        self.pairs = 0
+        self.hits = 0
+        self.disagreements = 0
+        self.gjk = 0
+        self.sat = 0
+
+    def __call__(self, Object1, Object2, cache=None):
+        start = time.perf_counter()
+        manifold = collide_gjk(Object1, Object2, cache)
+        middle = time.perf_counter()
+        other = collide_sat(Object1, Object2, self.cache)
+        self.sat += time.perf_counter() - middle
+        self.gjk += middle - start
+        self.pairs += 1
+        self.hits += manifold is not None
+        if (manifold is None) != (other is None) and (manifold or other).depth > 0.05:
+            self.disagreements += 1
+        return manifold
+
+
+def main():
+    print("{:>5} {:>8} {:>6} {:>12} {:>12} {:>13}".format("level", "pairs", "hits", "gjk", "sat", "disagreements"))
+    total_gjk = total_sat = 0
+    for level, data in load_levels().items():
+        engine = PhysicsEngine()
+        comparison = Comparison()
+        engine.colliders[("polygon", "polygon")] = comparison
+        for name, infos in data.items():
+            if name not in NOT_OBJECTS:
+                engine.add_object(load_objects(infos))
+        for obj in engine.objects:
+            if obj.grabable:
+                obj.shape.velocity += SHOT / obj.shape.mass
+
+        broadphase = create_broadphase()
+        for _ in range(FRAMES):
+            engine.step(DT, broadphase)
+            comparison.cache.prune()
+        total_gjk += comparison.gjk
+        total_sat += comparison.sat
+        print("{:>5} {:>8} {:>6} {:>9.2f} ms {:>9.2f} ms {:>13}".format(level, comparison.pairs, comparison.hits, 1000 * comparison.gjk, 1000 * comparison.sat, comparison.disagreements))
+    print("{:>5} {:>8} {:>6} {:>9.2f} ms {:>9.2f} ms".format("total", "", "", 1000 * total_gjk, 1000 * total_sat))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        FRAMES = int(sys.argv[1])
+    main()
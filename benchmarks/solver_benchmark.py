@@ -0,0 +1,90 @@
+"""
+POLTERPHYSICS
+solver_benchmark.py
+
+Compares iteration settings and types of the contact solver on every level of levels.json.
+
+Each level is simulated once per setting (every grabable object receives the same shot). The
+residuals reported by the solver are averaged over the steps having contacts, so the accuracy
+bought by more iterations can be weighed against their cost, level by level.
+
+Usage (from the Polterphysics folder):
+    python benchmarks/solver_benchmark.py [frames]
+
+Last Updated: May 2025
+Python Version: 3.12+
+Dependencies: os, sys, time, pygame.math, core.world, core.physics_engine, core.solver, objects.broadphase
+"""
+
+import os
+import sys
+import time
+
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.getcwd())
+
+from pygame.math import Vector2
+from core.world import load_objects, load_levels, NOT_OBJECTS # No window nor sound card is needed
+from core.physics_engine import PhysicsEngine
+from core.solver import create_solver
+from objects.broadphase import create_broadphase
+
+FRAMES = 300
+DT = 1 / 12
+SHOT = Vector2(300, -600)
+
+SETTINGS = {
+    "1/1": {"velocity_iterations": 1, "position_iterations": 1},
+    "4/2": {"velocity_iterations": 4, "position_iterations": 2},
+    "8/3": {"velocity_iterations": 8, "position_iterations": 3},
+    "16/4": {"velocity_iterations": 16, "position_iterations": 4},
+    "batch 8/3": {"type": "batch", "velocity_iterations": 8, "position_iterations": 3},
+}
+
+
+def run(data, config):
+    """
+    Simulates a level with a solver setting.
+
+    Parameters:
+        data (dict): Level description from levels.json.
+        config (dict): Solver description.
+
+    Returns:
+        float: Average time of a step in milliseconds.
+        float: Average velocity residual of the steps having contacts.
+        float: Average remaining penetration of the steps having contacts.
+    """
+    engine = PhysicsEngine(solver=create_solver(config))
+    for name, infos in data.items():
+        if name not in NOT_OBJECTS:
+            engine.add_object(load_objects(infos))
+    for obj in engine.objects:
+        if obj.grabable:
+            obj.shape.velocity += SHOT / obj.shape.mass
+
+    broadphase = create_broadphase()
+    residual = penetration = 0
+    steps = 0
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        engine.step(DT, broadphase)
+        if engine.solver.iterations:
+            residual += engine.solver.residual
+            penetration += engine.solver.penetration
+            steps += 1
+    elapsed = time.perf_counter() - start
+    return 1000 * elapsed / FRAMES, residual / max(steps, 1), penetration / max(steps, 1)
+
+
+def main():
+    print("{:>5}  ".format("level") + "".join("{:>28}".format(name + " (ms, residual, depth)") for name in SETTINGS))
+    for level, data in load_levels().items():
+        results = [run(data, config) for config in SETTINGS.values()]
+        print("{:>5}  ".format(level) + "".join("{:>10.3f} {:>9.4f} {:>7.3f}".format(*result) for result in results))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        FRAMES = int(sys.argv[1])
+    main()
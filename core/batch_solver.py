@@ -0,0 +1,204 @@
+"""
+POLTERPHYSICS
+batch_solver.py
+
+A batched variant of the contact solver: every contact of a step is packed into NumPy arrays
+and the impulses are computed for many contacts at once instead of one Vector2 at a time.
+
+Features include:
+- Packing of the contact points and of the bodies they touch into contiguous arrays
+- Graph colouring of the contacts, so that contacts of the same colour share no moving body
+- Gauss-Seidel sweeps solving a whole colour in one vectorized operation
+- Scattering of the solved velocities back to the bodies, and of the impulses to the pair cache
+
+Last Updated: May 2025
+Python Version: 3.12+
+Dependencies: pygame.math (Vector2), numpy (optional), core.contacts, core.solver
+"""
+
+from pygame.math import Vector2
+from core.contacts import cached_features, FRICTION, BAUMGARTE, ALLOWED_PENETRATION, RESTITUTION_THRESHOLD
+from core.solver import ContactSolver
+
+try:
+    import numpy as np
+except ImportError:  # create_solver falls back to the sequential solver without NumPy
+    np = None
+
+
+def cross(a, b):
+    """Returns the 2D cross products of two (k, 2) arrays of vectors."""
+    return a[:, 0] * b[:, 1] - a[:, 1] * b[:, 0]
+
+def perpendicular(w, r):
+    """Returns the velocities w x r of points at offsets r (k, 2) of bodies spinning at w (k,)."""
+    return np.stack((-w * r[:, 1], w * r[:, 0]), axis=1)
+
+def colour_contacts(rows1, rows2, moving):
+    """
+    Colours the contacts greedily so that two contacts of the same colour never touch the same
+    moving body. Static bodies are shared freely: their huge masses leave their velocities unchanged.
+
+    Parameters:
+    rows1, rows2 (list of int): Rows of the two bodies of each contact.
+    moving (list of bool): Whether each body row is moving.
+
+    Returns:
+    list of ndarray: Indices of the contacts of each colour.
+    """
+    used = {}
+    colours = []
+    for index, (row1, row2) in enumerate(zip(rows1, rows2)):
+        taken = used.get(row1, set()) | used.get(row2, set()) if moving[row1] or moving[row2] else set()
+        colour = 0
+        while colour in taken:
+            colour += 1
+        if colour == len(colours):
+            colours.append([])
+        colours[colour].append(index)
+        for row in (row1, row2):
+            if moving[row]:
+                used.setdefault(row, set()).add(colour)
+    return [np.array(indices) for indices in colours]
+
+
+class BatchContactSolver(ContactSolver):
+    """
+    Contact solver computing the impulses of every contact of a colour in one NumPy operation.
+    The position iterations are the ones of ContactSolver.
+
+    Attributes:
+        available (bool): Whether NumPy is installed.
+        colours (int): Number of colours needed at the last step.
+
+    Methods:
+        solve(manifolds, dt, cache): Solves the contacts of a step.
+    """
+
+    available = np is not None
+
+    def __init__(self, velocity_iterations=8, position_iterations=3, tolerance=0.0):
+        super().__init__(velocity_iterations, position_iterations, tolerance)
+        self.colours = 0
+
+    def solve(self, manifolds, dt, cache=None):
+        """
+        Solves every contact of a step: packing, warm start, coloured velocity sweeps, scattering
+        of the velocities and impulses, then position iterations.
+
+        Parameters:
+        manifolds (list of Manifold): Contacts found by the narrowphase during the step.
+        dt (float): Time step.
+        cache (PairCache, optional): Pair cache holding the accumulated impulses between steps.
+
+        Returns:
+        float: The velocity residual (see `residual`).
+        """
+        if not manifolds:
+            self.residual = self.penetration = 0.0
+            self.iterations = self.colours = 0
+            return self.residual
+
+        # Bodies touched by the contacts
+        rows = {}
+        bodies = []
+        for manifold in manifolds:
+            for obj in (manifold.object1, manifold.object2):
+                if obj not in rows:
+                    rows[obj] = len(bodies)
+                    bodies.append(obj)
+        shapes = [obj.shape for obj in bodies]
+        velocities = np.array([(shape.velocity.x, shape.velocity.y) for shape in shapes], dtype=float)
+        angular = np.array([shape.angular_velocity for shape in shapes], dtype=float)
+        centroids = np.array([(shape.centroid.x, shape.centroid.y) for shape in shapes], dtype=float)
+        inv_masses = np.array([1 / shape.mass if shape.mass > 0 else 0 for shape in shapes], dtype=float)
+        inv_inertias = np.array([1 / shape.inertia if shape.inertia > 0 else 0 for shape in shapes], dtype=float)
+
+        # Contact points, one row each
+        rows1, rows2, points, normals, depths, restitutions, impulses, features = [], [], [], [], [], [], [], []
+        for manifold in manifolds:
+            row1, row2 = rows[manifold.object1], rows[manifold.object2]
+            restitution = min(manifold.object1.restitution_coefficient, manifold.object2.restitution_coefficient)
+            pair = []
+            for point, (feature, stored) in zip(manifold.points, cached_features(manifold, cache)):
+                rows1.append(row1)
+                rows2.append(row2)
+                points.append((point.x, point.y))
+                normals.append((manifold.normal.x, manifold.normal.y))
+                depths.append(manifold.depth)
+                restitutions.append(restitution)
+                impulses.append(stored)
+                pair.append(feature)
+            features.append(pair)
+        i1 = np.array(rows1)
+        i2 = np.array(rows2)
+        normal = np.array(normals, dtype=float)
+        tangent = np.stack((-normal[:, 1], normal[:, 0]), axis=1)
+        rA = np.array(points, dtype=float) - centroids[i1]
+        rB = np.array(points, dtype=float) - centroids[i2]
+        jn, jt = np.array(impulses, dtype=float).T.copy()
+        im1, im2 = inv_masses[i1], inv_masses[i2]
+        iI1, iI2 = inv_inertias[i1], inv_inertias[i2]
+
+        kn = im1 + im2 + cross(rA, normal) ** 2 * iI1 + cross(rB, normal) ** 2 * iI2
+        kt = im1 + im2 + cross(rA, tangent) ** 2 * iI1 + cross(rB, tangent) ** 2 * iI2
+        normal_mass = np.divide(1, kn, out=np.zeros_like(kn), where=kn > 0)
+        tangent_mass = np.divide(1, kt, out=np.zeros_like(kt), where=kt > 0)
+
+        def relative_velocity(index):
+            return (velocities[i2[index]] + perpendicular(angular[i2[index]], rB[index])
+                    - velocities[i1[index]] - perpendicular(angular[i1[index]], rA[index]))
+
+        def apply(index, impulse):
+            np.add.at(velocities, i1[index], -impulse * im1[index, None])
+            np.add.at(velocities, i2[index], impulse * im2[index, None])
+            np.add.at(angular, i1[index], -cross(rA[index], impulse) * iI1[index])
+            np.add.at(angular, i2[index], cross(rB[index], impulse) * iI2[index])
+
+        # Bounce on fast approaches, and push out the penetration beyond the allowed one
+        everything = np.arange(len(i1))
+        approach = np.einsum("ij,ij->i", relative_velocity(everything), normal)
+        bias = np.where(approach < -RESTITUTION_THRESHOLD, -np.array(restitutions) * approach, 0)
+        bias += BAUMGARTE / dt * np.maximum(0, np.array(depths) - ALLOWED_PENETRATION)
+
+        # Warm start with the impulses of the last step
+        apply(everything, jn[:, None] * normal + jt[:, None] * tangent)
+
+        colours = colour_contacts(rows1, rows2, [obj.grabable and not obj.sleeping for obj in bodies])
+        self.colours = len(colours)
+        self.residual = 0.0
+        self.iterations = 0
+        for _ in range(self.velocity_iterations):
+            self.iterations += 1
+            self.residual = 0.0
+            for index in colours:
+                # Normal impulses first, so that friction is bounded by the impulses of this iteration
+                vn = np.einsum("ij,ij->i", relative_velocity(index), normal[index])
+                accumulated = np.maximum(0, jn[index] + (bias[index] - vn) * normal_mass[index])
+                delta = accumulated - jn[index]
+                jn[index] = accumulated
+                apply(index, delta[:, None] * normal[index])
+                self.residual = max(self.residual, float(np.abs(delta).max()))
+
+                vt = np.einsum("ij,ij->i", relative_velocity(index), tangent[index])
+                limit = FRICTION * jn[index]
+                accumulated = np.clip(jt[index] - vt * tangent_mass[index], -limit, limit)
+                delta = accumulated - jt[index]
+                jt[index] = accumulated
+                apply(index, delta[:, None] * tangent[index])
+            if self.residual <= self.tolerance:
+                break
+
+        # Scatter the velocities back to the bodies and the impulses to the pair cache
+        for shape, (vx, vy), w in zip(shapes, velocities.tolist(), angular.tolist()):
+            shape.velocity = Vector2(vx, vy)
+            shape.angular_velocity = w
+        if cache is not None:
+            start = 0
+            for manifold, pair in zip(manifolds, features):
+                cache.get(manifold.object1, manifold.object2).impulses = {
+                    feature: (n, t) for feature, n, t in zip(pair, jn[start:start + len(pair)].tolist(), jt[start:start + len(pair)].tolist())}
+                start += len(pair)
+
+        self.solve_positions(manifolds)
+        return self.residual
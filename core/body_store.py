@@ -0,0 +1,251 @@
+"""
+POLTERPHYSICS
+body_store.py
+
+An optional array-backed store keeping the state of every body in contiguous NumPy arrays,
+so that the physics engine can integrate the whole scene in a few vectorized operations.
+
+Features include:
+- Structure-of-arrays storage of positions, velocities, angular velocities, masses and the grabable mask
+- Packing of the polygon vertices of every body in a single array
+- Vectorized gravity, translation and rotation of every body in one update
+- Binding of the shapes to the arrays so `Object.shape` stays readable and writable
+
+Last Updated: May 2025
+Python Version: 3.12+
+Dependencies: math, pygame.math (Vector2), numpy (optional)
+"""
+
+from math import cos, sin, pi
+from pygame.math import Vector2
+
+try:
+    import numpy as np
+except ImportError:  # The engine falls back to its per-object loop without NumPy
+    np = None
+
+
+class BodyStore:
+    """
+    Structure-of-arrays storage for the rigid bodies of a scene.
+
+    Bodies are packed lazily: adding or removing a body hands the state back to the shapes,
+    and the arrays are rebuilt at the next update. While packed, every shape is bound to its
+    row (see `Shape` in objects/object.py) and reads its state from the arrays: the shapes then
+    hand out copies, and only whole-value assignments are written back.
+
+    Attributes:
+        objects (list): Objects managed by the store, in row order.
+        packed (bool): Whether the arrays currently hold the state of the objects.
+        generation (int): Counter bumped every time the arrays move the vertices.
+        positions (ndarray): (n, 2) centroids.
+        velocities (ndarray): (n, 2) linear velocities.
+        angular_velocities (ndarray): (n,) angular velocities.
+        masses (ndarray): (n,) masses.
+        dynamic (ndarray): (n,) 1.0 for awake grabable bodies, 0.0 for static or sleeping ones.
+        vertices (ndarray): (m, 2) vertices of every polygon, stored one polygon after the other.
+        owners (ndarray): (m,) row of the body owning each vertex.
+        offsets (ndarray): (n + 1,) start of the vertices of each body in `vertices`.
+        angles (ndarray): (n,) rotation of every body from its local frame (`Polygon.angle` while bound).
+        mc_centers (ndarray): (n, 2) center of every minimum enclosing circle in the local frame of its body.
+
+    Methods:
+        add(obj): Adds an object to the store.
+        remove(obj): Removes an object from the store.
+        clear(): Removes every object.
+        pack(): Copies the state of the objects into the arrays and binds their shapes.
+        unpack(): Copies the state back into the shapes and unbinds them.
+        polygon_vertices(index): Returns the vertices of a body as a list of Vector2.
+        translate(index, vector): Translates a single body.
+        rotate(index, rad): Rotates a single body around its centroid.
+        set_dynamic(index, dynamic): Includes or excludes a body from the integration.
+        step(dt, gravity): Integrates every body over dt.
+    """
+
+    available = np is not None
+
+    def __init__(self):
+        self.objects = []
+        self.packed = False
+        self.generation = 0
+
+    def add(self, obj):
+        """
+        Adds an object to the store. The arrays are rebuilt at the next update.
+
+        Parameters:
+        obj (Object): The object to add.
+        """
+        self.unpack()
+        self.objects.append(obj)
+
+    def remove(self, obj):
+        """
+        Removes an object from the store. Does nothing if the object is not stored.
+
+        Parameters:
+        obj (Object): The object to remove.
+        """
+        if obj in self.objects:
+            self.unpack()
+            self.objects.remove(obj)
+
+    def clear(self):
+        """Removes every object from the store."""
+        self.unpack()
+        self.objects = []
+
+    def pack(self):
+        """
+        Copies the state of every object into freshly allocated arrays and binds their shapes.
+        """
+        n = len(self.objects)
+        self.positions = np.zeros((n, 2))
+        self.velocities = np.zeros((n, 2))
+        self.angular_velocities = np.zeros(n)
+        self.masses = np.zeros(n)
+        self.dynamic = np.zeros(n)
+        self.angles = np.zeros(n)
+        self.mc_centers = np.zeros((n, 2))
+        self.offsets = np.zeros(n + 1, dtype=np.intp)
+
+        points = []
+        owners = []
+        for i, obj in enumerate(self.objects):
+            shape = obj.shape
+            self.positions[i] = (shape.centroid.x, shape.centroid.y)
+            self.velocities[i] = (shape.velocity.x, shape.velocity.y)
+            self.angular_velocities[i] = shape.angular_velocity
+            self.masses[i] = shape.mass
+            self.dynamic[i] = 1.0 if obj.active else 0.0
+            self.mc_centers[i] = shape.bounding_circle[:2]
+            if obj.polygon:
+                self.angles[i] = shape.angle
+                points.extend((v.x, v.y) for v in shape.vertices)
+                owners.extend([i] * shape.length)
+            self.offsets[i + 1] = len(points)
+
+        self.vertices = np.array(points, dtype=float).reshape(-1, 2)
+        self.owners = np.array(owners, dtype=np.intp)
+
+        for i, obj in enumerate(self.objects):
+            obj.shape.store = self
+            obj.shape.index = i
+        self.packed = True
+        self.generation += 1
+
+    def unpack(self):
+        """
+        Copies the state held in the arrays back into the shapes and unbinds them. The polygons
+        keep their local frame and only get their accumulated angle back.
+        """
+        if not self.packed:
+            return
+        for i, obj in enumerate(self.objects):
+            shape = obj.shape
+            centroid = shape.centroid
+            velocity = shape.velocity
+            angular_velocity = shape.angular_velocity
+            shape.store = None
+            shape.index = -1
+            shape.centroid = centroid
+            shape.velocity = velocity
+            shape.angular_velocity = angular_velocity
+            if obj.polygon:
+                shape.angle = float(self.angles[i]) # The world vertices follow from the local ones
+        self.packed = False
+
+    def polygon_vertices(self, index):
+        """
+        Returns the vertices of a body as a list of Vector2.
+
+        Parameters:
+        index (int): Row of the body.
+
+        Returns:
+        list of Vector2: World-space vertices of the body.
+        """
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return [Vector2(x, y) for x, y in self.vertices[start:end].tolist()]
+
+    def translate(self, index, vector):
+        """
+        Translates a single body, e.g. for the positional correction of a collision.
+
+        Parameters:
+        index (int): Row of the body.
+        vector (Vector2): The translation vector.
+        """
+        start, end = self.offsets[index], self.offsets[index + 1]
+        self.positions[index] += (vector[0], vector[1])
+        self.vertices[start:end] += (vector[0], vector[1])
+
+    def rotate(self, index, rad):
+        """
+        Rotates a single body around its centroid.
+
+        Parameters:
+        index (int): Row of the body.
+        rad (float): The angle to rotate in radians.
+        """
+        start, end = self.offsets[index], self.offsets[index + 1]
+        self.angles[index] = (self.angles[index] + rad) % (2 * pi)
+        c, s = cos(rad), sin(rad)
+        rel = self.vertices[start:end] - self.positions[index]
+        self.vertices[start:end, 0] = self.positions[index, 0] + rel[:, 0] * c - rel[:, 1] * s
+        self.vertices[start:end, 1] = self.positions[index, 1] + rel[:, 0] * s + rel[:, 1] * c
+
+    def set_dynamic(self, index, dynamic):
+        """
+        Includes or excludes a body from the integration, e.g. when it falls asleep.
+
+        Parameters:
+        index (int): Row of the body.
+        dynamic (bool): Whether the body is integrated.
+        """
+        self.dynamic[index] = 1.0 if dynamic else 0.0
+
+    def step(self, dt, gravity=(0, 9.8)):
+        """
+        Integrates every body over dt: gravity, translation, rotation and minimum enclosing circle.
+        Static bodies are masked out exactly like in `PhysicsEngine.update_polygon`.
+
+        Parameters:
+        dt (float): Time step.
+        gravity (tuple): Gravity acceleration applied to grabable bodies.
+        """
+        if not self.packed:
+            self.pack()
+        if len(self.objects) == 0:
+            return
+
+        step = dt * self.dynamic
+        self.velocities += np.outer(step, gravity)
+        moves = self.velocities * step[:, None]
+        self.positions += moves
+        angles = self.angular_velocities * step
+
+        if len(self.vertices):
+            # Translate every vertex with its body, then rotate it around the new centroid
+            owners = self.owners
+            centers = self.positions[owners]
+            rel = self.vertices + moves[owners] - centers
+            c = np.cos(angles)[owners]
+            s = np.sin(angles)[owners]
+            self.vertices[:, 0] = centers[:, 0] + rel[:, 0] * c - rel[:, 1] * s
+            self.vertices[:, 1] = centers[:, 1] + rel[:, 0] * s + rel[:, 1] * c
+
+        # Same as Object.updatemc, for every body at once: the local circle centers turned by the
+        # accumulated angles, advanced by the same masked angles as the vertices
+        self.angles = (self.angles + angles) % (2 * pi)
+        c = np.cos(self.angles)
+        s = np.sin(self.angles)
+        local_x = self.mc_centers[:, 0]
+        local_y = self.mc_centers[:, 1]
+        mc_x = self.positions[:, 0] + local_x * c - local_y * s
+        mc_y = self.positions[:, 1] + local_x * s + local_y * c
+        for obj, x, y in zip(self.objects, mc_x.tolist(), mc_y.tolist()):
+            obj.mincircle.x = x
+            obj.mincircle.y = y
+
+        self.generation += 1
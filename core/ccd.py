@@ -0,0 +1,224 @@
+"""
+POLTERPHYSICS
+ccd.py
+
+Continuous collision detection for fast objects: instead of jumping a whole step ahead and
+maybe through a thin wall, an object flagged with `ccd` stops at its first impact with the
+static geometry and bounces off it.
+
+Features include:
+- Selection of the fast objects (moving further than a fraction of their bounds in one step)
+- Swept bounding circles querying the broadphase for the static objects met during the step
+- Time of impact by conservative advancement (distance between the shapes / bound of the approach speed)
+- Clamping of the motion to the time of impact and bounce of the velocity on the impacted object
+
+Last Updated: May 2025
+Python Version: 3.12+
+Dependencies: math, pygame.math (Vector2), objects.Quadtree, objects.broadphase, core.contacts
+"""
+
+from math import cos, sin, sqrt
+from pygame.math import Vector2
+from objects.Quadtree import CircleQ
+from objects.broadphase import can_collide
+from core.contacts import RESTITUTION_THRESHOLD
+
+CCD_MOTION = 0.5 # Objects moving less than this fraction of their bounding radius in a step are left to the narrowphase
+TOI_TOLERANCE = 0.5 # Distance at which an object is considered to hit another one
+TOI_ITERATIONS = 20 # Maximum number of conservative advancement steps
+
+
+class Sweep:
+    """
+    Stand-in for an object in broadphase queries, bounding its whole motion during a step.
+
+    Attributes:
+        mincircle (CircleQ): Circle enclosing the bounding circle of the object at the start and at the end of the step.
+    """
+    def __init__(self, obj, motion):
+        circle = obj.mincircle
+        self.mincircle = CircleQ(circle.x + motion.x / 2, circle.y + motion.y / 2, circle.radius + motion.length() / 2)
+
+
+def posed(shape, offset, angle):
+    """
+    Describes a shape moved by an offset and turned by an angle around its centroid, without moving it.
+
+    Parameters:
+    shape (Shape): Polygon or Circle.
+    offset (Vector2): Translation.
+    angle (float): Rotation in radians.
+
+    Returns:
+    tuple: ("polygon", vertices) or ("circle", center, radius).
+    """
+    center = shape.centroid + offset
+    if shape.kind == "circle":
+        return ("circle", center, shape.radius)
+    c, s = cos(angle), sin(angle)
+    cx, cy = shape.centroid
+    vertices = []
+    for x, y in shape.vertices:
+        x, y = x - cx, y - cy
+        vertices.append(Vector2(center.x + x * c - y * s, center.y + x * s + y * c))
+    return ("polygon", vertices)
+
+def closest_on_segment(point, a, b):
+    """
+    Returns the point of segment [a, b] closest to a point.
+    """
+    ab = b - a
+    length = ab.length_squared()
+    if length == 0:
+        return Vector2(a)
+    t = max(0.0, min(1.0, (point - a).dot(ab) / length))
+    return a + ab * t
+
+def contains(vertices, point):
+    """
+    Tells whether a point lies inside a convex polygon (whatever its winding).
+    """
+    sign = 0
+    for i in range(len(vertices)):
+        turn = (vertices[(i + 1) % len(vertices)] - vertices[i]).cross(point - vertices[i])
+        if turn != 0:
+            if sign == 0:
+                sign = 1 if turn > 0 else -1
+            elif (turn > 0) != (sign > 0):
+                return False
+    return True
+
+def distance(moving, static):
+    """
+    Distance between two posed shapes (see posed), with the direction to push the first one away.
+
+    Returns:
+    tuple: (distance, unit normal from the static shape towards the moving one), or (0, None) if they overlap.
+    """
+    if moving[0] == "circle" and static[0] == "circle":
+        gap = moving[1] - static[1]
+        length = gap.length()
+        if length <= moving[2] + static[2] or length == 0:
+            return 0, None
+        return length - moving[2] - static[2], gap / length
+
+    if moving[0] == "circle" or static[0] == "circle":
+        circle, polygon = (moving, static[1]) if moving[0] == "circle" else (static, moving[1])
+        center, radius = circle[1], circle[2]
+        if contains(polygon, center):
+            return 0, None
+        closest = min((closest_on_segment(center, polygon[i], polygon[(i + 1) % len(polygon)]) for i in range(len(polygon))),
+                      key=lambda point: point.distance_squared_to(center))
+        gap = center - closest
+        length = gap.length()
+        if length <= radius:
+            return 0, None
+        normal = gap / length # From the polygon towards the circle
+        return length - radius, normal if moving[0] == "circle" else -normal
+
+    # Separated convex polygons: the closest points are a vertex of one and a point of an edge of the other
+    best, normal = float("inf"), None
+    for vertices, others, sign in ((moving[1], static[1], 1), (static[1], moving[1], -1)):
+        for vertex in vertices:
+            for i in range(len(others)):
+                closest = closest_on_segment(vertex, others[i], others[(i + 1) % len(others)])
+                gap = vertex - closest
+                length = gap.length_squared()
+                if length < best:
+                    best, normal = length, gap * sign
+    best = sqrt(best)
+    if best == 0 or contains(static[1], moving[1][0]) or contains(moving[1], static[1][0]):
+        return 0, None
+    # Edges crossing without a vertex inside the other polygon
+    for i in range(len(moving[1])):
+        a, b = moving[1][i], moving[1][(i + 1) % len(moving[1])]
+        for j in range(len(static[1])):
+            c, d = static[1][j], static[1][(j + 1) % len(static[1])]
+            if (b - a).cross(c - a) * (b - a).cross(d - a) < 0 and (d - c).cross(a - c) * (d - c).cross(b - c) < 0:
+                return 0, None
+    return best, normal / best
+
+def time_of_impact(obj, other, motion, rotation):
+    """
+    Finds when a moving object first touches a static one during a step, by conservative
+    advancement: the object is moved ahead by the distance between the shapes divided by the
+    fastest it can approach, which never skips the impact.
+
+    Parameters:
+    obj (Object): The moving object.
+    other (Object): The static object.
+    motion (Vector2): Translation of the object over the whole step.
+    rotation (float): Rotation of the object over the whole step.
+
+    Returns:
+    tuple or None: (fraction of the step, unit normal from the static object towards the moving one),
+        None if they do not meet during the step or already touch at its start.
+    """
+    shape = obj.shape
+    static = posed(other.shape, Vector2(0, 0), 0)
+    # Largest distance covered by a point of the object during the step
+    reach = max((vertex.distance_to(shape.centroid) for vertex in shape.vertices), default=0) if shape.kind == "polygon" else 0
+    bound = motion.length() + abs(rotation) * reach
+    if bound == 0:
+        return None
+    t = 0.0
+    for _ in range(TOI_ITERATIONS):
+        gap, normal = distance(posed(shape, motion * t, rotation * t), static)
+        if gap <= TOI_TOLERANCE:
+            # Contacts present at the start of the step are left to the narrowphase
+            return (t, normal) if t > 0 and normal is not None else None
+        t += (gap - TOI_TOLERANCE / 2) / bound
+        if t >= 1:
+            return None
+    return None
+
+def advance_fast_objects(objects, broadphase, dt, gravity):
+    """
+    Clamps the motion of the fast `ccd` objects to their first impact with the static objects.
+    Must run right before the integration: the velocity of an object that hits something is set
+    so that the integration stops it at the impact, and the returned velocity (bounced off the
+    impacted object) has to be restored after the integration.
+
+    Parameters:
+    objects (list): Objects of the scene.
+    broadphase (Broadphase): Broadphase holding the objects.
+    dt (float): Time step.
+    gravity (Vector2): Acceleration added to the grabable objects by the integration.
+
+    Returns:
+    list: (object, velocity, angular velocity) to restore after the integration.
+    """
+    impacts = []
+    for obj in objects:
+        if not (obj.ccd and obj.active):
+            continue
+        shape = obj.shape
+        velocity = shape.velocity + gravity * dt # Velocity the integration is going to use
+        motion = velocity * dt
+        if motion.length() <= CCD_MOTION * obj.mincircle.radius:
+            continue
+        rotation = shape.angular_velocity * dt
+
+        first = None
+        met = []
+        broadphase.query(Sweep(obj, motion), met)
+        for other in met:
+            if other is obj or other.grabable or not can_collide(obj, other):
+                continue
+            impact = time_of_impact(obj, other, motion, rotation)
+            if impact is not None and (first is None or impact[0] < first[0]):
+                first = impact + (other,)
+        if first is None:
+            continue
+
+        t, normal, other = first
+        # The integration adds gravity * dt to the velocity before moving the object by velocity * dt
+        shape.velocity = velocity * t - gravity * dt
+        angular_velocity = shape.angular_velocity
+        shape.angular_velocity = angular_velocity * t
+        approach = velocity.dot(normal)
+        if approach < 0:
+            restitution = min(obj.restitution_coefficient, other.restitution_coefficient) if approach < -RESTITUTION_THRESHOLD else 0
+            velocity = velocity - (1 + restitution) * approach * normal
+        impacts.append((obj, velocity, angular_velocity))
+    return impacts
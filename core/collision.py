@@ -2,16 +2,17 @@
 POLTERPHYSICS
 collision.py
 
-A script that provides functions for detecting and resolving collisions 
-between objects using physics-based calculations.
+A script that provides functions for detecting collisions between objects and describing
+their contacts. The contacts are resolved by the contact solver (core/solver.py).
 
 Features include:  
 - Compute Minkowski Difference support points  
 - Run the GJK algorithm to detect collision  
 - Run EPA to compute penetration vector  
 - Identify contact feature (vertex-edge, edge-edge, etc.)  
-- Resolve collisions using impulses with restitution and friction  
-- Apply positional correction to prevent overlap  
+- Single-pass narrowphase returning a contact manifold (normal, depth, contact points, feature ids)  
+- Dispatch table of colliders by shape type, with closed-form circle/circle and circle/polygon tests  
+- Separating axis test (SAT) for polygon/polygon with the last separating axis of each pair cached  
 
 Last Updated: May 2025
 Python Version: 3.12+
@@ -21,6 +22,9 @@ Dependencies: pygame.math (Vector2), math
 from pygame.math import Vector2
 from math import *
 
+CONTACT_SKIN = 0.001 # Added to every penetration depth to avoid numerical issues
+FLAT_CONTACT = 0.02 # Largest sine of the angle between an edge and the contact plane for the edge to lie flat on it
+
 def find_furthest(D, vertices):
     """
     Returns the vertex in 'vertices' that is furthest along direction D.
@@ -43,21 +47,111 @@ def find_furthest(D, vertices):
             
     return max_point
 
-def find_furthests(D,vertices):
+def find_furthest_index(D, vertices):
     """
-    Returns indices of vertices that are furthest along direction D.
+    Returns the index of the vertex in 'vertices' that is furthest along direction D.
 
     Parameters:
     D (Vector2): Search direction.
     vertices (list of Vector2): Polygon vertices.
 
     Returns:
-    list of int: Indices of furthest vertices.
+    int: Index of the furthest vertex.
+    """
+    max_index = 0
+    max_dot = vertices[0].dot(D)
+
+    for i in range(1, len(vertices)):
+        dot_product = vertices[i].dot(D)
+        if dot_product > max_dot:
+            max_dot = dot_product
+            max_index = i
+
+    return max_index
+
+def climb_furthest(D, vertices, start):
     """
-    temp = [round(vert.dot(D),1) for vert in vertices]
-    maximum = max(temp)
-    max_indices = [i for i, num in enumerate(temp) if num == maximum]
-    return max_indices
+    Returns the index of the vertex of a convex polygon that is furthest along direction D,
+    climbing from vertex to adjacent vertex from a starting guess. Along a convex polygon the
+    projections only rise once then fall once, so the first local maximum is the furthest vertex.
+
+    Parameters:
+    D (Vector2): Search direction.
+    vertices (list of Vector2): Vertices of a convex polygon, in order.
+    start (int): Index of the vertex to start from (e.g. the answer to a previous, similar query).
+
+    Returns:
+    int: Index of the furthest vertex.
+    """
+    n = len(vertices)
+    index = start
+    best = vertices[index].dot(D)
+    after = vertices[(index + 1) % n].dot(D)
+    before = vertices[index - 1].dot(D)
+    if after > best:
+        step, index, best = 1, (index + 1) % n, after
+    elif before > best:
+        step, index, best = -1, (index - 1) % n, before
+    elif after == best and before == best: # Middle of a flat edge, maybe the nearest one
+        return max(range(n), key=lambda i: vertices[i].dot(D))
+    else:
+        return index
+    while True:
+        following = (index + step) % n
+        projection = vertices[following].dot(D)
+        if projection <= best:
+            return index
+        index, best = following, projection
+
+def is_convex(vertices):
+    """
+    Tells whether a polygon is convex (its turns all go the same way).
+
+    Parameters:
+    vertices (list of Vector2): Polygon vertices, in order.
+
+    Returns:
+    bool: True if the polygon is convex.
+    """
+    n = len(vertices)
+    turns = set()
+    for i in range(n):
+        turn = (vertices[(i + 1) % n] - vertices[i]).cross(vertices[(i + 2) % n] - vertices[(i + 1) % n])
+        if turn > 1e-9:
+            turns.add(1)
+        elif turn < -1e-9:
+            turns.add(-1)
+    return len(turns) <= 1
+
+def contact_feature(vertices, index, normal):
+    """
+    Returns the feature of a convex polygon touching a contact plane, from its deepest vertex:
+    the vertex alone, or the edge it shares with a neighbour when that edge lies flat on the plane.
+    Only the two neighbours of the vertex are looked at.
+
+    Parameters:
+    vertices (list of Vector2): Polygon vertices, in order.
+    index (int): Index of the vertex furthest along the normal.
+    normal (Vector2): Unit normal of the contact plane.
+
+    Returns:
+    list of int: The index of the vertex, or the indices of both ends of the edge in increasing order.
+    """
+    length = len(vertices)
+    vertex = vertices[index]
+    neighbour = None
+    flattest = FLAT_CONTACT
+    for other in ((index - 1) % length, (index + 1) % length):
+        edge = vertices[other] - vertex
+        size = edge.length()
+        if size == 0:
+            continue
+        flatness = abs(edge.dot(normal)) / size
+        if flatness <= flattest:
+            neighbour, flattest = other, flatness
+    if neighbour is None:
+        return [index]
+    return sorted((index, neighbour))
 
 def Support(D,A,B):
     """
@@ -76,10 +170,106 @@ def Support(D,A,B):
     opmax = a - b
     return opmax
        
+class Manifold:
+    """
+    Contact between two colliding objects, produced once by the narrowphase and consumed by the contact solver.
+
+    Attributes:
+        object1, object2 (Object): The colliding objects.
+        normal (Vector2): Unit collision normal, pointing from the first shape to the second.
+        depth (float): Penetration depth along the normal.
+        points (list of Vector2): One or two contact points (two for edge-edge contacts).
+        features (list of tuple): For each point, the ids of the features of both shapes in contact,
+                                  ("vertex", index), ("edge", index of its first vertex) or ("circle", 0).
+        typecol (str): Contact type ("vertex-edge", "edge-vertex", "edge-edge", "vertex-vertex", "circle").
+
+    Methods:
+        penetration: Penetration vector (normal * depth).
+        point: Average of the contact points.
+        flipped(): Returns the same contact seen from the second object.
+    """
+    def __init__(self, object1, object2, normal, depth, points, features, typecol):
+        self.object1 = object1
+        self.object2 = object2
+        self.normal = normal
+        self.depth = depth
+        self.points = points
+        self.features = features
+        self.typecol = typecol
+
+    @property
+    def penetration(self):
+        return self.normal * self.depth
+
+    @property
+    def point(self):
+        if len(self.points) == 1:
+            return self.points[0]
+        return (self.points[0] + self.points[1]) / 2
+
+    def flipped(self):
+        """
+        Returns:
+        Manifold: The same contact with the objects swapped (opposite normal, swapped feature ids).
+        """
+        features = [(feature[1], feature[0]) + feature[2:] for feature in self.features]
+        return Manifold(self.object2, self.object1, -self.normal, self.depth, self.points, features, self.typecol)
+
+class PairState:
+    """
+    Narrowphase data kept for a pair of objects from one step to the next.
+
+    Attributes:
+        step (int): Last step the pair was tested.
+        axis (tuple or None): Last separating (or reference) axis found by SAT: (owner Object, edge index).
+        impulses (dict): Feature id -> (normal impulse, tangent impulse) accumulated at the last step (see core/contacts.py).
+        direction (Vector2 or None): Last search direction of GJK, for the pair in the order of the cache key.
+    """
+    def __init__(self):
+        self.step = 0
+        self.axis = None
+        self.impulses = {}
+        self.direction = None
+
+class PairCache:
+    """
+    Per-pair narrowphase data, keyed by the pair of objects whatever their order.
+
+    Attributes:
+        pairs (dict): (Object, Object) -> PairState.
+        step (int): Current step.
+
+    Methods:
+        key(Object1, Object2): Returns the key of a pair (the same for both orders).
+        get(Object1, Object2): Returns the state of a pair, creating it if needed.
+        prune(): Starts a new step and forgets the pairs that were not tested during the last one.
+        clear(): Forgets every pair.
+    """
+    def __init__(self):
+        self.pairs = {}
+        self.step = 0
+
+    def key(self, Object1, Object2):
+        return (Object1, Object2) if id(Object1) < id(Object2) else (Object2, Object1)
+
+    def get(self, Object1, Object2):
+        key = self.key(Object1, Object2)
+        state = self.pairs.get(key)
+        if state is None:
+            state = self.pairs[key] = PairState()
+        state.step = self.step
+        return state
+
+    def prune(self):
+        self.pairs = {key: state for key, state in self.pairs.items() if state.step == self.step}
+        self.step += 1
+
+    def clear(self):
+        self.pairs = {}
+
 class GJK2D:
     """
-    A class that implements the GJK and EPA algorithms for 2D convex collision detection
-    and resolution.
+    A class that implements the GJK and EPA algorithms for 2D convex collision detection.
 
     Attributes:
         shape1 (Shape): First shape involved in collision.
@@ -89,8 +279,11 @@ class GJK2D:
         typecol (tuple): Contact type info (vertex/edge).
         colpoint (Vector2): Collision contact point.
         vertices (list of Vector2): Simplex from GJK.
+        direction (Vector2): Last search direction of GJK (separating direction when the shapes do not collide).
     """
     def __init__(self, Object1, Object2):
+        self.object1 = Object1
+        self.object2 = Object2
         self.vertices = []
         self.res1 = Object1.restitution_coefficient
         self.res2 = Object2.restitution_coefficient
@@ -98,44 +291,77 @@ class GJK2D:
         self.shape2 = Object2.shape
         self.typecol = None
         self.colpoint = 0
+        self.direction = None
       
     def find_contact_features(self,polyA, polyB, mtd):
         """
-        Identifies contact point and type between two shapes using support features.
+        Identifies the contact points and type between two shapes using support features: the
+        deepest vertex of each polygon along the normal (see Polygon.support_index) and, if one of
+        its edges lies flat on the contact plane, that edge.
 
         Parameters:
         polyA (Shape): First shape.
         polyB (Shape): Second shape.
         mtd (Vector2): Minimum translation direction.
+
+        Returns:
+        Manifold: The contact (also kept in self.typecol and self.colpoint).
         """
+        normal = mtd.normalize()
+        depth = mtd.length()
         # Checks if its a circle or not, applies different collision points
-        if hasattr(polyA,'radius'):
-            self.colpoint = polyA.support(mtd)
-        elif hasattr(polyB,'radius'):
-            self.colpoint = polyB.support(-mtd)
+        if polyA.kind == "circle":
+            manifold = Manifold(self.object1, self.object2, normal, depth, [polyA.support(mtd)], [(("circle", 0), None)], "circle")
+        elif polyB.kind == "circle":
+            manifold = Manifold(self.object1, self.object2, normal, depth, [polyB.support(-mtd)], [(None, ("circle", 0))], "circle")
         else:
-            
-            polyA = self.shape1.vertices
-            polyB = self.shape2.vertices
-            supportA = find_furthests(mtd, polyA)
-            supportB = find_furthests(-mtd, polyB)
+            verticesA = polyA.vertices
+            verticesB = polyB.vertices
+            supportA = contact_feature(verticesA, polyA.support_index(mtd), normal)
+            supportB = contact_feature(verticesB, polyB.support_index(-mtd), normal)
             # Computes the support functions for both shapes for the detection of collision type
+            edgeA = ("edge", self.edgeindex(supportA, len(verticesA))) if len(supportA) == 2 else None
+            edgeB = ("edge", self.edgeindex(supportB, len(verticesB))) if len(supportB) == 2 else None
 
             # Classify contact type
             if len(supportA) == 1 and len(supportB) == 2:
                 self.typecol = (supportA[0], supportB, "vertex-edge")
-                self.colpoint = self.vertextoedge(self.shape2.vertices[supportB[0]],self.shape2.vertices[supportB[1]],self.shape1.vertices[supportA[0]])
+                point = self.vertextoedge(verticesB[supportB[0]],verticesB[supportB[1]],verticesA[supportA[0]])
+                manifold = Manifold(self.object1, self.object2, normal, depth, [point], [(("vertex", supportA[0]), edgeB)], "vertex-edge")
 
             elif len(supportA) == 2 and len(supportB) == 1:
                 self.typecol = (supportA, supportB[0], "edge-vertex")
-                self.colpoint = self.vertextoedge(self.shape1.vertices[supportA[0]],self.shape1.vertices[supportA[1]],self.shape2.vertices[supportB[0]])
+                point = self.vertextoedge(verticesA[supportA[0]],verticesA[supportA[1]],verticesB[supportB[0]])
+                manifold = Manifold(self.object1, self.object2, normal, depth, [point], [(edgeA, ("vertex", supportB[0]))], "edge-vertex")
 
             elif len(supportA) == 2 and len(supportB) == 2:
                 self.typecol = (supportA, supportB, "edge-edge")
-                self.colpoint = self.edgetoedge(self.shape1.vertices[supportA[0]],self.shape1.vertices[supportA[1]],self.shape2.vertices[supportB[0]],self.shape2.vertices[supportB[1]])
+                points = self.edgetoedge(verticesA[supportA[0]],verticesA[supportA[1]],verticesB[supportB[0]],verticesB[supportB[1]], both=True)
+                # Each end of the overlap is identified by the edges and its end (0 = start, 1 = end)
+                manifold = Manifold(self.object1, self.object2, normal, depth, list(points), [(edgeA, edgeB, 0), (edgeA, edgeB, 1)], "edge-edge")
 
-            else : 
+            else :
+                # Vertex against vertex: the contact is taken halfway between the deepest vertices of both shapes
                 self.typecol = (None, None, "unknown")
+                point = (verticesA[supportA[0]] + verticesB[supportB[0]]) / 2
+                manifold = Manifold(self.object1, self.object2, normal, depth, [point], [(("vertex", supportA[0]), ("vertex", supportB[0]))], "vertex-vertex")
+        self.colpoint = manifold.point
+        return manifold
+
+    def edgeindex(self, indices, length):
+        """
+        Returns the id of the edge joining two adjacent vertices (index of its first vertex).
+
+        Parameters:
+        indices (list of int): Indices of the two vertices, in increasing order.
+        length (int): Number of vertices of the polygon.
+
+        Returns:
+        int: Index of the first vertex of the edge.
+        """
+        if indices[0] == 0 and indices[1] == length - 1:
+            return length - 1 # Closing edge from the last vertex to the first one
+        return indices[0]
 
     def vertextoedge(self,SegmentA,SegmentB,vertex):
         """
@@ -155,16 +381,17 @@ class GJK2D:
         contact = SegmentA + (t * AB)
         return contact
     
-    def edgetoedge(self,A1,A2,B1,B2):
+    def edgetoedge(self,A1,A2,B1,B2,both=False):
         """
         Returns midpoint of overlap between two edge segments projected onto a common axis.
 
         Parameters:
         A1, A2 (Vector2): Edge of first shape.
         B1, B2 (Vector2): Edge of second shape.
+        both (bool, optional): Return both ends of the overlap instead of its midpoint.
 
         Returns:
-        Vector2: Midpoint of projection overlap.
+        Vector2: Midpoint of projection overlap (or tuple of its two ends).
         """
         d = A2 - A1
         D = d.normalize()
@@ -178,6 +405,8 @@ class GJK2D:
         end_t = min(t_A2,t_B2)
         start_point = A1 + (start_t - A1.dot(D)) * D
         end_point = A1 + (end_t - A1.dot(D)) * D
+        if both:
+            return start_point, end_point
         return (end_point + start_point)/2
    
     def calcsupport(self,direction):
@@ -206,18 +435,23 @@ class GJK2D:
         z = a.x * b.y - a.y * b.x
         return Vector2(-c.y * z, c.x * z)
 
-    def detection(self):
+    def detection(self, direction=None):
         """
         Performs GJK collision detection.
 
+        Parameters:
+        direction (Vector2, optional): Direction searched first, e.g. the last search direction of
+            the pair: a separating direction found at the previous step is tested right away.
+
         Returns:
         list of Vector2 or None: Simplex if collision detected; else None.
         """
-        # Starts in a pseudo-random direction to start searching for the simplex
-        direction = self.shape1.centroid
+        # Starts from the given direction, else in a pseudo-random direction to start searching for the simplex
+        direction = -direction if direction else self.shape1.centroid
         a = self.calcsupport(direction)
         direction = -direction
         b = self.calcsupport(direction)
+        self.direction = direction
         # If the dot product is not positive, the origin is outside the Minkowski difference
         if b.dot(direction) <= 0: return None
         # Compute AB and the perpendicular direction toward the origin using triple product
@@ -227,6 +461,7 @@ class GJK2D:
         for i in range(20):
             # Add a new support point in the current search direction
             c = self.calcsupport(direction)
+            self.direction = direction
             if c.dot(direction) <=0 : return None
             # Shift simplex to origin for next iteration logic
             c0 = -c
@@ -276,10 +511,14 @@ class GJK2D:
         Returns:
         Vector2: Penetration vector.
         """
-         # Only proceed if a collision was confirmed by GJK
-        if self.detection() is not None:
+         # Only proceed if a collision was confirmed by GJK (the simplex is not run again)
+        if polyptote is not None:
             minIndex = 0
             minDistance = float("inf")
+            # Outward normals follow the winding of the simplex, so that they stay right when the
+            # origin lies on its boundary (shapes exactly touching)
+            a, b, c = polyptote
+            winding = (b - a).cross(c - a)
             # Continue expanding the polytope until the new support point is very close to an existing edge
             while (minDistance == float("inf")):
                 for i in range(len(polyptote)):
@@ -290,8 +529,8 @@ class GJK2D:
                     normal = Vector2(ij.y,-ij.x).normalize()
                     distance = normal.dot(vertexI)
 
-                    # If the normal is pointing toward the origin, flip it
-                    if (distance < 0):
+                    # If the normal is pointing inward, flip it
+                    if (winding < 0 if winding else distance < 0):
                         distance *= -1
                         normal = -normal
 
@@ -311,81 +550,302 @@ class GJK2D:
                     polyptote.insert(minIndex,support)
 
             # Return the final penetration vector, slightly extended to avoid numerical issues
-            return minNormal * (minDistance + 0.001)
+            return minNormal * (minDistance + CONTACT_SKIN)
         return Vector2(0,0)
        
-    def resolve(self,penetrationvector,dt):
+    def collide(self, direction=None):
         """
-        Resolves collision between two shapes by applying impulses,positional correction and friction.
+        Runs the narrowphase once: GJK, then EPA and the contact features only if GJK found a collision.
 
         Parameters:
-        penetrationvector (Vector2): Minimum translation vector.
-        dt (float): Time step.
+        direction (Vector2, optional): Direction GJK searches first (see detection).
+
+        Returns:
+        Manifold or None: The contact, None if the shapes do not collide.
         """
-        contact_point = self.colpoint
-        restitution = min(self.res1,self.res2)
-        # Coulomb's law: μ = friction coefficient (can be per-object or global)
-        mu = 0.4
-        normal = penetrationvector.normalize()
-        # Compute rA and rB, the contact point relative to the centers of mass
-        rA = contact_point - self.shape1.centroid
-        rB = contact_point - self.shape2.centroid
-        vA = self.shape1.velocity + Vector2(-self.shape1.angular_velocity * rA.y, self.shape1.angular_velocity * rA.x)
-        vB = self.shape2.velocity + Vector2(-self.shape2.angular_velocity * rB.y, self.shape2.angular_velocity * rB.x)
-        relative_velocity = vB - vA
-
-        # Check if bodies are separating
-        vel_along_normal = relative_velocity.dot(normal)
-        if vel_along_normal > -0.01:
-            return  # Objects are already separating
-
-        # Compute impulse scalar
-        inv_mass1 = 1 / self.shape1.mass if self.shape1.mass > 0 else 0
-        inv_mass2 = 1 / self.shape2.mass if self.shape2.mass > 0 else 0
-        inv_I1 = 1 / self.shape1.inertia if self.shape1.inertia > 0 else 0
-        inv_I2 = 1 / self.shape2.inertia if self.shape2.inertia > 0 else 0
-
-        # Calculate the rotational effects (torque response) at the contact point
-        rA_cross_N = rA.cross(normal)
-        rB_cross_N = rB.cross(normal)
-        denominator = inv_mass1 + inv_mass2 + (rA_cross_N ** 2) * inv_I1 + (rB_cross_N ** 2) * inv_I2
-        # Impulse scalar (normal impulse magnitude)
-        j = -(1 + restitution) * vel_along_normal / denominator
-        # Apply Baumgarte stabilization: bias impulse to reduce sinking
-        bias = max(0,penetrationvector.magnitude() - 0.05) * (0.2 / dt)
-        j += bias
-
-        # Apply impulse to linear velocity
-        impulse = j * normal
-        self.shape1.velocity -= impulse * inv_mass1
-        self.shape2.velocity += impulse * inv_mass2
-
-        self.shape1.angular_velocity -= rA.cross(impulse) * inv_I1
-        self.shape2.angular_velocity += rB.cross(impulse) * inv_I2
-       
-       # Compute friction impulse
-        if relative_velocity.length() > 0:
-            tangent = relative_velocity - (relative_velocity.dot(normal)) * normal
-            if tangent.length() > 0:
-                tangent = tangent.normalize()
-                # Compute tangential impulse magnitude
-                jt = -relative_velocity.dot(tangent)  # Friction force along the tangent direction
-                jt = max(min(jt, j * mu), -j * mu)  # Clamp to Coulomb friction
-                friction_impulse = jt * tangent
-
-                # Apply friction impulse
-                self.shape1.velocity -= friction_impulse * inv_mass1
-                self.shape2.velocity += friction_impulse * inv_mass2
-                self.shape1.angular_velocity -= rA.cross(friction_impulse) * inv_I1
-                self.shape2.angular_velocity += rB.cross(friction_impulse) * inv_I2
-        #Another position correction to also prevent sinking
-        percent = 0.6 # Penetration percentage to correct (60%)
-        slop = 0.03 # Allow small overlap tolerance
-        correction_mag = max(penetrationvector.length() - slop, 0) / (inv_mass1 + inv_mass2)
-        correction = correction_mag * percent * normal
-        self.shape1.add(-(correction * inv_mass1))
-        self.shape2.add(correction * inv_mass2)
-
-        return
+        simplex = self.detection(direction)
+        if simplex is None:
+            return None
+        return self.find_contact_features(self.shape1, self.shape2, self.EPA(simplex))
+
+def collide_circles(Object1, Object2, cache=None):
+    """
+    Closed-form collision test between two circles.
+
+    Parameters:
+    Object1, Object2 (Object): Objects whose shapes are circles.
+    cache (PairCache, optional): Unused, colliders share the same signature.
+
+    Returns:
+    Manifold or None: The contact, None if the circles do not overlap.
+    """
+    circle1, circle2 = Object1.shape, Object2.shape
+    delta = circle2.centroid - circle1.centroid
+    distance = delta.length()
+    if distance >= circle1.radius + circle2.radius:
+        return None
+    normal = delta / distance if distance > 0 else Vector2(0,1) # Concentric circles: push along the vertical
+    depth = circle1.radius + circle2.radius - distance + CONTACT_SKIN
+    point = circle1.centroid + circle1.radius * normal
+    return Manifold(Object1, Object2, normal, depth, [point], [(("circle", 0), ("circle", 0))], "circle")
+
+def collide_circle_polygon(Object1, Object2, cache=None):
+    """
+    Closed-form collision test between a circle and a convex polygon, using the edge of the polygon
+    the center is the furthest in front of and the closest point of that edge to the center.
+
+    Parameters:
+    Object1 (Object): Object whose shape is a circle.
+    Object2 (Object): Object whose shape is a polygon.
+    cache (PairCache, optional): Unused, colliders share the same signature.
+
+    Returns:
+    Manifold or None: The contact, None if the shapes do not overlap.
+    """
+    circle, polygon = Object1.shape, Object2.shape
+    center, radius = circle.centroid, circle.radius
+    vertices = polygon.vertices
+    length = len(vertices)
+    winding = polygon_winding(vertices) # Orients the edge normals outwards, as for polygon/polygon pairs
+
+    # Edge of maximum separation
+    separation = -float("inf")
+    best = 0
+    bestnormal = None
+    for i in range(length):
+        a, b = vertices[i], vertices[(i+1)%length]
+        edge = b - a
+        if edge.length_squared() == 0:
+            continue
+        normal = Vector2(edge.y, -edge.x).normalize() * winding
+        distance = normal.dot(center - a)
+        if distance > radius:
+            return None # Separating axis found
+        if distance > separation:
+            separation, best, bestnormal = distance, i, normal
+
+    if separation <= 0:
+        # Center inside the polygon: push the circle out through the closest edge
+        normal = -bestnormal
+        depth = radius - separation + CONTACT_SKIN
+        feature = ("edge", best)
+    else:
+        # Closest point of the edge to the center (one of its vertices or a point inside it)
+        a, b = vertices[best], vertices[(best+1)%length]
+        edge = b - a
+        t = max(0, min(1, (center - a).dot(edge) / edge.dot(edge)))
+        delta = a + t * edge - center
+        distance = delta.length()
+        if distance >= radius:
+            return None
+        normal = delta / distance
+        depth = radius - distance + CONTACT_SKIN
+        feature = ("vertex", best) if t == 0 else ("vertex", (best+1)%length) if t == 1 else ("edge", best)
+
+    point = center + radius * normal
+    return Manifold(Object1, Object2, normal, depth, [point], [(("circle", 0), feature)], "circle")
+
+def collide_polygon_circle(Object1, Object2, cache=None):
+    """
+    Collision test between a convex polygon and a circle (see collide_circle_polygon).
+    The cache is unused, colliders share the same signature.
+
+    Returns:
+    Manifold or None: The contact, None if the shapes do not overlap.
+    """
+    manifold = collide_circle_polygon(Object2, Object1)
+    return manifold.flipped() if manifold is not None else None
+
+def collide_gjk(Object1, Object2, cache=None):
+    """
+    General collision test between two convex shapes with GJK and EPA.
+    With a cache, GJK starts from the last search direction of the pair: pairs that stay apart
+    are rejected by the first support points, and colliding pairs start close to their simplex.
+
+    Returns:
+    Manifold or None: The contact, None if the shapes do not overlap.
+    """
+    if cache is None:
+        return GJK2D(Object1, Object2).collide()
+    state = cache.get(Object1, Object2)
+    # The Minkowski difference (and so the direction) changes sign with the order of the pair
+    sign = 1 if cache.key(Object1, Object2)[0] is Object1 else -1
+    gjk = GJK2D(Object1, Object2)
+    manifold = gjk.collide(state.direction * sign if state.direction else None)
+    state.direction = gjk.direction * sign if gjk.direction else None
+    return manifold
+
+def polygon_winding(vertices):
+    """
+    Returns:
+    int: 1 if the vertices turn with a positive signed area, -1 otherwise.
+    """
+    length = len(vertices)
+    return 1 if sum(vertices[i].cross(vertices[(i+1)%length]) for i in range(length)) > 0 else -1
 
+def face_normal(vertices, index, winding):
+    """
+    Returns the unit outward normal of an edge of a convex polygon.
+
+    Parameters:
+    vertices (list of Vector2): Polygon vertices; edge i goes from vertex i to vertex i+1.
+    index (int): Index of the edge.
+    winding (int): Winding of the polygon (see polygon_winding).
+
+    Returns:
+    Vector2: The normal (zero vector for a degenerate edge).
+    """
+    a, b = vertices[index], vertices[(index+1)%len(vertices)]
+    ex, ey = b[0] - a[0], b[1] - a[1]
+    length = sqrt(ex * ex + ey * ey)
+    if length == 0:
+        return Vector2(0,0)
+    return Vector2(ey * winding / length, -ex * winding / length)
 
+def face_separation(vertices, index, winding, others):
+    """
+    Signed distance between a face of a polygon and the deepest vertex of another polygon.
+
+    Returns:
+    float: Positive if the face is a separating axis.
+    """
+    nx, ny = face_normal(vertices, index, winding)
+    origin = nx * vertices[index][0] + ny * vertices[index][1]
+    return min(nx * x + ny * y for x, y in others) - origin
+
+def max_separation(vertices, winding, others):
+    """
+    Finds the face of a polygon along which another polygon is the most separated.
+    Stops at the first separating face.
+
+    Returns:
+    tuple: (separation, index of the face).
+    """
+    best, bestindex = -float("inf"), 0
+    for i in range(len(vertices)):
+        separation = face_separation(vertices, i, winding, others)
+        if separation > best:
+            best, bestindex = separation, i
+            if separation > 0:
+                break
+    return best, bestindex
+
+def collide_sat(Object1, Object2, cache=None):
+    """
+    Separating axis test between two convex polygons.
+
+    The faces of both polygons are tried as separating axes. The axis found is kept in the pair
+    cache and tried first at the next step: pairs that stay apart are rejected with a single face.
+    On a hit, the face of least penetration is the reference face; the incident edge of the other
+    polygon is clipped against it, which gives one or two contact points.
+
+    Parameters:
+    Object1, Object2 (Object): Objects whose shapes are polygons.
+    cache (PairCache, optional): Per-pair data kept between steps.
+
+    Returns:
+    Manifold or None: The contact, None if the polygons do not overlap.
+    """
+    state = cache.get(Object1, Object2) if cache is not None else None
+    verticesA, verticesB = Object1.shape.vertices, Object2.shape.vertices
+    windingA, windingB = polygon_winding(verticesA), polygon_winding(verticesB)
+
+    # Last separating axis first
+    if state is not None and state.axis is not None:
+        owner, index = state.axis
+        if owner is Object1 and index < len(verticesA):
+            if face_separation(verticesA, index, windingA, verticesB) > 0:
+                return None
+        elif owner is Object2 and index < len(verticesB):
+            if face_separation(verticesB, index, windingB, verticesA) > 0:
+                return None
+
+    separationA, faceA = max_separation(verticesA, windingA, verticesB)
+    if separationA > 0:
+        if state is not None:
+            state.axis = (Object1, faceA)
+        return None
+    separationB, faceB = max_separation(verticesB, windingB, verticesA)
+    if separationB > 0:
+        if state is not None:
+            state.axis = (Object2, faceB)
+        return None
+
+    # Reference face: least penetration, with a small bias towards the first polygon for stability
+    if separationB > separationA + 0.001:
+        reference, refwinding, refface, incident, incwinding, flip = verticesB, windingB, faceB, verticesA, windingA, True
+    else:
+        reference, refwinding, refface, incident, incwinding, flip = verticesA, windingA, faceA, verticesB, windingB, False
+    if state is not None:
+        state.axis = (Object2 if flip else Object1, refface)
+
+    # Incident edge: the edge of the other polygon facing the reference face the most
+    normal = face_normal(reference, refface, refwinding)
+    incface = min(range(len(incident)), key=lambda i: face_normal(incident, i, incwinding).dot(normal))
+    points = [(incident[incface], ("vertex", incface)), (incident[(incface+1)%len(incident)], ("vertex", (incface+1)%len(incident)))]
+
+    # Clip the incident edge against the side planes of the reference face
+    v1, v2 = reference[refface], reference[(refface+1)%len(reference)]
+    tangent = (v2 - v1).normalize()
+    for side, offset in ((-tangent, -tangent.dot(v1)), (tangent, tangent.dot(v2))):
+        clipped = []
+        distances = [side.dot(p) - offset for p, _ in points]
+        for (p, feature), distance in zip(points, distances):
+            if distance <= 0:
+                clipped.append((p, feature))
+        if distances[0] * distances[1] < 0:
+            t = distances[0] / (distances[0] - distances[1])
+            clipped.append((points[0][0] + t * (points[1][0] - points[0][0]), ("edge", incface)))
+        points = clipped
+        if len(points) < 2:
+            break
+
+    # Keep the points below the reference face, moved onto it
+    contacts = []
+    depth = 0
+    for p, feature in points:
+        separation = normal.dot(p - v1)
+        if separation <= 0:
+            contacts.append((p - separation * normal, feature))
+            depth = max(depth, -separation)
+    if not contacts: # Numerical corner case: fall back on the deepest incident vertex
+        p = min(incident, key=lambda vertex: normal.dot(vertex - v1))
+        contacts = [(p - normal.dot(p - v1) * normal, ("vertex", incident.index(p)))]
+        depth = max(0, -normal.dot(p - v1))
+
+    points = [p for p, _ in contacts]
+    if flip:
+        features = [(feature, ("edge", refface), k) for k, (_, feature) in enumerate(contacts)]
+        typecol = "edge-edge" if len(points) == 2 else "vertex-edge"
+        return Manifold(Object1, Object2, -normal, depth + CONTACT_SKIN, points, features, typecol)
+    features = [(("edge", refface), feature, k) for k, (_, feature) in enumerate(contacts)]
+    typecol = "edge-edge" if len(points) == 2 else "edge-vertex"
+    return Manifold(Object1, Object2, normal, depth + CONTACT_SKIN, points, features, typecol)
+
+# Collider used for each pair of shape types (Shape.kind)
+COLLIDERS = {
+    ("circle", "circle"): collide_circles,
+    ("circle", "polygon"): collide_circle_polygon,
+    ("polygon", "circle"): collide_polygon_circle,
+    ("polygon", "polygon"): collide_gjk,
+}
+
+# Colliders that can be selected for polygon/polygon pairs
+POLYGON_COLLIDERS = {
+    "gjk": collide_gjk,
+    "sat": collide_sat,
+}
+
+def collide(Object1, Object2, cache=None, colliders=COLLIDERS):
+    """
+    Narrowphase entry point: runs the collider matching the shape types of both objects.
+
+    Parameters:
+    Object1, Object2 (Object): The objects to test.
+    cache (PairCache, optional): Per-pair data kept between steps.
+    colliders (dict, optional): Dispatch table to use instead of COLLIDERS.
+
+    Returns:
+    Manifold or None: The contact, with a normal pointing from Object1 to Object2, None if they do not collide.
+    """
+    return colliders[(Object1.shape.kind, Object2.shape.kind)](Object1, Object2, cache)
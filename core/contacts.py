@@ -0,0 +1,173 @@
+"""
+POLTERPHYSICS
+contacts.py
+
+Contact points built from the narrowphase manifolds, keeping the impulses accumulated on them
+from one physics step to the next.
+
+Features include:
+- Contact points with their effective masses, restitution and stabilisation velocity bias
+- Accumulated normal and friction impulses, clamped (pushing only, inside the Coulomb cone)
+- Storage of the accumulated impulses in the pair cache, keyed by the feature ids of the contact
+- Warm start of the next step with the stored impulses
+
+Last Updated: May 2025
+Python Version: 3.12+
+Dependencies: pygame.math (Vector2)
+"""
+
+from pygame.math import Vector2
+
+FRICTION = 0.4 # Coulomb friction coefficient
+BAUMGARTE = 0.2 # Fraction of the penetration removed per step through the velocities
+ALLOWED_PENETRATION = 0.05 # Penetration left to the positional correction
+RESTITUTION_THRESHOLD = 1.0 # Slower approaches do not bounce (more than one step of gravity, so resting objects stay put)
+
+class ContactPoint:
+    """
+    One point of a contact between two objects, solved with accumulated impulses.
+
+    Attributes:
+        object1, object2 (Object): The objects in contact.
+        point (Vector2): The contact point.
+        feature (tuple): Feature id of the point, in the order of the pair cache key.
+        normal (Vector2): Unit normal from object1 to object2.
+        tangent (Vector2): Unit tangent (normal turned by a quarter).
+        depth (float): Penetration depth of the contact.
+        rA, rB (Vector2): Contact point relative to the centroids.
+        normal_mass, tangent_mass (float): Effective masses along the normal and the tangent.
+        bias (float): Target separating velocity (restitution and penetration recovery).
+        normal_impulse, tangent_impulse (float): Impulses accumulated on the point.
+
+    Methods:
+        relative_velocity(): Velocity of object2 relative to object1 at the contact point.
+        apply(impulse): Applies an impulse to object2 and its opposite to object1.
+        warm_start(): Applies the impulses accumulated at the previous step.
+        solve(): Runs one sequential impulse iteration on the point.
+    """
+    def __init__(self, manifold, index, feature, dt, impulses=(0.0, 0.0)):
+        self.object1 = manifold.object1
+        self.object2 = manifold.object2
+        shape1, shape2 = self.object1.shape, self.object2.shape
+        self.point = manifold.points[index]
+        self.feature = feature
+        self.normal = manifold.normal
+        self.tangent = Vector2(-self.normal.y, self.normal.x)
+        self.depth = manifold.depth
+        self.rA = self.point - shape1.centroid
+        self.rB = self.point - shape2.centroid
+
+        self.inv_mass1 = 1 / shape1.mass if shape1.mass > 0 else 0
+        self.inv_mass2 = 1 / shape2.mass if shape2.mass > 0 else 0
+        self.inv_I1 = 1 / shape1.inertia if shape1.inertia > 0 else 0
+        self.inv_I2 = 1 / shape2.inertia if shape2.inertia > 0 else 0
+        k = self.inv_mass1 + self.inv_mass2
+        kn = k + self.rA.cross(self.normal) ** 2 * self.inv_I1 + self.rB.cross(self.normal) ** 2 * self.inv_I2
+        kt = k + self.rA.cross(self.tangent) ** 2 * self.inv_I1 + self.rB.cross(self.tangent) ** 2 * self.inv_I2
+        self.normal_mass = 1 / kn if kn > 0 else 0
+        self.tangent_mass = 1 / kt if kt > 0 else 0
+
+        # Bounce on fast approaches, and push out the penetration beyond the allowed one
+        restitution = min(self.object1.restitution_coefficient, self.object2.restitution_coefficient)
+        approach = self.relative_velocity().dot(self.normal)
+        self.bias = -restitution * approach if approach < -RESTITUTION_THRESHOLD else 0
+        self.bias += BAUMGARTE / dt * max(0, self.depth - ALLOWED_PENETRATION)
+
+        self.normal_impulse, self.tangent_impulse = impulses
+
+    def relative_velocity(self):
+        shape1, shape2 = self.object1.shape, self.object2.shape
+        vA = shape1.velocity + Vector2(-shape1.angular_velocity * self.rA.y, shape1.angular_velocity * self.rA.x)
+        vB = shape2.velocity + Vector2(-shape2.angular_velocity * self.rB.y, shape2.angular_velocity * self.rB.x)
+        return vB - vA
+
+    def apply(self, impulse):
+        shape1, shape2 = self.object1.shape, self.object2.shape
+        shape1.velocity -= impulse * self.inv_mass1
+        shape2.velocity += impulse * self.inv_mass2
+        shape1.angular_velocity -= self.rA.cross(impulse) * self.inv_I1
+        shape2.angular_velocity += self.rB.cross(impulse) * self.inv_I2
+
+    def warm_start(self):
+        if self.normal_impulse or self.tangent_impulse:
+            self.apply(self.normal * self.normal_impulse + self.tangent * self.tangent_impulse)
+
+    def solve(self):
+        """
+        Runs one sequential impulse iteration: the accumulated normal impulse is kept positive and
+        the accumulated friction impulse inside the Coulomb cone, only their change is applied.
+
+        Returns:
+        float: Magnitude of the change of the normal impulse (0 once the point has converged).
+        """
+        # Normal impulse first, so that friction is bounded by the impulse of this step
+        velocity = self.relative_velocity()
+        delta = (self.bias - velocity.dot(self.normal)) * self.normal_mass
+        accumulated = max(0.0, self.normal_impulse + delta)
+        delta, self.normal_impulse = accumulated - self.normal_impulse, accumulated
+        if delta:
+            self.apply(self.normal * delta)
+        change = abs(delta)
+
+        velocity = self.relative_velocity()
+        delta = -velocity.dot(self.tangent) * self.tangent_mass
+        limit = FRICTION * self.normal_impulse
+        accumulated = max(-limit, min(limit, self.tangent_impulse + delta))
+        delta, self.tangent_impulse = accumulated - self.tangent_impulse, accumulated
+        if delta:
+            self.apply(self.tangent * delta)
+        return change
+
+
+def cached_features(manifold, cache=None):
+    """
+    Returns the feature ids of the points of a manifold in the order of the pair cache key,
+    with the impulses stored for them at the previous step.
+
+    Parameters:
+    manifold (Manifold): Contact returned by the narrowphase.
+    cache (PairCache, optional): Pair cache holding the accumulated impulses.
+
+    Returns:
+    list of tuple: (feature id, (normal impulse, tangent impulse)) for each manifold point.
+    """
+    if cache is None:
+        return [(feature, (0.0, 0.0)) for feature in manifold.features]
+    stored = cache.get(manifold.object1, manifold.object2).impulses
+    flip = cache.key(manifold.object1, manifold.object2)[0] is not manifold.object1
+    features = []
+    for feature in manifold.features:
+        if flip: # Features are stored in the order of the cache key, whatever the order of the pair
+            feature = (feature[1], feature[0]) + feature[2:]
+        features.append((feature, stored.get(feature, (0.0, 0.0))))
+    return features
+
+def make_contacts(manifold, dt, cache=None):
+    """
+    Builds the contact points of a manifold, warm-started with the impulses stored in the pair cache
+    for the same features at the previous step.
+
+    Parameters:
+    manifold (Manifold): Contact returned by the narrowphase.
+    dt (float): Time step.
+    cache (PairCache, optional): Pair cache holding the accumulated impulses.
+
+    Returns:
+    list of ContactPoint: One contact point per manifold point.
+    """
+    return [ContactPoint(manifold, index, feature, dt, impulses)
+            for index, (feature, impulses) in enumerate(cached_features(manifold, cache))]
+
+def store_impulses(contacts, cache):
+    """
+    Stores the accumulated impulses of the contact points of a pair for the next step.
+    Features that are no longer in contact are forgotten.
+
+    Parameters:
+    contacts (list of ContactPoint): Contact points of a single pair.
+    cache (PairCache): Pair cache.
+    """
+    if not contacts:
+        return
+    state = cache.get(contacts[0].object1, contacts[0].object2)
+    state.impulses = {contact.feature: (contact.normal_impulse, contact.tangent_impulse) for contact in contacts}
@@ -10,17 +10,16 @@ Features include:
 
 Last Updated: May 2025
 Python Version: 3.12+
-Dependencies: pygame, pygame.math, utils.vector_utils, core.collision, objects.Quadtree, objects.object
+Dependencies: pygame, pygame.math, utils.vector_utils, core.collision, objects.broadphase, objects.object
 """
 
 import pygame 
 from pygame.math import Vector2
 from utils.vector_utils import * 
 from core.collision import *
-from objects.Quadtree import RectangleQ, Quadtree
+from objects.broadphase import create_broadphase
 from objects.object import *
 
-pygame.init()
 
 def GetMouseInput(event) :
     """
@@ -36,7 +35,7 @@ def vector_application(
     event,
     objects_list,
     clicked_object = Object,
-    quadtree = Quadtree(RectangleQ(-100,-100,3400,2200),4),
+    broadphase = None,
     
 ) :
     """
@@ -46,10 +45,10 @@ def vector_application(
         event (bool) : 1/0 is left click/no left click from the user
         object_list (list of references) : physics_engine.objects : list of all the objects instanced in physics_engine
         clicked_object : reference of the object that the user is applying the vector to
-        quadtree (Quadtree) : need precisions 
+        broadphase (Broadphase) : persistent broadphase of the level holding the objects, used to find the objects under the mouse
         
     Dependencies : 
-        Quadtree functions
+        Broadphase functions
         compute_angle
         update_vector
         update_mouse
@@ -59,11 +58,12 @@ def vector_application(
     mouse_position = Vector2(pygame.mouse.get_pos())
     
     if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and clicked_object == None: # left click + when no object is clicked 
-        for elements in objects_list:
-            quadtree.insert(elements) 
+        if broadphase is None:
+            broadphase = create_broadphase()
+        broadphase.updateall(objects_list) # The broadphase is shared with the physics step, only moved objects are relocated
         potential = []
         mini = float("inf")
-        quadtree.query(Object(False,False,1,1,[],1,mouse_position, "mouse", False), potential) #creates a circle of radius 1 to detect intersection with objects around the area
+        broadphase.query(Object(False,False,1,1,[],1,mouse_position, "mouse", False), potential) #creates a circle of radius 1 to detect intersection with objects around the area
         for elements in potential :
             if elements.playable == True :
                 if elements.polygon == False : # If the object is a circle
@@ -71,12 +71,11 @@ def vector_application(
                         mini = elements.shape.centroid.distance_squared_to(mouse_position)  # obtain the distance between mouse and nearest centroid
                         clicked_object = elements  #obtain the object that is the closest to the mouse
                 elif elements.polygon == True : # If object is a polygon
-                    for i in range(len(elements.shape.vertices)) :
-                        if elements.shape.vertices[i].distance_squared_to(mouse_position) < mini and elements.shape.centroid.distance_squared_to(mouse_position) < 5000:
-                            mini = elements.shape.vertices[i].distance_squared_to(mouse_position)  # obtain the distance between mouse and nearest centroid
-                            clicked_object = elements
-        for elements in objects_list :
-            quadtree.delpoint(elements)
+                    if elements.shape.centroid.distance_squared_to(mouse_position) < 5000 :
+                        for vertex in elements.shape.vertices : # World vertices cached by the shape, transformed once
+                            if vertex.distance_squared_to(mouse_position) < mini :
+                                mini = vertex.distance_squared_to(mouse_position)  # obtain the distance between mouse and nearest centroid
+                                clicked_object = elements
         return clicked_object
     
     elif event.type == pygame.MOUSEMOTION and pygame.mouse.get_pressed()[0] and clicked_object != None: # left click + object clicked
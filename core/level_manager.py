@@ -6,24 +6,26 @@ A script that handles the different scenes and transitions between them.
 Features include:
 - Button class
 - Handling button behaviour
-- Loading the objects corresponding to each scene
+- Loading the scenes: buttons, music, texts, and the background and sprites of each level
+- Loading the physics of each level (objects, broadphase, solver) through core.world
 
 Last Updated: May 2025
 Python Version: 3.12+
-Dependencies: pygame, json, sys, objects.bonus, objects.object, data, utils.sprites_utils, utils.vector_utils, core.sound, core.sprite_manager, objects.key
+Dependencies: pygame, json, sys, objects.object, data, utils.sprites_utils, utils.vector_utils, core.sound, core.sprite_manager, objects.broadphase, core.solver, core.world
 """
 
 import pygame
 import json
 import sys
-from objects.bonus import Bonus
 from objects.object import *
 from data import *
 from utils import sprites_utils
 from utils.vector_utils import *
 from core.sound import play_music
-from objects.key import Key
 from core.sprite_manager import SpriteManager
+from objects.broadphase import create_broadphase
+from core.solver import create_solver
+from core.world import load_levels, load_level
 
 
 # === Load Buttons and Levels from JSON Files ===
@@ -34,8 +36,7 @@ with open("data/buttons.json", "r") as file:
     game_over_buttons = buttons["game_over"]
     win_buttons = buttons["win"]
 
-with open("data/levels.json", "r") as f:
-    levels = json.load(f)
+levels = load_levels()
 
 # === Global Variables ===
 button_list = []
@@ -45,6 +46,7 @@ max_scene = 13
 playing_music = ""
 tries = 0
 realisticTrajectory = False
+broadphase = create_broadphase() # Replaced by the one described in levels.json ("broadphase" key) when a level is loaded
 
 
 class Button:
@@ -212,50 +214,6 @@ def load_button(button, screen_width, screen_height):
     return new_button
 
 
-def load_objects(object_infos):
-    """
-    Convert JSON data into an Object instance.
-
-    Parameters:
-    object_infos (dict): Dictionary from JSON file.
-
-    Returns:
-    Object: The constructed physics object.
-    """
-    new = Object(
-        polygon=object_infos["polygon"],
-        grabable=object_infos["grabable"],
-        mass=object_infos["mass"],
-        restitution_coefficient=object_infos["restitution_coefficient"],
-        radius=object_infos["radius"],
-        mouse=object_infos["mouse"],
-        applied_coords=object_infos["applied_coords"],
-        applied_angle=object_infos["applied_angle"],
-        simulated=object_infos["simulated"],
-        name=object_infos["name"],
-        centroid=transform_Vector2(object_infos["centroid"])[0],
-        vertices=transform_Vector2(object_infos["vertices"]),
-        zone=object_infos["zone"],
-        playable=True
-    )
-    return new
-
-
-def transform_Vector2(infos):
-    """
-    Convert a list of [x, y] into a list of Vector2.
-
-    Parameters:
-    infos (list): List of coordinate pairs.
-
-    Returns:
-    list: List of Vector2 instances.
-    """
-    arr = []
-    for elem in infos:
-        arr.append(Vector2(*elem))
-    return arr
-
 def game_over(screen_width, screen_height, object_list, screen):
     """
     End the try and display the game over screen
@@ -289,12 +247,15 @@ def load_scene(n: int, screen_width, screen_height, object_list, screen):
     global tries
     global sprite_manager
     global sprites
+    global broadphase
     key = None
     bonus = None
 
     current_scene = n
     button_list = []
     text_list = []
+    broadphase = create_broadphase()
+    object_list.solver = create_solver() # Replaced by the one described in levels.json ("solver" key)
 
     #Fade in during level transition
     fade = pygame.Surface((screen_width, screen_height))
@@ -340,27 +301,13 @@ def load_scene(n: int, screen_width, screen_height, object_list, screen):
         case _:  # Gameplay levels
             for button in buttons["{}".format(n-1)].values():
                 button_list.append(load_button(button, screen_width, screen_height))
-            for object in levels["{}".format(n-1)].keys():
-                if object == "background":
-                    background = pygame.image.load(levels["{}".format(n-1)][object]).convert()
-                elif object == "key":
-                    key = Key(
-                        coordinates=levels["{}".format(n-1)][object]["coordinates"],
-                        detection_radius=levels["{}".format(n-1)][object]["detection_radius"],
-                        end_object_name=levels["{}".format(n-1)][object]["end_object_name"]
-                    )
-                elif object == "bonus":
-                    bonus = Bonus(
-                        coordinates=levels["{}".format(n-1)][object]["coordinates"],
-                        detection_radius=levels["{}".format(n-1)][object]["detection_radius"],
-                        target=levels["{}".format(n-1)][object]["target"]
-                    )
-                elif object == "sprites" :
-                    sprites = levels["{}".format(n-1)][object]
-                else:
-                    object_list.add_object(load_objects(levels["{}".format(n-1)][object]))
-
-                sprite_manager = SpriteManager(key=key, bonus=bonus)
+            level = levels["{}".format(n-1)]
+            broadphase, key, bonus = load_level(level, object_list) # Objects, key, bonus, broadphase and solver, see core/world.py
+            if "background" in level:
+                background = pygame.image.load(level["background"]).convert()
+            if "sprites" in level:
+                sprites = level["sprites"]
+            sprite_manager = SpriteManager(key=key, bonus=bonus)
 
 
             if playing_music != f"data/Music/level{n-1}.mp3":
@@ -7,21 +7,67 @@ A simple physics engine that manages a collection of objects and handles physics
 Features include:
 - Adding and removing objects from the simulation
 - Updating object states
+- Optional array-backed body store integrating every object at once
+- Full physics step (zones, broadphase, narrowphase, resolution, integration) for the fixed-step loop
+- Sleeping of resting objects, grouped in contact islands that fall asleep and wake up together
+- Selectable polygon/polygon collider (GJK/EPA or SAT) and per-pair narrowphase cache
+- Iterative contact solver stage, warm-started with the impulses accumulated at the last step
+- Continuous collision detection of the fast objects flagged `ccd` against the static objects
 
 Last Updated: May 2025
 Python Version: 3.12+
-Dependencies: pygame.math (Vector2)
+Dependencies: pygame.math (Vector2), core.body_store, core.collision, core.solver, core.ccd
 """
 
 from pygame import Vector2
+from core.body_store import BodyStore
+from core.collision import collide, PairCache, COLLIDERS, POLYGON_COLLIDERS
+from core.solver import ContactSolver
+from core.ccd import advance_fast_objects
+
+GRAVITY = Vector2(0,9.8)
+
+# An object resting on a platform still gains one step of gravity per step, hence the dt term
+SLEEP_LINEAR_VELOCITY = 0.5 # + gravity * dt
+SLEEP_ANGULAR_VELOCITY = 0.02
+TIME_TO_SLEEP = 5 # Time spent below the thresholds before an island falls asleep
 
 class PhysicsEngine:
     """A simple physics engine that manages a collection of objects and handles collisions."""
     
-    def __init__(self):
-        """Initializes the PhysicsEngine instance with an empty list of objects."""
+    def __init__(self, use_body_store=False, polygon_collider="gjk", solver=None):
+        """
+        Initializes the PhysicsEngine instance with an empty list of objects.
+
+        Parameters:
+        use_body_store (bool, optional): Integrates the objects through a NumPy BodyStore.
+            Ignored when NumPy is not installed. Default is False.
+        polygon_collider (str, optional): Collider for polygon/polygon pairs, "gjk" or "sat".
+            Default is "gjk".
+        solver (ContactSolver, optional): Solver of the contacts, replaced by the one of each level
+            (see level_manager). Default is a ContactSolver with the default iterations.
+        """
+        self.store = BodyStore() if use_body_store and BodyStore.available else None
+        self.colliders = dict(COLLIDERS)
+        self.colliders[("polygon", "polygon")] = POLYGON_COLLIDERS[polygon_collider]
+        self.pair_cache = PairCache()
+        self.solver = solver if solver is not None else ContactSolver()
         self.objects = []
 
+    @property
+    def objects(self):
+        return self._objects
+
+    @objects.setter
+    def objects(self, objects):
+        # Scenes replace the whole list when they are loaded, the store has to follow
+        self._objects = objects
+        self.pair_cache.clear()
+        if self.store is not None:
+            self.store.clear()
+            for obj in objects:
+                self.store.add(obj)
+
     def add_object(self, obj):
         """
         Adds an object to the physics engine for simulation.
@@ -30,6 +76,8 @@ class PhysicsEngine:
         obj (Object): The object to be added.
         """
         self.objects.append(obj)
+        if self.store is not None:
+            self.store.add(obj)
     
     def remove_object(self, obj):
         """
@@ -40,12 +88,14 @@ class PhysicsEngine:
         """
         if obj in self.objects:
             self.objects.remove(obj)
+            if self.store is not None:
+                self.store.remove(obj)
 
     def update_polygon(self,object,dt):
-        table = {True:1,False:0}
-        object.shape.velocity += (Vector2(0,9.8) * dt * table[object.grabable]) # Computes new velocity after applying acceleration for dt period
-        object.shape.add(object.shape.velocity*dt* table[object.grabable])
-        object.shape.rotate(object.shape.angular_velocity*dt* table[object.grabable])
+        step = dt if object.grabable else 0.0 # Static objects are not integrated
+        object.shape.velocity += (GRAVITY * step) # Computes new velocity after applying acceleration for dt period
+        object.shape.add(object.shape.velocity * step)
+        object.shape.rotate(object.shape.angular_velocity * step)
         # Update the minimum enclosing circle if applicable
         object.updatemc(dt)
 
@@ -66,5 +116,122 @@ class PhysicsEngine:
         Parameters:
         dt (float): Time step elapsed since the last update (in seconds).
         """
+        if self.store is not None:
+            self.store.step(dt, GRAVITY)
+            return
         for obj1 in self.objects:
-            self.update_polygon(obj1,dt)
+            if not obj1.sleeping:
+                self.update_polygon(obj1,dt)
+
+    def save_states(self):
+        """
+        Remembers the current position of every object, used to interpolate the rendering
+        between the last two physics steps.
+        """
+        for obj in self.objects:
+            obj.shape.save_state()
+
+    def apply_zones(self):
+        """
+        Applies the continuous force of the wind zones to the grabable objects standing in them.
+        """
+        for obj in self.objects :
+            if (obj.grabable == True) and (len(obj.zone) == 8) : # A zone is entered
+                if obj.zone[0] == "wind" :
+                    centroid = obj.shape.centroid
+                    if centroid[0] <= obj.zone[4] and centroid[0] >= obj.zone[3] and centroid[1] >= obj.zone[5] and centroid[1] <= obj.zone[6] :
+                        obj.wake()
+                        obj.shape.velocity += (Vector2(obj.zone[1]) / obj.shape.mass)
+
+    def step(self, dt, broadphase):
+        """
+        Runs one physics step of size dt: zones, collision detection and resolution, then integration.
+
+        Parameters:
+        dt (float): Size of the physics step.
+        broadphase (Broadphase): Spatial partitioning structure used to find the potential collisions.
+        """
+        self.save_states()
+        self.apply_zones()
+
+        # The broadphase is persistent, only the objects that moved out of their cell or leaf are relocated
+        broadphase.updateall(self.objects)
+        interactions = broadphase.pairs(self.objects)
+
+        contacts = []
+        manifolds = []
+        for group in interactions:
+            if len(group) >= 2:
+                for other in group[1:]:
+                    manifold = collide(group[0], other, self.pair_cache, self.colliders)
+                    if manifold is not None: # Static pairs and masked pairs never leave the broadphase
+                        # An awake object touching a sleeping one wakes its whole island
+                        if group[0].sleeping:
+                            group[0].wake()
+                        if other.sleeping:
+                            other.wake()
+                        contacts.append((group[0], other))
+                        manifolds.append(manifold)
+
+        # All the contacts of the step are solved together, over several iterations
+        self.solver.solve(manifolds, dt, self.pair_cache)
+
+        self.pair_cache.prune() # Pairs that left the broadphase are forgotten
+        # Fast objects stop at their first impact instead of jumping through thin static objects
+        impacts = advance_fast_objects(self.objects, broadphase, dt, GRAVITY)
+        self.update(dt)
+        for obj, velocity, angular_velocity in impacts:
+            obj.shape.velocity = velocity
+            obj.shape.angular_velocity = angular_velocity
+        self.update_sleep(contacts, dt)
+
+    def islands(self, objects, contacts):
+        """
+        Groups the given objects into contact islands: objects touching each other, directly or
+        through other objects of the list. Static objects do not connect islands.
+
+        Parameters:
+        objects (list): Objects to group.
+        contacts (list): Pairs of objects in contact during the last step.
+
+        Returns:
+        list of list: The islands.
+        """
+        parent = {obj: obj for obj in objects}
+
+        def find(obj):
+            while parent[obj] is not obj:
+                parent[obj] = parent[parent[obj]]
+                obj = parent[obj]
+            return obj
+
+        for a, b in contacts:
+            if a in parent and b in parent:
+                parent[find(a)] = find(b)
+
+        groups = {}
+        for obj in objects:
+            groups.setdefault(find(obj), []).append(obj)
+        return list(groups.values())
+
+    def update_sleep(self, contacts, dt):
+        """
+        Updates the sleep timers of the awake objects and puts to sleep the islands whose
+        objects all stayed slow for long enough.
+
+        Parameters:
+        contacts (list): Pairs of objects in contact during the last step.
+        dt (float): Size of the physics step.
+        """
+        linear_limit = SLEEP_LINEAR_VELOCITY + GRAVITY.length() * dt
+        awake = [obj for obj in self.objects if obj.active]
+        for obj in awake:
+            if obj.shape.velocity.length() < linear_limit and abs(obj.shape.angular_velocity) < SLEEP_ANGULAR_VELOCITY:
+                obj.sleep_time += dt
+            else:
+                obj.sleep_time = 0
+
+        for island in self.islands(awake, contacts):
+            if min(obj.sleep_time for obj in island) >= TIME_TO_SLEEP:
+                for obj in island:
+                    obj.sleep(island)
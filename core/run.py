@@ -5,14 +5,14 @@ run.py
 Main loop for the Polterphysics game.
 Features:
 - Scene handling and transitions
-- Physics updates with user vector interaction
+- Fixed-step physics updates with user vector interaction and interpolated rendering
 - Simple pause system
 - Object drawing with optional debug vectors
 - Button UI and audio feedback
 
 Last Updated: May 2025
 Python Version: 3.12+
-Dependencies: pygame, pygame.math, random, sys, core.physics_engine, core.collision, objects.object, utils.math_utils, utils.vector_utils, utils.sprites_utils, core.input_handler, objects.Quadtree, core.level_manager, core.sound
+Dependencies: pygame, pygame.math, random, sys, core.physics_engine, core.timestep, core.collision, objects.object, utils.math_utils, utils.vector_utils, utils.sprites_utils, core.input_handler, core.level_manager, core.sound, core.world
 """
 
 import pygame
@@ -20,16 +20,18 @@ from pygame.math import Vector2
 from random import randint
 import sys
 from core.physics_engine import PhysicsEngine
+from core.timestep import FixedTimestep
+from core.world import PHYSICS_STEP # Shared with the headless worlds
 from core.collision import *
 from objects.object import *
 from utils.math_utils import *
 from utils.vector_utils import *
 from utils.sprites_utils import *
 from core.input_handler import *
-from objects.Quadtree import RectangleQ, Quadtree
 import core.level_manager as level_manager
 from core.sound import play_sound_fx
 
+MAX_PHYSICS_STEPS = 5 # Catch-up steps allowed per frame before dropping the backlog
 
 def main() :
     # === Initialization ===
@@ -37,6 +39,7 @@ def main() :
     pygame.mixer.init()
 
     clock = pygame.time.Clock()
+    timestep = FixedTimestep(PHYSICS_STEP, MAX_PHYSICS_STEPS)
     running = True
 
     clicked_object = None # Object that will receive the user-applied vector
@@ -55,10 +58,8 @@ def main() :
     win = pygame.transform.scale(pygame.image.load("data/background/win_back.png"), (display_width, display_height))
     game_over = pygame.transform.scale(pygame.image.load("data/background/game_over_back.png"), (display_width, display_height))
 
-    # Physics engine and spatial partitioning
+    # Physics engine (the spatial partitioning is chosen by each level, see level_manager.broadphase)
     physics_engine = PhysicsEngine()
-    bounding_box = RectangleQ(-1000, -1000, 3400, 2200)
-    quadtree = Quadtree(bounding_box, 20)
 
     # Keyboard states (e.g. pause key)
     key_state = {
@@ -67,6 +68,7 @@ def main() :
 
     # Load first level/scene
     level_manager.load_scene(0, display_width, display_height, physics_engine, screen)
+    timestep.reset()
     game_state = "menu"
 
 
@@ -94,48 +96,26 @@ def main() :
 
         if game_state == "paused":
             vectors_applied = False # Allow applying vectors again
-            clicked_object = vector_application(event, physics_engine.objects, clicked_object, quadtree)
+            clicked_object = vector_application(event, physics_engine.objects, clicked_object, level_manager.broadphase)
 
         if game_state == "running":
-            dt = clock.get_time() / 100.0
-
-            for obj in physics_engine.objects:
-                quadtree.insert(obj)
-            interactions = quadtree.searchelements(physics_engine.objects)
-            
-            
             # Apply all the vectors entered by the user during transition from "paused" state to "running" state --> prevent vector stacking 
             if vectors_applied == False :
                 for obj in physics_engine.objects :
-                    if (obj.applied_coords != [0,0]) and (obj.grabable == True) and (obj.playable == True): # general application of the forces
+                    if (obj.applied_coords != NO_VECTOR) and (obj.grabable == True) and (obj.playable == True): # general application of the forces
+                        obj.wake()
                         obj.shape.velocity += (Vector2(obj.applied_coords) /  obj.shape.mass) # Instant increase of the speed of the object 
                         obj.playable = False # Allow for only 1 vector applied per object
                 vectors_applied = True
             
-            for obj in physics_engine.objects :
-                if (obj.grabable == True) and (len(obj.zone) == 8) : # A zone is entered
-                    if obj.zone[0] == "wind" :
-                        if obj.shape.centroid[0] <= obj.zone[4] and obj.shape.centroid[0] >= obj.zone[3] and obj.shape.centroid[1] >= obj.zone[5] and obj.shape.centroid[1] <= obj.zone[6] :
-                            obj.shape.velocity += (Vector2(obj.zone[1]) / obj.shape.mass)
-            
-            
             # Reset the vectors info and mouse position for all the objects loaded in the physics engine
             reset_level_vectors(physics_engine.objects) 
             for elements in physics_engine.objects :
                 update_mouse(elements, Vector2(0,0))
 
-
-            for group in interactions:
-                if len(group) >= 2:
-                    for other in group[1:]:
-                        gjk = GJK2D(group[0], other)
-                        collision = gjk.detection()
-                        resolution = gjk.EPA(collision)
-                        if collision is not None and not (group[0].grabable == other.grabable == False):
-                            gjk.find_contact_features(gjk.shape1, gjk.shape2, resolution)
-                            gjk.resolve(resolution, dt)
-
-            physics_engine.update(dt)
+            # Consume the elapsed time in fixed physics steps, a slow frame only adds (bounded) steps
+            for _ in range(timestep.advance(clock.get_time() / 100.0)):
+                physics_engine.step(timestep.dt, level_manager.broadphase)
 
         # === Drawing ===
         if game_state == "menu":
@@ -150,16 +130,19 @@ def main() :
         else:
             screen.blit(level_manager.background, (0, 0))
 
+            # Draw the objects between the last two physics steps while running
+            alpha = timestep.alpha if game_state == "running" else 1
+
             for elements in physics_engine.objects:
                 if (elements.name != "RightPanel" and elements.name != "LeftPanel") :
                     
                     if elements.name in phantoms_names:
                         if elements.playable == True : 
-                            elements.shape.draw(screen,phantoms_color[elements.name])
+                            elements.shape.draw(screen,phantoms_color[elements.name],alpha)
                         else : # If a vector has already been applied, then it is drawn in gray
-                            elements.shape.draw(screen,(170,170,170))
+                            elements.shape.draw(screen,(170,170,170),alpha)
                     else : 
-                        elements.shape.draw(screen,(194,86,63))
+                        elements.shape.draw(screen,(194,86,63),alpha)
 
 
             level_manager.sprite_manager.update(screen, physics_engine.objects, level_manager.sprites, game_state)
@@ -175,6 +158,7 @@ def main() :
                     game_state  = "win"
                 else:
                     level_manager.load_scene(level_manager.current_scene + 1, display_width, display_height, physics_engine,screen)
+                timestep.reset() # The new scene starts without the time left over by the previous one
             if level_manager.sprite_manager.bonusdetected:
                 level_manager.sprite_manager.bonusdetected = False
                 
@@ -200,6 +184,7 @@ def main() :
                 if click:
                     play_sound_fx("data/Music/pwomp.mp3" if randint(0, 50) == 30 else "data/Music/click.mp3")
                     button.is_pressed(display_width, display_height, physics_engine,screen)
+                    timestep.reset() # Most buttons load a scene (restart, next level, menu, level select)
                     #check the gamestate for the button play/pause
                     if (button.action == "Play" and game_state == "running" ) :
                         game_state = "paused"
@@ -211,7 +196,7 @@ def main() :
             elif "data\\Phantoms\\" in  button.image:
                 for elem in range (len(physics_engine.objects)) :
                     if (physics_engine.objects[elem].name == button.action):
-                        if (physics_engine.objects[elem].applied_coords != [0,0]) :
+                        if (physics_engine.objects[elem].applied_coords != NO_VECTOR) :
                             button.hover(screen)
                         else : 
                             button.draw(screen)
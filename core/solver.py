@@ -0,0 +1,149 @@
+"""
+POLTERPHYSICS
+solver.py
+
+The contact solver stage of the physics step: every contact found during a step is solved
+together, over several iterations, instead of each pair being resolved once in turn.
+
+Features include:
+- Warm start of every contact with the impulses accumulated at the last step
+- Configurable number of velocity iterations (sequential impulses with clamped accumulated impulses)
+- Configurable number of position iterations pushing the remaining penetration out
+- Residual metrics (last impulse change, remaining penetration) to tune the iterations of each level
+- Choice of the solver of each level (sequential, or batched with NumPy in core/batch_solver.py)
+
+Last Updated: May 2025
+Python Version: 3.12+
+Dependencies: pygame.math (Vector2), core.contacts
+"""
+
+from pygame.math import Vector2
+from core.contacts import make_contacts, store_impulses
+
+DEFAULT_SOLVER = {"type": "sequential", "velocity_iterations": 8, "position_iterations": 3}
+CORRECTION_PERCENT = 0.4 # Fraction of the remaining penetration corrected by each position iteration
+CORRECTION_SLOP = 0.03 # Penetration left uncorrected
+
+class ContactSolver:
+    """
+    Iterative sequential impulse solver over all the contacts of a physics step.
+
+    Attributes:
+        velocity_iterations (int): Passes over the contacts solving the velocities.
+        position_iterations (int): Passes over the contacts correcting the positions.
+        tolerance (float): The velocity iterations stop early once no normal impulse changes by more than this.
+        residual (float): Largest change of a normal impulse during the last velocity iteration of the last step.
+        penetration (float): Deepest penetration met by the last position iteration of the last step.
+        iterations (int): Velocity iterations actually run at the last step.
+
+    Methods:
+        solve(manifolds, dt, cache): Solves the contacts of a step.
+        solve_velocities(contacts): Runs the velocity iterations.
+        solve_positions(manifolds): Runs the position iterations.
+    """
+    def __init__(self, velocity_iterations=8, position_iterations=3, tolerance=0.0):
+        self.velocity_iterations = velocity_iterations
+        self.position_iterations = position_iterations
+        self.tolerance = tolerance
+        self.residual = 0.0
+        self.penetration = 0.0
+        self.iterations = 0
+
+    def solve(self, manifolds, dt, cache=None):
+        """
+        Solves every contact of a step: warm start, velocity iterations, then position iterations.
+
+        Parameters:
+        manifolds (list of Manifold): Contacts found by the narrowphase during the step.
+        dt (float): Time step.
+        cache (PairCache, optional): Pair cache holding the accumulated impulses between steps.
+
+        Returns:
+        float: The velocity residual (see `residual`).
+        """
+        if not manifolds:
+            self.residual = self.penetration = 0.0
+            self.iterations = 0
+            return self.residual
+        contacts = [make_contacts(manifold, dt, cache) for manifold in manifolds]
+        # Every contact is warm-started before any is solved
+        for pair in contacts:
+            for point in pair:
+                point.warm_start()
+        self.solve_velocities([point for pair in contacts for point in pair])
+        if cache is not None:
+            for pair in contacts:
+                store_impulses(pair, cache)
+        self.solve_positions(manifolds)
+        return self.residual
+
+    def solve_velocities(self, contacts):
+        """
+        Runs the velocity iterations, each solving every contact point once.
+
+        Parameters:
+        contacts (list of ContactPoint): Contact points of the step.
+        """
+        self.residual = 0.0
+        self.iterations = 0
+        for _ in range(self.velocity_iterations):
+            self.iterations += 1
+            self.residual = max((point.solve() for point in contacts), default=0.0)
+            if self.residual <= self.tolerance:
+                break
+
+    def solve_positions(self, manifolds):
+        """
+        Runs the position iterations: the objects are moved apart along the normals, in proportion
+        to their inverse masses, until the penetrations found by the narrowphase fall under the slop.
+        The penetration left at each contact is estimated from how far its objects already moved.
+
+        Parameters:
+        manifolds (list of Manifold): Contacts found by the narrowphase during the step.
+        """
+        start = {}
+        for manifold in manifolds:
+            for obj in (manifold.object1, manifold.object2):
+                if obj not in start:
+                    start[obj] = Vector2(obj.shape.centroid)
+
+        self.penetration = max((manifold.depth for manifold in manifolds), default=0.0)
+        for _ in range(self.position_iterations):
+            self.penetration = 0.0
+            for manifold in manifolds:
+                shape1, shape2 = manifold.object1.shape, manifold.object2.shape
+                moved = (shape2.centroid - start[manifold.object2] - shape1.centroid + start[manifold.object1]).dot(manifold.normal)
+                depth = manifold.depth - moved
+                self.penetration = max(self.penetration, depth)
+                inv_mass1 = 1 / shape1.mass if shape1.mass > 0 else 0
+                inv_mass2 = 1 / shape2.mass if shape2.mass > 0 else 0
+                if depth <= CORRECTION_SLOP or inv_mass1 + inv_mass2 == 0:
+                    continue
+                correction = (depth - CORRECTION_SLOP) / (inv_mass1 + inv_mass2) * CORRECTION_PERCENT * manifold.normal
+                shape1.add(-(correction * inv_mass1))
+                shape2.add(correction * inv_mass2)
+
+def create_solver(config=None):
+    """
+    Creates the contact solver described by a level.
+
+    Parameters:
+    config (dict, optional): Solver description, e.g. {"type": "batch", "velocity_iterations": 8}.
+        "type" is "sequential" (ContactSolver) or "batch" (BatchContactSolver, NumPy arrays, falls
+        back to "sequential" without NumPy). Missing entries take the values of DEFAULT_SOLVER.
+
+    Returns:
+    ContactSolver: The new solver.
+    """
+    config = dict(DEFAULT_SOLVER, **(config or {}))
+    kind = config.pop("type")
+    match kind:
+        case "sequential":
+            return ContactSolver(**config)
+        case "batch":
+            from core.batch_solver import BatchContactSolver
+            if not BatchContactSolver.available:
+                return ContactSolver(**config)
+            return BatchContactSolver(**config)
+        case _:
+            raise ValueError("Unknown solver type: {}".format(kind))
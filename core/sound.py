@@ -15,13 +15,13 @@ Dependencies: pygame
 
 import pygame
 
-pygame.init()
-pygame.mixer.init()
-pygame.mixer_music.set_volume(0.1)
+# The mixer is initialized by the game (core/run.py), importing this module needs no sound card
+MUSIC_VOLUME = 0.1
 
 
 def play_music (file : str): 
     pygame.mixer.music.load(file)  # Play music when the game is running
+    pygame.mixer.music.set_volume(MUSIC_VOLUME)
     pygame.mixer.music.play(-1)  # -1 loop the music
 
 
@@ -0,0 +1,67 @@
+"""
+POLTERPHYSICS
+timestep.py
+
+A fixed-step simulation clock decoupling the physics rate from the rendering rate.
+
+Features include:
+- Accumulation of the elapsed frame time
+- Constant-size physics steps, with a maximum number of catch-up steps per frame
+- Interpolation factor between the last two physics states for rendering
+
+Last Updated: May 2025
+Python Version: 3.12+
+Dependencies: None
+"""
+
+class FixedTimestep:
+    """
+    Accumulates frame time and hands it out as physics steps of a constant size.
+
+    When a frame takes too long, at most `max_steps` steps are run and the remaining backlog
+    is dropped, so a single stall never turns into one huge step or an ever-growing catch-up.
+
+    Attributes:
+        dt (float): Size of a physics step.
+        max_steps (int): Maximum number of steps run for a single frame.
+        accumulator (float): Frame time not yet consumed by a physics step.
+
+    Methods:
+        advance(frame_time): Adds a frame time and returns the number of steps to run.
+        reset(): Forgets the accumulated time (e.g. after loading a scene).
+        alpha: Interpolation factor between the previous and the current physics state.
+    """
+    def __init__(self, dt, max_steps=5):
+        self.dt = dt
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+
+    def advance(self, frame_time):
+        """
+        Adds the duration of a frame to the accumulator.
+
+        Parameters:
+        frame_time (float): Time elapsed since the last frame (same unit as dt).
+
+        Returns:
+        int: Number of physics steps of size dt to run this frame.
+        """
+        self.accumulator += frame_time
+        steps = min(int(self.accumulator // self.dt), self.max_steps)
+        self.accumulator -= steps * self.dt
+        if self.accumulator >= self.dt:
+            # Too far behind: drop the backlog but keep the phase for interpolation
+            self.accumulator %= self.dt
+        return steps
+
+    def reset(self):
+        """Forgets the accumulated time."""
+        self.accumulator = 0.0
+
+    @property
+    def alpha(self):
+        """
+        Returns:
+        float: Fraction of a step elapsed since the last physics state, in [0, 1).
+        """
+        return self.accumulator / self.dt
@@ -0,0 +1,266 @@
+"""
+POLTERPHYSICS
+world.py
+
+A headless world running the levels of levels.json without any window, sound card or font,
+e.g. for batch simulations and benchmarks on servers.
+
+Features include:
+- Loading the objects, key, bonus, broadphase and solver of a level, shared with level_manager
+- Shots applied to the playable objects, capped like the ones of the mouse
+- Fixed physics steps of the game loop, run one by one or until the level is won or at rest
+- Detection of the key and bonus of the level without drawing them
+
+Last Updated: May 2025
+Python Version: 3.12+
+Dependencies: json, functools, pygame.math (Vector2), objects.object, objects.key, objects.bonus, objects.broadphase, core.physics_engine, core.solver
+"""
+
+import json
+from functools import lru_cache
+from pygame.math import Vector2
+from objects.object import Object
+from objects.key import Key
+from objects.bonus import Bonus
+from objects.broadphase import create_broadphase
+from core.physics_engine import PhysicsEngine
+from core.solver import create_solver
+
+# Physics runs at its own rate, in the time unit of the game (milliseconds / 100)
+PHYSICS_RATE = 120
+PHYSICS_STEP = 1000 / PHYSICS_RATE / 100.0
+
+MAX_SHOT = 1300 # Longest vector the mouse can apply (see core/input_handler.py)
+NOT_OBJECTS = ("background", "key", "bonus", "sprites", "broadphase", "solver") # Level entries that are not objects
+
+
+@lru_cache(maxsize=None)
+def load_levels(path="data/levels.json"):
+    """
+    Reads the levels once, they are shared by every world built from the same file.
+
+    Parameters:
+    path (str, optional): Path of the levels file. Default is data/levels.json.
+
+    Returns:
+    dict: The level descriptions, by level number.
+    """
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def load_objects(object_infos):
+    """
+    Convert JSON data into an Object instance.
+
+    Parameters:
+    object_infos (dict): Dictionary from JSON file.
+
+    Returns:
+    Object: The constructed physics object.
+    """
+    new = Object(
+        polygon=object_infos["polygon"],
+        grabable=object_infos["grabable"],
+        mass=object_infos["mass"],
+        restitution_coefficient=object_infos["restitution_coefficient"],
+        radius=object_infos["radius"],
+        mouse=object_infos["mouse"],
+        applied_coords=object_infos["applied_coords"],
+        applied_angle=object_infos["applied_angle"],
+        simulated=object_infos["simulated"],
+        name=object_infos["name"],
+        centroid=transform_Vector2(object_infos["centroid"])[0],
+        vertices=transform_Vector2(object_infos["vertices"]),
+        zone=object_infos["zone"],
+        playable=True,
+        category=object_infos.get("category"),
+        mask=object_infos.get("mask"),
+        ccd=object_infos.get("ccd", False)
+    )
+    return new
+
+
+def load_level(data, engine):
+    """
+    Builds the physics of a level: its objects, key, bonus, broadphase and solver. Shared by the
+    headless worlds and `level_manager.load_scene`, which adds the display (background, sprites, buttons).
+
+    Parameters:
+    data (dict): Level description from levels.json.
+    engine (PhysicsEngine): Engine receiving the objects, its solver is replaced by the level's.
+
+    Returns:
+    Broadphase: The broadphase described by the level (the default one if the level has none).
+    Key: The key of the level, None if the level has none.
+    Bonus: The bonus of the level, None if the level has none.
+    """
+    engine.solver = create_solver(data.get("solver")) # e.g. {"velocity_iterations": 10, "position_iterations": 3}, see core/solver.py
+    key = None
+    bonus = None
+    for name, infos in data.items():
+        if name == "key":
+            key = Key(coordinates=infos["coordinates"], detection_radius=infos["detection_radius"], end_object_name=infos["end_object_name"])
+        elif name == "bonus":
+            bonus = Bonus(coordinates=infos["coordinates"], detection_radius=infos["detection_radius"], target=infos["target"])
+        elif name not in NOT_OBJECTS:
+            engine.add_object(load_objects(infos))
+    return create_broadphase(data.get("broadphase")), key, bonus # e.g. {"type": "grid", "cell_size": 150}, see objects/broadphase.py
+
+
+def transform_Vector2(infos):
+    """
+    Convert a list of [x, y] into a list of Vector2.
+
+    Parameters:
+    infos (list): List of coordinate pairs.
+
+    Returns:
+    list: List of Vector2 instances.
+    """
+    arr = []
+    for elem in infos:
+        arr.append(Vector2(*elem))
+    return arr
+
+
+class World:
+    """
+    A level of levels.json simulated without display: the same objects, broadphase, solver,
+    key and bonus as `level_manager.load_scene`, stepped at the rate of the game loop.
+
+    Attributes:
+        level (str): Number of the level in levels.json.
+        engine (PhysicsEngine): Physics engine holding the objects of the level.
+        broadphase (Broadphase): Broadphase described by the level.
+        key (Key): Key of the level, None if the level has none.
+        bonus (Bonus): Bonus of the level, None if the level has none.
+        dt (float): Size of a physics step.
+        steps (int): Number of steps run since the level was loaded.
+
+    Methods:
+        find(name): Returns the object with the given name.
+        shoot(name, vector): Applies a shot to a playable object.
+        step(): Runs one physics step.
+        run(steps): Runs several steps, stops early once the level is won.
+        settle(max_steps): Runs until the level is won or every object is at rest.
+        state(): Lists the name, position and velocity of the grabable objects.
+        won: Whether the key detected its object.
+        at_rest: Whether every object is static or sleeping.
+    """
+
+    def __init__(self, level, levels=None, use_body_store=False, polygon_collider="gjk", dt=PHYSICS_STEP):
+        """
+        Loads a level.
+
+        Parameters:
+        level (int or str): Number of the level in levels.json.
+        levels (dict, optional): Level descriptions. Default is the content of data/levels.json.
+        use_body_store (bool, optional): Integrates the objects through a NumPy BodyStore. Default is False.
+        polygon_collider (str, optional): Collider for polygon/polygon pairs, "gjk" or "sat". Default is "gjk".
+        dt (float, optional): Size of a physics step. Default is the step of the game loop.
+        """
+        self.level = str(level)
+        data = (levels if levels is not None else load_levels())[self.level]
+        self.engine = PhysicsEngine(use_body_store, polygon_collider)
+        self.broadphase, self.key, self.bonus = load_level(data, self.engine)
+        self.dt = dt
+        self.steps = 0
+
+    def find(self, name):
+        """
+        Returns the object with the given name.
+
+        Parameters:
+        name (str): Name of the object, e.g. "Ballman".
+
+        Returns:
+        Object: The first object with this name, None if there is none.
+        """
+        for obj in self.engine.objects:
+            if obj.name == name:
+                return obj
+        return None
+
+    def shoot(self, name, vector):
+        """
+        Applies a shot to an object, like a vector drawn with the mouse once the game runs.
+        Each playable object is shot once, unless it collects its bonus.
+
+        Parameters:
+        name (str): Name of the shot object.
+        vector (Vector2 or tuple): Shot vector, capped to MAX_SHOT and rounded like the mouse ones.
+
+        Returns:
+        bool: True if the shot was applied, False if the object is missing, static or already shot.
+        """
+        obj = self.find(name)
+        if obj is None or not obj.grabable or not obj.playable:
+            return False
+        vector = Vector2(vector)
+        if vector.length() > MAX_SHOT:
+            vector.scale_to_length(MAX_SHOT)
+        obj.wake()
+        obj.shape.velocity += Vector2(round(vector.x), round(vector.y)) / obj.shape.mass
+        obj.playable = False
+        return True
+
+    def step(self):
+        """
+        Runs one physics step, then checks the key and the bonus.
+        """
+        self.engine.step(self.dt, self.broadphase)
+        self.steps += 1
+        if self.key is not None:
+            self.key.detect(self.engine.objects)
+        if self.bonus is not None:
+            self.bonus.detect(self.engine.objects)
+
+    def run(self, steps):
+        """
+        Runs several physics steps, stopping early once the level is won.
+
+        Parameters:
+        steps (int): Maximum number of steps.
+
+        Returns:
+        bool: Whether the level is won.
+        """
+        for _ in range(steps):
+            if self.won:
+                break
+            self.step()
+        return self.won
+
+    def settle(self, max_steps=10000):
+        """
+        Runs physics steps until the level is won or every object fell asleep.
+
+        Parameters:
+        max_steps (int, optional): Maximum number of steps. Default is 10000.
+
+        Returns:
+        bool: Whether the level is won.
+        """
+        for _ in range(max_steps):
+            if self.won or self.at_rest:
+                break
+            self.step()
+        return self.won
+
+    def state(self):
+        """
+        Lists the grabable objects with their position and velocity.
+
+        Returns:
+        list of tuple: (name, centroid, velocity) of every grabable object, as copies.
+        """
+        return [(obj.name, Vector2(obj.shape.centroid), Vector2(obj.shape.velocity)) for obj in self.engine.objects if obj.grabable]
+
+    @property
+    def won(self):
+        return self.key is not None and self.key.detected
+
+    @property
+    def at_rest(self):
+        return not any(obj.active for obj in self.engine.objects)
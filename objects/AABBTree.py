@@ -0,0 +1,455 @@
+"""
+POLTERPHYSICS
+AABBTree.py
+
+Implements a dynamic bounding volume tree of axis-aligned boxes, a broadphase suited to levels
+mixing very large static slabs and small bodies.
+
+Features :
+- Axis-aligned boxes (AABB) around the objects' minimum enclosing circles
+- Fattened leaf boxes, so that objects moving a little need no tree update
+- Insertion choosing the sibling that grows the tree the least
+- Rotations keeping the tree balanced after every insertion and removal
+- Circular range queries, point queries (mouse picking) and ray queries
+
+Last Updated: May 2025
+Python Version: 3.12+
+Dependencies: math, objects.broadphase
+"""
+
+from math import sqrt
+from objects.broadphase import Broadphase
+
+class AABB:
+    """
+    Axis-aligned bounding box.
+
+    Attributes:
+        minx, miny (float): Top-left corner.
+        maxx, maxy (float): Bottom-right corner.
+
+    Methods:
+        fromcircle(circle, margin): Builds the box around a circle, grown by a margin.
+        union(other): Returns the smallest box enclosing both boxes.
+        perimeter(): Returns the perimeter of the box (cost used to build the tree).
+        contains(other): Checks whether another box lies inside this one.
+        overlaps(other): Checks whether two boxes intersect.
+        containspoint(point): Checks whether a point lies inside the box.
+        raydistance(start, inverse, maxdist): Returns the distance at which a ray enters the box.
+    """
+    def __init__(self, minx, miny, maxx, maxy):
+        self.minx = minx
+        self.miny = miny
+        self.maxx = maxx
+        self.maxy = maxy
+
+    @staticmethod
+    def fromcircle(circle, margin=0):
+        r = circle.radius + margin
+        return AABB(circle.x - r, circle.y - r, circle.x + r, circle.y + r)
+
+    def union(self, other):
+        return AABB(min(self.minx, other.minx), min(self.miny, other.miny),
+                    max(self.maxx, other.maxx), max(self.maxy, other.maxy))
+
+    def perimeter(self):
+        return 2 * (self.maxx - self.minx + self.maxy - self.miny)
+
+    def contains(self, other):
+        return (self.minx <= other.minx and self.miny <= other.miny and
+                other.maxx <= self.maxx and other.maxy <= self.maxy)
+
+    def overlaps(self, other):
+        return not (other.minx > self.maxx or other.maxx < self.minx or
+                    other.miny > self.maxy or other.maxy < self.miny)
+
+    def containspoint(self, point):
+        return self.minx <= point[0] <= self.maxx and self.miny <= point[1] <= self.maxy
+
+    def raydistance(self, start, inverse, maxdist):
+        """
+        Slab test of a ray against the box.
+
+        Parameters:
+            start (Vector2): Origin of the ray.
+            inverse (tuple): Inverse of the unit direction of the ray on each axis (inf for 0).
+            maxdist (float): Length of the ray.
+
+        Returns:
+            float or None: Distance at which the ray enters the box (0 if it starts inside), None if it misses.
+        """
+        tmin, tmax = 0.0, maxdist
+        for lo, hi, origin, inv in ((self.minx, self.maxx, start[0], inverse[0]), (self.miny, self.maxy, start[1], inverse[1])):
+            if inv == float("inf"):
+                if origin < lo or origin > hi: # Parallel to the slab and outside of it
+                    return None
+                continue
+            t1, t2 = (lo - origin) * inv, (hi - origin) * inv
+            if t1 > t2:
+                t1, t2 = t2, t1
+            tmin, tmax = max(tmin, t1), min(tmax, t2)
+            if tmin > tmax:
+                return None
+        return tmin
+
+
+class TreeNode:
+    """
+    Node of the AABB tree. Leaves hold one object, internal nodes always have two children.
+
+    Attributes:
+        aabb (AABB): Fattened box of the object (leaf) or union of the children's boxes.
+        parent (TreeNode or None): Parent node.
+        left, right (TreeNode or None): Children (None for a leaf).
+        height (int): 0 for a leaf, 1 + the height of the highest child otherwise.
+        owner (Object or None): Object of a leaf.
+    """
+    def __init__(self, aabb, owner=None):
+        self.aabb = aabb
+        self.parent = None
+        self.left = None
+        self.right = None
+        self.height = 0
+        self.owner = owner
+
+    @property
+    def isleaf(self):
+        return self.left is None
+
+
+class AABBTree(Broadphase):
+    """
+    Dynamic AABB tree (bounding volume hierarchy).
+
+    Every object has a leaf holding a box around its mincircle fattened by `margin`. The leaf is
+    only moved when the tight box leaves the fat one, so bodies at rest or moving slowly cost
+    nothing. A new leaf is paired with the sibling whose box grows the least (perimeter heuristic)
+    and the ancestors are rebalanced with rotations, so the height stays logarithmic whatever
+    the order of insertion and the sizes of the objects.
+
+    Attributes:
+        root (TreeNode or None): Root of the tree.
+        margin (float): Distance by which the leaf boxes are fattened.
+        leaves (dict): Object -> its leaf.
+
+    Methods:
+        insert(Object): Inserts an object.
+        remove(Object): Removes an object.
+        update(Object): Moves the leaf of an object if it left its fat box.
+        updateall(list): Synchronises the tree with a list of objects.
+        query(Object, found): Finds the objects whose bounds intersect the given object's mincircle.
+        querypoint(point, found): Finds the objects whose mincircle contains a point.
+        raycast(start, end): Lists the objects whose mincircle is crossed by a segment, nearest first.
+        pairs(list): Lists the potential interactions of every active object (see Broadphase).
+        insertleaf(leaf), removeleaf(leaf), balance(node): Internal tree maintenance.
+    """
+    def __init__(self, margin=10):
+        self.root = None
+        self.margin = margin
+        self.leaves = {}
+
+    def insert(self, Object):
+        """
+        Inserts an object with a fattened box around its mincircle.
+
+        Parameters:
+            Object: An object with a .mincircle attribute representing its bounds.
+        """
+        if Object in self.leaves:
+            return
+        leaf = TreeNode(AABB.fromcircle(Object.mincircle, self.margin), Object)
+        self.leaves[Object] = leaf
+        self.insertleaf(leaf)
+
+    def remove(self, Object):
+        """
+        Removes an object. Does nothing if the object is not stored.
+
+        Parameters:
+            Object: Object to remove.
+        """
+        leaf = self.leaves.pop(Object, None)
+        if leaf is not None:
+            self.removeleaf(leaf)
+
+    def update(self, Object):
+        """
+        Keeps the leaf of an object up to date: inserts it if it is not stored yet and moves it
+        only if its tight box left its fat box.
+
+        Parameters:
+            Object: Object to update.
+        """
+        leaf = self.leaves.get(Object)
+        if leaf is None:
+            self.insert(Object)
+            return
+        circle, box = Object.mincircle, leaf.aabb
+        if (box.minx <= circle.x - circle.radius and circle.x + circle.radius <= box.maxx and
+                box.miny <= circle.y - circle.radius and circle.y + circle.radius <= box.maxy):
+            return # Still inside its fat box
+        self.removeleaf(leaf)
+        leaf.aabb = AABB.fromcircle(Object.mincircle, self.margin)
+        self.insertleaf(leaf)
+
+    def updateall(self, listofobjects):
+        """
+        Synchronises the tree with a list of objects: new objects are inserted, moved objects
+        relocated and objects missing from the list removed.
+
+        Parameters:
+            listofobjects (list): List of objects.
+        """
+        for elements in listofobjects:
+            self.update(elements)
+        for elements in self.leaves.keys() - set(listofobjects):
+            self.remove(elements)
+
+    def insertleaf(self, leaf):
+        """
+        Links a leaf into the tree next to the sibling minimising the growth of the tree, then
+        refits and rebalances its ancestors.
+
+        Parameters:
+            leaf (TreeNode): Detached leaf with its box set.
+        """
+        if self.root is None:
+            self.root = leaf
+            leaf.parent = None
+            return
+
+        # Descend towards the cheapest sibling: cost of a new parent vs cost of going down
+        box = leaf.aabb
+        node = self.root
+        while not node.isleaf:
+            area = node.aabb.perimeter()
+            combined = node.aabb.union(box).perimeter()
+            cost = 2 * combined # Cost of creating a new parent above this node
+            inheritance = 2 * (combined - area) # Growth forced on the ancestors when going down
+            costs = []
+            for child in (node.left, node.right):
+                grown = child.aabb.union(box).perimeter()
+                if child.isleaf:
+                    costs.append(grown + inheritance)
+                else:
+                    costs.append(grown - child.aabb.perimeter() + inheritance)
+            if cost < costs[0] and cost < costs[1]:
+                break
+            node = node.left if costs[0] < costs[1] else node.right
+
+        # Create a new parent for the sibling and the leaf
+        sibling = node
+        oldparent = sibling.parent
+        parent = TreeNode(sibling.aabb.union(box))
+        parent.parent = oldparent
+        parent.height = sibling.height + 1
+        parent.left = sibling
+        parent.right = leaf
+        sibling.parent = parent
+        leaf.parent = parent
+        if oldparent is None:
+            self.root = parent
+        elif oldparent.left is sibling:
+            oldparent.left = parent
+        else:
+            oldparent.right = parent
+
+        self.refit(parent)
+
+    def removeleaf(self, leaf):
+        """
+        Unlinks a leaf from the tree: its sibling takes the place of their parent.
+
+        Parameters:
+            leaf (TreeNode): Leaf to unlink.
+        """
+        if leaf is self.root:
+            self.root = None
+            return
+        parent = leaf.parent
+        grandparent = parent.parent
+        sibling = parent.left if parent.right is leaf else parent.right
+        leaf.parent = None
+        if grandparent is None:
+            self.root = sibling
+            sibling.parent = None
+            return
+        if grandparent.left is parent:
+            grandparent.left = sibling
+        else:
+            grandparent.right = sibling
+        sibling.parent = grandparent
+        self.refit(grandparent)
+
+    def refit(self, node):
+        """
+        Rebalances and recomputes the boxes and heights of a node and all its ancestors.
+
+        Parameters:
+            node (TreeNode): First internal node to refit.
+        """
+        while node is not None:
+            node = self.balance(node)
+            node.height = 1 + max(node.left.height, node.right.height)
+            node.aabb = node.left.aabb.union(node.right.aabb)
+            node = node.parent
+
+    def balance(self, a):
+        """
+        Performs a left or right rotation if node a is imbalanced (heights of its children differ
+        by more than one).
+
+        Parameters:
+            a (TreeNode): Node to balance.
+
+        Returns:
+            TreeNode: The node now standing at the place of a.
+        """
+        if a.isleaf or a.height < 2:
+            return a
+        b, c = a.left, a.right
+        difference = c.height - b.height
+        if difference > 1:
+            return self.rotate(a, c, b, True)
+        if difference < -1:
+            return self.rotate(a, b, c, False)
+        return a
+
+    def rotate(self, a, up, other, promoteright):
+        """
+        Promotes the child `up` of a, which becomes the parent of a. The highest child of `up`
+        stays under it and the other one replaces `up` under a.
+
+        Parameters:
+            a (TreeNode): Imbalanced node.
+            up (TreeNode): Highest child of a, promoted.
+            other (TreeNode): Other child of a.
+            promoteright (bool): Whether `up` is the right child of a.
+
+        Returns:
+            TreeNode: The promoted node.
+        """
+        f, g = up.left, up.right
+        up.left = a
+        up.parent = a.parent
+        a.parent = up
+        if up.parent is None:
+            self.root = up
+        elif up.parent.left is a:
+            up.parent.left = up
+        else:
+            up.parent.right = up
+
+        # The highest grandchild stays under the promoted node, the other one goes under a
+        keep, give = (f, g) if f.height > g.height else (g, f)
+        up.right = keep
+        if promoteright:
+            a.right = give
+        else:
+            a.left = give
+        give.parent = a
+        a.aabb = a.left.aabb.union(a.right.aabb)
+        a.height = 1 + max(a.left.height, a.right.height)
+        up.aabb = a.aabb.union(keep.aabb)
+        up.height = 1 + max(a.height, keep.height)
+        return up
+
+    def query(self, Object, found=None):
+        """
+        Finds all stored objects whose bounds intersect the given object's mincircle.
+
+        Parameters:
+            Object: The querying object with .mincircle (CircleQ).
+            found (list): Optional list to populate with results.
+
+        Returns:
+            list: List of matching objects.
+        """
+        if found is None:
+            found = []
+        if self.root is None:
+            return found
+        circle = Object.mincircle
+        minx, miny = circle.x - circle.radius, circle.y - circle.radius
+        maxx, maxy = circle.x + circle.radius, circle.y + circle.radius
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            box = node.aabb
+            if box.minx > maxx or box.maxx < minx or box.miny > maxy or box.maxy < miny:
+                continue
+            if node.left is None:
+                if circle.contains(node.owner.mincircle):
+                    found.append(node.owner)
+            else:
+                stack.append(node.right)
+                stack.append(node.left)
+        return found
+
+    def querypoint(self, point, found=None):
+        """
+        Finds all stored objects whose mincircle contains a point, e.g. the mouse position.
+
+        Parameters:
+            point (Vector2): The point.
+            found (list): Optional list to populate with results.
+
+        Returns:
+            list: List of matching objects.
+        """
+        if found is None:
+            found = []
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            if not node.aabb.containspoint(point):
+                continue
+            if node.isleaf:
+                circle = node.owner.mincircle
+                if (circle.x - point[0]) ** 2 + (circle.y - point[1]) ** 2 <= circle.radius ** 2:
+                    found.append(node.owner)
+            else:
+                stack.append(node.right)
+                stack.append(node.left)
+        return found
+
+    def raycast(self, start, end):
+        """
+        Lists the stored objects whose mincircle is crossed by the segment [start, end].
+
+        Parameters:
+            start (Vector2): Origin of the ray.
+            end (Vector2): End of the ray.
+
+        Returns:
+            list: (distance, Object) tuples sorted by the distance at which the ray enters the circle.
+        """
+        hits = []
+        dx, dy = end[0] - start[0], end[1] - start[1]
+        length = sqrt(dx * dx + dy * dy)
+        if self.root is None or length == 0:
+            return hits
+        dx, dy = dx / length, dy / length
+        inverse = (1 / dx if dx != 0 else float("inf"), 1 / dy if dy != 0 else float("inf"))
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node.aabb.raydistance(start, inverse, length) is None:
+                continue
+            if not node.isleaf:
+                stack.append(node.right)
+                stack.append(node.left)
+                continue
+            # Ray against the circle: |start + t*d - center|^2 = r^2
+            circle = node.owner.mincircle
+            ox, oy = start[0] - circle.x, start[1] - circle.y
+            b = ox * dx + oy * dy
+            c = ox * ox + oy * oy - circle.radius ** 2
+            discriminant = b * b - c
+            if discriminant < 0:
+                continue
+            t = max(-b - sqrt(discriminant), 0.0) # 0 when the ray starts inside the circle
+            if t <= length and -b + sqrt(discriminant) >= 0:
+                hits.append((t, node.owner))
+        hits.sort(key=lambda hit: hit[0])
+        return hits
@@ -0,0 +1,521 @@
+"""
+POLTERPHYSICS
+FlatQuadtree.py
+
+Implements the quadtree of Quadtree.py over flat, preallocated arrays instead of linked node objects,
+so that keeping it up to date from one frame to the next allocates nothing.
+
+Features :
+- Node bounds, child indices, parents, depths and item lists held in flat arrays indexed by node
+- Objects held in a pool of items chained per node (first/last/next/previous indices)
+- Free lists of node blocks (the four children of a node) and of items, reused by later subdivisions and inserts
+- Iterative insertion, merging and stack-based queries instead of recursive method calls
+- Same classic and loose modes, exact queries and same results as the Quadtree class
+
+Last Updated: May 2025
+Python Version: 3.12+
+Dependencies: objects.broadphase
+"""
+
+from objects.broadphase import Broadphase
+
+ROOT = 0
+NONE = -1
+
+
+class FlatQuadtree(Broadphase):
+    """
+    Quadtree (see Quadtree.py) stored in flat arrays. Nodes are numbered: the root is node 0 and
+    the four children of a node are consecutive nodes (northeast, northwest, southeast, southwest),
+    allocated together as a block. Objects are stored in items, chained in the order they were
+    added to their node. Merged blocks and removed items go to free lists, and the arrays only
+    grow when the free lists are empty, so a tree whose scene keeps its size stops allocating.
+
+    Attributes:
+        capacity (int): Max number of objects in a leaf before it subdivides.
+        loose (bool): Whether the tree runs in loose mode (see Quadtree).
+        xs, ys, ws, hs (list of float): Boundary of each node (top-left corner, width, height).
+        slacks (list of float): Largest radius an object stored in each node may have in loose mode.
+        reaches (list of float): Largest radius stored in each node or below it in classic mode (see Quadtree).
+        children (list of int): First child of each node, NONE for the leaves.
+        parents (list of int): Parent of each node, NONE for the root.
+        depths (list of int): Depth of each node, the root being at depth 0.
+        firsts, lasts (list of int): First and last item of each node, NONE when empty.
+        counts (list of int): Number of objects stored in each node.
+        objects (list): Object held by each item, None for the free items.
+        owners (list of int): Node holding each item.
+        nexts, previouses (list of int): Chaining of the items of a node.
+        handles (dict): Item of every stored object.
+        stamps (list of int): Last call of updateall that listed the object of each item.
+        freeblocks (list of int): First nodes of the free blocks of four nodes.
+        freeitems (list of int): Free items.
+
+    Methods:
+        insert(Object): Inserts an object.
+        delpoint(Object): Removes an object (also available as remove).
+        update(Object): Relocates an object whose bounds left its node.
+        updateall(list): Synchronises the tree with a list of objects.
+        query(Object, found): Queries for objects intersecting a circular region.
+        insertall(list): Inserts a list of objects.
+    """
+    LOOSENESS = 2 # Size of the loose bounds relative to the boundary
+    MAX_DEPTH = 16 # Deeper nodes never subdivide, e.g. when many objects share the same center
+    __slots__ = ("capacity", "loose", "xs", "ys", "ws", "hs", "slacks", "reaches", "children", "parents", "depths",
+                 "firsts", "lasts", "counts", "used", "objects", "owners", "nexts", "previouses", "handles",
+                 "freeblocks", "freeitems", "stamps", "stamp", "stack", "pending", "missing")
+
+    def __init__(self, boundary, n, loose=False, nodes=85, items=64):
+        """
+        Parameters:
+            boundary (RectangleQ): Region covered by the root.
+            n (int): Capacity of the leaves.
+            loose (bool, optional): Runs the tree in loose mode. Default is False.
+            nodes (int, optional): Nodes allocated up front. Default is 85 (four full levels).
+            items (int, optional): Items allocated up front. Default is 64.
+        """
+        self.capacity = n
+        self.loose = loose
+        self.xs, self.ys, self.ws, self.hs, self.slacks, self.reaches = [], [], [], [], [], []
+        self.children, self.parents, self.depths = [], [], []
+        self.firsts, self.lasts, self.counts = [], [], []
+        self.freeblocks = []
+        self.growNodes(max(nodes, 1))
+        self.objects, self.owners, self.nexts, self.previouses, self.stamps = [], [], [], [], []
+        self.freeitems = []
+        self.growItems(max(items, 1))
+        self.handles = {}
+        self.stamp = 0
+        self.stack = [] # Reused by the queries
+        self.pending = [] # Reused by the subdivisions in classic mode
+        self.missing = [] # Reused by updateall
+        self.used = 1 # Nodes handed out so far, the next blocks are taken after them
+        self.setNode(ROOT, boundary.x, boundary.y, boundary.w, boundary.h, NONE, 0)
+
+    def growNodes(self, count):
+        """
+        Appends free nodes to the node arrays.
+
+        Parameters:
+            count (int): Number of nodes to add.
+        """
+        for array in (self.xs, self.ys, self.ws, self.hs, self.slacks, self.reaches):
+            array.extend([0.0] * count)
+        for array in (self.children, self.parents, self.firsts, self.lasts):
+            array.extend([NONE] * count)
+        self.depths.extend([0] * count)
+        self.counts.extend([0] * count)
+
+    def growItems(self, count):
+        """
+        Appends free items to the item arrays.
+
+        Parameters:
+            count (int): Number of items to add.
+        """
+        start = len(self.objects)
+        self.objects.extend([None] * count)
+        for array in (self.owners, self.nexts, self.previouses):
+            array.extend([NONE] * count)
+        self.stamps.extend([0] * count)
+        # Popped from the end: the lowest items are handed out first
+        self.freeitems.extend(range(start + count - 1, start - 1, -1))
+
+    def setNode(self, node, x, y, w, h, parent, depth):
+        """
+        Initialises an empty leaf.
+        """
+        self.xs[node] = x
+        self.ys[node] = y
+        self.ws[node] = w
+        self.hs[node] = h
+        self.slacks[node] = (self.LOOSENESS - 1) / 2 * min(w, h)
+        self.reaches[node] = 0.0
+        self.children[node] = NONE
+        self.parents[node] = parent
+        self.depths[node] = depth
+        self.firsts[node] = self.lasts[node] = NONE
+        self.counts[node] = 0
+
+    def subdivide(self, node):
+        """
+        Splits a leaf into four children, taken from the free blocks when possible.
+
+        Parameters:
+            node (int): The leaf.
+        """
+        if self.freeblocks:
+            first = self.freeblocks.pop()
+        else:
+            if self.used + 4 > len(self.xs):
+                self.growNodes(len(self.xs))
+            first = self.used
+            self.used += 4
+        x, y, w, h = self.xs[node], self.ys[node], self.ws[node], self.hs[node]
+        depth = self.depths[node] + 1
+        self.setNode(first, x + w/2, y, w/2, h/2, node, depth) # Northeast
+        self.setNode(first + 1, x, y, w/2, h/2, node, depth) # Northwest
+        self.setNode(first + 2, x + w/2, y + h/2, w/2, h/2, node, depth) # Southeast
+        self.setNode(first + 3, x, y + h/2, w/2, h/2, node, depth) # Southwest
+        self.children[node] = first
+
+    def widen(self, node, radius):
+        """
+        Raises the reach of a node and of its ancestors to a radius (classic mode).
+        """
+        reaches, parents = self.reaches, self.parents
+        while node != NONE and reaches[node] < radius:
+            reaches[node] = radius
+            node = parents[node]
+
+    def contains(self, node, circle):
+        """
+        Checks whether the center of a circle is inside the boundary of a node.
+        """
+        x, y = self.xs[node], self.ys[node]
+        return x <= circle.x < x + self.ws[node] and y <= circle.y < y + self.hs[node]
+
+    def fits(self, node, circle):
+        """
+        Checks whether an object with the given bounds belongs to a node (see Quadtree.fits).
+        """
+        if not self.contains(node, circle):
+            return False
+        return not self.loose or node == ROOT or circle.radius <= self.slacks[node]
+
+    def child(self, node, circle):
+        """
+        Returns the child of a node containing the center of a circle, NONE if there is none.
+        """
+        first = self.children[node]
+        for child in range(first, first + 4):
+            if self.contains(child, circle):
+                return child
+        return NONE
+
+    def link(self, item, node):
+        """
+        Appends an item to the objects of a node.
+        """
+        last = self.lasts[node]
+        self.previouses[item] = last
+        self.nexts[item] = NONE
+        if last == NONE:
+            self.firsts[node] = item
+        else:
+            self.nexts[last] = item
+        self.lasts[node] = item
+        self.owners[item] = node
+        self.counts[node] += 1
+
+    def unlink(self, item):
+        """
+        Takes an item out of the objects of its node.
+        """
+        node = self.owners[item]
+        previous, following = self.previouses[item], self.nexts[item]
+        if previous == NONE:
+            self.firsts[node] = following
+        else:
+            self.nexts[previous] = following
+        if following == NONE:
+            self.lasts[node] = previous
+        else:
+            self.previouses[following] = previous
+        self.owners[item] = NONE
+        self.counts[node] -= 1
+
+    def newItem(self, Object):
+        """
+        Takes a free item for an object.
+        """
+        if not self.freeitems:
+            self.growItems(len(self.objects))
+        item = self.freeitems.pop()
+        self.objects[item] = Object
+        self.stamps[item] = self.stamp
+        self.handles[Object] = item
+        return item
+
+    def freeItem(self, item):
+        """
+        Gives an item back to the free list.
+        """
+        del self.handles[self.objects[item]]
+        self.objects[item] = None
+        self.freeitems.append(item)
+
+    def insert(self, Object):
+        """
+        Inserts an object with a .mincircle (CircleQ) into the quadtree.
+
+        Parameters:
+            Object: An object with a .mincircle attribute representing its bounds.
+        """
+        if not self.fits(ROOT, Object.mincircle):
+            return
+        self.file(self.newItem(Object))
+
+    def file(self, item):
+        """
+        Files an item from the root, in the node its object belongs to.
+
+        Parameters:
+            item (int): The item, whose object lies in the root.
+        """
+        if self.loose:
+            self.placeloose(item)
+        else:
+            self.place(item, ROOT)
+            # Objects pushed out of the leaves that subdivided are filed again
+            pending = self.pending
+            i = 0
+            while i < len(pending):
+                self.place(pending[i], pending[i + 1])
+                i += 2
+            pending.clear()
+
+    def place(self, item, node):
+        """
+        Files an item in the leaf containing the center of its object (classic mode). A full leaf
+        is subdivided and its objects are queued in `pending`, to be filed again from it.
+
+        Parameters:
+            item (int): The item.
+            node (int): Node to search from.
+        """
+        circle = self.objects[item].mincircle
+        if not self.contains(node, circle):
+            # The object moved since it was stored in the subdivided leaf
+            node = ROOT
+            if not self.contains(ROOT, circle):
+                self.freeItem(item)
+                return
+        while True:
+            if self.children[node] == NONE:
+                if self.counts[node] < self.capacity or self.depths[node] >= self.MAX_DEPTH:
+                    self.link(item, node)
+                    self.widen(node, circle.radius)
+                    return
+                # The stored objects and then the new one are filed again from the new children
+                self.subdivide(node)
+                stored = self.firsts[node]
+                while stored != NONE:
+                    following = self.nexts[stored]
+                    self.unlink(stored)
+                    self.pending.append(stored)
+                    self.pending.append(node)
+                    stored = following
+                self.pending.append(item)
+                self.pending.append(node)
+                return
+            child = self.child(node, circle)
+            if child == NONE: # On the outer edge of the node
+                self.freeItem(item)
+                return
+            node = child
+
+    def placeloose(self, item):
+        """
+        Files an item in the deepest node its whole circle fits in (loose mode), then subdivides
+        the node if it is an overflowing leaf.
+
+        Parameters:
+            item (int): The item.
+        """
+        circle = self.objects[item].mincircle
+        node = ROOT
+        while self.children[node] != NONE:
+            child = self.child(node, circle)
+            if child == NONE or not self.fits(child, circle):
+                break
+            node = child
+        self.link(item, node)
+
+        if self.children[node] == NONE and self.counts[node] > self.capacity and self.depths[node] < self.MAX_DEPTH:
+            self.subdivide(node)
+            stored = self.firsts[node]
+            while stored != NONE: # Push down the objects small enough for a child
+                following = self.nexts[stored]
+                circle = self.objects[stored].mincircle
+                child = self.child(node, circle)
+                if child != NONE and self.fits(child, circle):
+                    self.unlink(stored)
+                    self.link(stored, child)
+                stored = following
+
+    def merge(self, node):
+        """
+        Collapses the children of a node back into it when they are all leaves holding no more
+        than `capacity` objects, then tries again with its parent (see Quadtree.merge).
+
+        Parameters:
+            node (int): The node.
+        """
+        while node != NONE and self.children[node] != NONE:
+            first = self.children[node]
+            total = self.counts[node]
+            for child in range(first, first + 4):
+                if self.children[child] != NONE:
+                    return
+                total += self.counts[child]
+            if total > self.capacity:
+                return
+            reach = 0.0 # The node is a leaf again
+            stored = self.firsts[node]
+            while stored != NONE:
+                reach = max(reach, self.objects[stored].mincircle.radius)
+                stored = self.nexts[stored]
+            for child in range(first, first + 4):
+                stored = self.firsts[child]
+                while stored != NONE:
+                    following = self.nexts[stored]
+                    reach = max(reach, self.objects[stored].mincircle.radius)
+                    self.unlink(stored)
+                    self.link(stored, node)
+                    stored = following
+            self.reaches[node] = reach
+            self.children[node] = NONE
+            self.freeblocks.append(first)
+            node = self.parents[node]
+
+    def delpoint(self, Object):
+        """
+        Removes an object from the quadtree, using the handle to its item.
+
+        Parameters:
+            Object: Object to remove.
+        """
+        item = self.handles.get(Object)
+        if item is None: # Not stored in this tree
+            return
+        self.detach(item)
+        self.freeItem(item)
+
+    def detach(self, item):
+        """
+        Takes an item out of its node and merges the nodes that became sparse.
+
+        Parameters:
+            item (int): The item.
+        """
+        node = self.owners[item]
+        self.unlink(item)
+        if self.parents[node] != NONE:
+            self.merge(self.parents[node])
+
+    def remove(self, Object):
+        """
+        Removes an object from the quadtree (Broadphase interface, see delpoint).
+
+        Parameters:
+            Object: Object to remove.
+        """
+        self.delpoint(Object)
+
+    def update(self, Object):
+        """
+        Keeps an object at the right place in the tree: inserts it if it is not stored yet and
+        relocates it only if the center of its bounds left its node.
+
+        Parameters:
+            Object: Object to update.
+        """
+        item = self.handles.get(Object)
+        if item is None:
+            self.insert(Object)
+            return
+        self.stamps[item] = self.stamp
+        if self.fits(self.owners[item], Object.mincircle):
+            if not self.loose:
+                self.widen(self.owners[item], Object.mincircle.radius)
+            return
+        # The object keeps its item, only the chaining of the nodes changes
+        self.detach(item)
+        if self.fits(ROOT, Object.mincircle):
+            self.file(item)
+        else:
+            self.freeItem(item)
+
+    def updateall(self, listofobjects):
+        """
+        Synchronises the tree with a list of objects: new objects are inserted, moved objects
+        relocated and objects missing from the list removed. The objects of the list are stamped,
+        so that the missing ones are found without building a set.
+
+        Parameters:
+            listofobjects (list): List of objects.
+        """
+        self.stamp += 1
+        for elements in listofobjects:
+            self.update(elements)
+        stamp = self.stamp
+        missing = self.missing
+        for elements, item in self.handles.items():
+            if self.stamps[item] != stamp:
+                missing.append(elements)
+        for elements in missing:
+            self.delpoint(elements)
+        missing.clear()
+
+    def query(self, Object, found=None):
+        """
+        Finds all objects in the quadtree whose bounds are within the given object's mincircle.
+        The nodes are visited in the same order as Quadtree.query, with an explicit stack.
+
+        Parameters:
+            Object: The querying object with .mincircle (CircleQ).
+            found (list): Optional list to populate with results.
+
+        Returns:
+            list: List of matching objects.
+        """
+        if found is None:
+            found = []
+        circle = Object.mincircle
+        cx, cy, radius = circle.x, circle.y, circle.radius
+        xs, ys, ws, hs, slacks, reaches = self.xs, self.ys, self.ws, self.hs, self.slacks, self.reaches
+        children, firsts, nexts, objects = self.children, self.firsts, self.nexts, self.objects
+        loose = self.loose
+        stack = self.stack
+        stack.append(ROOT)
+        while stack:
+            node = stack.pop()
+            # Circle grown by the reach against the boundary (classic) or circle against the loose
+            # bounds (loose, any size fits the root)
+            if node != ROOT or not loose:
+                halfw, halfh = ws[node] / 2, hs[node] / 2
+                if loose:
+                    halfw += slacks[node]
+                    halfh += slacks[node]
+                    reach = radius
+                else:
+                    reach = radius + reaches[node]
+                dx = abs(cx - (xs[node] + ws[node] / 2))
+                dy = abs(cy - (ys[node] + hs[node] / 2))
+                if dx > halfw + reach or dy > halfh + reach:
+                    continue
+                if dx > halfw and dy > halfh and (dx - halfw) ** 2 + (dy - halfh) ** 2 > reach ** 2:
+                    continue
+            item = firsts[node]
+            while item != NONE:
+                other = objects[item].mincircle
+                if (radius + other.radius) ** 2 >= (other.x - cx) ** 2 + (other.y - cy) ** 2:
+                    found.append(objects[item])
+                item = nexts[item]
+            first = children[node]
+            if first != NONE:
+                stack.append(first + 3)
+                stack.append(first + 2)
+                stack.append(first + 1)
+                stack.append(first)
+        return found
+
+    def insertall(self, listofobjects):
+        """
+        Inserts all elements from a list into the quadtree.
+
+        Parameters:
+            listofobjects (list): List of objects.
+        """
+        for elements in listofobjects:
+            self.insert(elements)
@@ -9,12 +9,18 @@ Features :
 - Circular range queries (CircleQ)  
 - Object insertion, deletion, and spatial querying  
 - Recursive subdivision of space for dynamic density  
+- Persistent tree: objects keep a handle to their leaf, only moved objects are relocated and emptied nodes are merged  
+- Optional loose mode storing each object once, in the node whose loose bounds enclose its whole circle  
+- Exact queries in both modes (classic nodes keep the largest radius stored below them)  
+- Compact slot-based rectangles, circles and nodes  
 
 Last Updated: May 2025
 Python Version: 3.12+
-Dependencies: None
+Dependencies: objects.broadphase
 """
 
+from objects.broadphase import Broadphase
+
 class RectangleQ:
     """
     Represents a rectangle defined by top-left corner (x, y), width, and height.
@@ -25,6 +31,8 @@ class RectangleQ:
         w (float): Width of the rectangle.
         h (float): Height of the rectangle.
     """
+    __slots__ = ("x", "y", "w", "h")
+
     def __init__(self, x, y, w, h):
         self.x = x
         self.y = y
@@ -46,22 +54,24 @@ class RectangleQ:
                 self.y <= point.y and
                 self.y + self.h > point.y)
 
-    def intersect(self, rang):
+    def intersect(self, rang, margin=0):
         """
         Checks if a circular area intersects with the rectangle.
 
         Parameters:
             rang (CircleQ): The circular query region.
+            margin (float, optional): Added to the radius of the circle. Default is 0.
 
         Returns:
             bool: True if circle intersects the rectangle.
         """
+        radius = rang.radius + margin
         # Check if the circle lies within the rectangle's bounds.
         circle_distance_x = abs(rang.x - (self.x + self.w / 2))
         circle_distance_y = abs(rang.y - (self.y + self.h / 2))
-        if circle_distance_x > self.w / 2 + rang.radius:
+        if circle_distance_x > self.w / 2 + radius:
             return False
-        if circle_distance_y > self.h / 2 + rang.radius:
+        if circle_distance_y > self.h / 2 + radius:
             return False
         if circle_distance_x <= self.w / 2:
             return True
@@ -69,7 +79,19 @@ class RectangleQ:
             return True
         corner_distance_sq = (circle_distance_x - self.w /
                               2)**2 + (circle_distance_y - self.h / 2)**2
-        return corner_distance_sq <= rang.radius**2
+        return corner_distance_sq <= radius**2
+
+    def expanded(self, margin):
+        """
+        Returns a copy of the rectangle grown by a margin on every side.
+
+        Parameters:
+            margin (float): Distance added on each side.
+
+        Returns:
+            RectangleQ: The expanded rectangle.
+        """
+        return RectangleQ(self.x - margin, self.y - margin, self.w + 2 * margin, self.h + 2 * margin)
     
 class CircleQ:
     """
@@ -80,6 +102,8 @@ class CircleQ:
         y (float): Y-coordinate of the center.
         radius (float): Radius of the circle.
     """
+    __slots__ = ("x", "y", "radius")
+
     def __init__(self, x, y, r):
         self.x = x
         self.y = y
@@ -99,27 +123,58 @@ class CircleQ:
         point_distance_y = point.y - self.y
         return (self.radius+point.radius)**2 >= (point_distance_x**2) + (point_distance_y**2)
         
-class Quadtree:
+class Quadtree(Broadphase):
     """
     Implements a quadtree to manage 2D spatial objects efficiently.
 
+    The tree is persistent: it is kept from one frame to the next. Every stored object keeps a
+    handle to the leaf holding it (`Object.quadnode`), so updating the tree only relocates the
+    objects whose minimum enclosing circle left their leaf, and removing an object merges back
+    the nodes that became sparse. An object can therefore be stored in one tree at a time.
+
+    By default an object is filed by the center of its minimum enclosing circle only, so its
+    circle may spill into neighbouring nodes. Every node therefore keeps its reach, the largest
+    radius stored in it or below it, and a query visits the nodes that its circle, grown by their
+    reach, intersects: it finds every overlapping object. In loose mode each node also has loose
+    bounds, its boundary grown by `LOOSENESS`, and an object is stored once, in the deepest node
+    containing its center whose loose bounds enclose its whole circle (internal nodes may then
+    hold objects). Queries prune on the loose bounds and find every overlapping object.
+
     Attributes:
         boundary (RectangleQ): The rectangle region this node represents.
         capacity (int): Max number of elements before subdivision.
         points (list): Stored objects within this node (until subdivided).
         northeast, northwest, southeast, southwest (Quadtree): Child quadrants.
         divided (bool): Indicates whether this node has been subdivided.
+        parent (Quadtree or None): Parent node (None for the root).
+        root (Quadtree): Root node of the tree.
+        elements (set or None): Objects stored in the tree (kept by the root only, None in the other nodes).
+        loose (bool): Whether the tree runs in loose mode.
+        slack (float): Largest radius an object stored in this node may have in loose mode.
+        looseboundary (RectangleQ): The boundary grown by slack on every side.
+        reach (float): Largest radius stored in this node or below it in classic mode (may be
+            larger than needed after removals, until the node is merged).
 
     Methods:
         subdivide(): Divides this node into four children.
+        merge(): Collapses sparse children back into their parent, up to the root.
+        widen(radius): Raises the reach of this node and of its ancestors to a radius.
+        fits(circle): Checks whether an object with these bounds belongs to this node.
+        child(circle): Returns the child quadrant containing the center of a circle.
         insert(Object): Inserts an object into the quadtree.
-        delpoint(Object): Removes an object from the quadtree.
+        insertloose(Object): Inserts an object into a loose quadtree.
+        delpoint(Object): Removes an object from the quadtree (also available as remove).
+        update(Object): Relocates an object whose bounds left its leaf.
+        updateall(list): Synchronises the tree with a list of objects.
         query(Object, found): Queries for objects intersecting a circular region.
-        draw(drawing): Appends boundary data for visualization.
         insertall(list): Inserts a list of objects.
-        searchelements(list): Queries and removes all elements in list.
+        searchelements(list): Lists the potential interactions of every element in list (see Broadphase.pairs).
     """
-    def __init__(self, boundary, n):
+    LOOSENESS = 2 # Size of the loose bounds relative to the boundary
+    __slots__ = ("boundary", "capacity", "points", "northeast", "northwest", "southeast", "southwest", "divided",
+                 "parent", "root", "elements", "loose", "slack", "looseboundary", "reach")
+
+    def __init__(self, boundary, n, parent=None, loose=False):
         self.boundary = boundary
         self.capacity = n
         self.points = []
@@ -128,6 +183,13 @@ class Quadtree:
         self.southeast = None
         self.southwest = None
         self.divided = False
+        self.parent = parent
+        self.root = self if parent is None else parent.root
+        self.elements = set() if parent is None else None
+        self.loose = loose if parent is None else parent.loose
+        self.slack = (self.LOOSENESS - 1) / 2 * min(boundary.w, boundary.h)
+        self.looseboundary = boundary.expanded(self.slack)
+        self.reach = 0
 
     def subdivide(self):
         """
@@ -139,15 +201,77 @@ class Quadtree:
         w = self.boundary.w
         h = self.boundary.h
         ne = RectangleQ(x + w/2, y, w/2, h/2)
-        self.northeast = Quadtree(ne, self.capacity)
+        self.northeast = Quadtree(ne, self.capacity, self)
         nw = RectangleQ(x, y, w/2, h/2)
-        self.northwest = Quadtree(nw, self.capacity)
+        self.northwest = Quadtree(nw, self.capacity, self)
         se = RectangleQ(x + w/2, y + h/2, w/2, h/2)
-        self.southeast = Quadtree(se, self.capacity)
+        self.southeast = Quadtree(se, self.capacity, self)
         sw = RectangleQ(x, y + h/2, w/2, h/2)
-        self.southwest = Quadtree(sw, self.capacity)
+        self.southwest = Quadtree(sw, self.capacity, self)
         self.divided = True
 
+    def merge(self):
+        """
+        Collapses the children of this node back into it when they are all leaves holding no
+        more than `capacity` objects, then tries again with the parent node.
+        """
+        node = self
+        while node is not None and node.divided:
+            children = (node.northeast, node.northwest, node.southeast, node.southwest)
+            if any(child.divided for child in children):
+                return
+            if len(node.points) + sum(len(child.points) for child in children) > node.capacity:
+                return
+            node.points = node.points + [pnt for child in children for pnt in child.points]
+            for pnt in node.points:
+                pnt.quadnode = node
+            node.reach = max((pnt.mincircle.radius for pnt in node.points), default=0) # The node is a leaf again
+            node.northeast = node.northwest = node.southeast = node.southwest = None
+            node.divided = False
+            node = node.parent
+
+    def widen(self, radius):
+        """
+        Raises the reach of this node and of its ancestors to a radius (classic mode).
+
+        Parameters:
+            radius (float): Radius of an object stored in this node.
+        """
+        node = self
+        while node is not None and node.reach < radius:
+            node.reach = radius
+            node = node.parent
+
+    def fits(self, circle):
+        """
+        Checks whether an object with the given bounds belongs to this node: its center lies in
+        the boundary and, in loose mode, its circle lies in the loose bounds (any size fits the root).
+
+        Parameters:
+            circle (CircleQ): Bounds of the object.
+
+        Returns:
+            bool: True if the object can be stored in this node.
+        """
+        if not self.boundary.contains(circle):
+            return False
+        return not self.loose or self.parent is None or circle.radius <= self.slack
+
+    def child(self, circle):
+        """
+        Returns the child quadrant containing the center of a circle.
+
+        Parameters:
+            circle (CircleQ): The circle.
+
+        Returns:
+            Quadtree or None: The child quadrant, None if the center is outside this node.
+        """
+        for child in (self.northeast, self.northwest, self.southeast, self.southwest):
+            if child.boundary.contains(circle):
+                return child
+        return None
+
     def insert(self, Object):
         """
         Inserts an object with a .mincircle (CircleQ) into the quadtree.
@@ -155,6 +279,9 @@ class Quadtree:
         Parameters:
             Object: An object with a .mincircle attribute representing its bounds.
         """
+        if self.loose:
+            self.insertloose(Object)
+            return
         # If the object is not within the boundary, don't insert.
         if not self.boundary.contains(Object.mincircle):
             return
@@ -162,6 +289,9 @@ class Quadtree:
         if not self.divided:
             if len(self.points) < self.capacity:
                 self.points.append(Object)
+                Object.quadnode = self
+                self.root.elements.add(Object)
+                self.widen(Object.mincircle.radius)
             else:
                 self.subdivide()
                 self.points.append(Object)
@@ -170,7 +300,13 @@ class Quadtree:
                     self.northwest.insert(pnt)
                     self.southeast.insert(pnt)
                     self.southwest.insert(pnt)
+                # Objects that moved out of this node since they were stored are filed again from the root
+                moved = [pnt for pnt in self.points if pnt.quadnode is self]
                 self.points = []
+                for pnt in moved:
+                    pnt.quadnode = None
+                    self.root.elements.discard(pnt)
+                    self.root.insert(pnt)
         else:
             # If subdivided, insert into respective quadrant
             self.northeast.insert(Object)
@@ -178,23 +314,92 @@ class Quadtree:
             self.southeast.insert(Object)
             self.southwest.insert(Object)
             
+    def insertloose(self, Object):
+        """
+        Inserts an object into a loose quadtree, in the deepest node its whole circle fits in.
+
+        Parameters:
+            Object: An object with a .mincircle attribute representing its bounds.
+        """
+        circle = Object.mincircle
+        if not self.fits(circle):
+            return
+        # Go down as long as a child can hold the whole circle
+        node = self
+        while node.divided:
+            child = node.child(circle)
+            if child is None or not child.fits(circle):
+                break
+            node = child
+        node.points.append(Object)
+        Object.quadnode = node
+        self.root.elements.add(Object)
+
+        if not node.divided and len(node.points) > node.capacity:
+            node.subdivide()
+            keep = []
+            for pnt in node.points: # Push down the objects small enough for a child
+                child = node.child(pnt.mincircle)
+                if child is not None and child.fits(pnt.mincircle):
+                    child.points.append(pnt)
+                    pnt.quadnode = child
+                else:
+                    keep.append(pnt)
+            node.points = keep
+
     def delpoint(self,Object):
         """
-        Removes an object from the quadtree.
+        Removes an object from the quadtree, using the handle to its leaf.
 
         Parameters:
             Object: Object to remove.
         """
-        if self.divided:
-            # Recursively searches for the point to destroy
-            self.northwest.delpoint(Object)
-            self.northeast.delpoint(Object)
-            self.southwest.delpoint(Object)
-            self.southeast.delpoint(Object)
-        else:
-            for elm in self.points:
-                if elm is Object:
-                    self.points.remove(elm)
+        node = getattr(Object, "quadnode", None)
+        if node is None or node.root is not self.root: # Not stored in this tree
+            return
+        node.points.remove(Object)
+        Object.quadnode = None
+        self.root.elements.discard(Object)
+        if node.parent is not None:
+            node.parent.merge()
+
+    def update(self, Object):
+        """
+        Keeps an object at the right place in the tree: inserts it if it is not stored yet and
+        relocates it only if the center of its bounds left its leaf.
+
+        Parameters:
+            Object: Object to update.
+        """
+        node = getattr(Object, "quadnode", None)
+        if node is not None and node.root is self.root and node.fits(Object.mincircle):
+            if not self.loose:
+                node.widen(Object.mincircle.radius)
+            return
+        self.delpoint(Object)
+        self.root.insert(Object)
+
+    def updateall(self, listofobjects):
+        """
+        Synchronises the tree with a list of objects: new objects are inserted, moved objects
+        relocated and objects missing from the list removed.
+
+        Parameters:
+            listofobjects (list): List of objects.
+        """
+        for elements in listofobjects:
+            self.update(elements)
+        for elements in self.root.elements.difference(listofobjects):
+            self.delpoint(elements)
+
+    def remove(self, Object):
+        """
+        Removes an object from the quadtree (Broadphase interface, see delpoint).
+
+        Parameters:
+            Object: Object to remove.
+        """
+        self.delpoint(Object)
             
     def query(self, Object, found=None):
         """
@@ -209,13 +414,16 @@ class Quadtree:
         """
         if found is None:
             found = []
-        if not self.boundary.intersect(Object.mincircle):
+        if self.loose:
+            # Objects stored here lie within the loose bounds, the root may hold objects of any size
+            if self.parent is not None and not self.looseboundary.intersect(Object.mincircle):
+                return found
+        elif not self.boundary.intersect(Object.mincircle, self.reach): # Stored circles spill out by at most the reach
             return
-        else:
-            # Add objects in this node that intersect with the query circle
-            for p in self.points:
-                if Object.mincircle.contains(p.mincircle):
-                    found.append(p)
+        # Add objects in this node that intersect with the query circle
+        for p in self.points:
+            if Object.mincircle.contains(p.mincircle):
+                found.append(p)
         if self.divided:
             # Recursively query child quadrants if subdivided
             self.northeast.query(Object, found)
@@ -236,20 +444,7 @@ class Quadtree:
 
     def searchelements(self,elements):
         """
-        Queries and removes all elements from the quadtree.
-
-        Parameters:
-            elements (list): List of objects to query.
-
-        Returns:
-            list: List of interactions for every object, for a given frame
-        """
-        interactions = []
-        for i in range(len(elements)):
-            temp = []
-            self.query(elements[i],temp)
-            interactions.append(temp)
-            # Deletes the element since the interactions with every other object is already calculated
-            self.delpoint(elements[i])
-        return interactions
-    
\ No newline at end of file
+        Lists the potential interactions of all elements, without modifying the quadtree.
+        Kept for compatibility, see Broadphase.pairs.
+        """
+        return self.pairs(elements)
@@ -0,0 +1,137 @@
+"""
+POLTERPHYSICS
+SpatialHash.py
+
+Implements a uniform spatial hash grid, a broadphase suited to scenes where most objects have
+about the same size.
+
+Features :
+- Unbounded grid of square cells stored in a dictionary
+- Objects registered in every cell overlapped by the box around their minimum enclosing circle
+- Objects only re-registered when the range of cells they cover changes
+- Circular range queries without duplicates
+
+Last Updated: May 2025
+Python Version: 3.12+
+Dependencies: math, objects.broadphase
+"""
+
+from math import floor
+from objects.broadphase import Broadphase
+
+class SpatialHashGrid(Broadphase):
+    """
+    Uniform grid hashing the objects into square cells.
+
+    Attributes:
+        cell_size (float): Side of a cell, ideally a bit larger than the typical object.
+        cells (dict): (column, row) -> list of the objects overlapping the cell.
+        handles (dict): Object -> range of cells (first column, first row, last column, last row) it is registered in.
+
+    Methods:
+        cellrange(circle): Returns the range of cells covered by a circle.
+        insert(Object): Registers an object in the cells it overlaps.
+        remove(Object): Unregisters an object.
+        update(Object): Re-registers an object if it covers other cells.
+        updateall(list): Synchronises the grid with a list of objects.
+        query(Object, found): Finds the objects whose bounds intersect the given object's mincircle.
+        pairs(list): Lists the potential interactions of every active object (see Broadphase).
+    """
+    def __init__(self, cell_size=150):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.handles = {}
+
+    def cellrange(self, circle):
+        """
+        Returns the range of cells covered by the bounding box of a circle.
+
+        Parameters:
+            circle (CircleQ): The circle.
+
+        Returns:
+            tuple: (first column, first row, last column, last row).
+        """
+        size = self.cell_size
+        return (floor((circle.x - circle.radius) / size), floor((circle.y - circle.radius) / size),
+                floor((circle.x + circle.radius) / size), floor((circle.y + circle.radius) / size))
+
+    def insert(self, Object):
+        """
+        Registers an object in every cell its mincircle overlaps.
+
+        Parameters:
+            Object: An object with a .mincircle attribute representing its bounds.
+        """
+        cells = self.cellrange(Object.mincircle)
+        for i in range(cells[0], cells[2] + 1):
+            for j in range(cells[1], cells[3] + 1):
+                self.cells.setdefault((i, j), []).append(Object)
+        self.handles[Object] = cells
+
+    def remove(self, Object):
+        """
+        Unregisters an object from the grid. Does nothing if the object is not stored.
+
+        Parameters:
+            Object: Object to remove.
+        """
+        cells = self.handles.pop(Object, None)
+        if cells is None:
+            return
+        for i in range(cells[0], cells[2] + 1):
+            for j in range(cells[1], cells[3] + 1):
+                cell = self.cells[(i, j)]
+                cell.remove(Object)
+                if not cell:
+                    del self.cells[(i, j)]
+
+    def update(self, Object):
+        """
+        Re-registers an object only if the range of cells it covers changed.
+
+        Parameters:
+            Object: Object to update.
+        """
+        if self.handles.get(Object) == self.cellrange(Object.mincircle):
+            return
+        self.remove(Object)
+        self.insert(Object)
+
+    def updateall(self, listofobjects):
+        """
+        Synchronises the grid with a list of objects: new objects are inserted, moved objects
+        re-registered and objects missing from the list removed.
+
+        Parameters:
+            listofobjects (list): List of objects.
+        """
+        for elements in listofobjects:
+            self.update(elements)
+        for elements in self.handles.keys() - set(listofobjects):
+            self.remove(elements)
+
+    def query(self, Object, found=None):
+        """
+        Finds all stored objects whose bounds intersect the given object's mincircle.
+
+        Parameters:
+            Object: The querying object with .mincircle (CircleQ).
+            found (list): Optional list to populate with results.
+
+        Returns:
+            list: List of matching objects, each reported once.
+        """
+        if found is None:
+            found = []
+        circle = Object.mincircle
+        cells = self.cellrange(circle)
+        seen = set()
+        for i in range(cells[0], cells[2] + 1):
+            for j in range(cells[1], cells[3] + 1):
+                for p in self.cells.get((i, j), ()):
+                    if p not in seen:
+                        seen.add(p)
+                        if circle.contains(p.mincircle):
+                            found.append(p)
+        return found
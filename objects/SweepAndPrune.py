@@ -0,0 +1,220 @@
+"""
+POLTERPHYSICS
+SweepAndPrune.py
+
+Implements a sweep-and-prune broadphase exploiting temporal coherence: objects move little from
+one frame to the next, so the sorted list of their bounds only needs a few local repairs.
+
+Features :
+- Sorted list of the x-extents of the objects' minimum enclosing circles
+- Insertion sort repairing the list each frame, in O(n + number of swaps)
+- Overlapping pairs created and retired by the swaps themselves, never recomputed from scratch
+- Circular range queries (e.g. mouse picking)
+
+Last Updated: May 2025
+Python Version: 3.12+
+Dependencies: objects.broadphase
+"""
+
+from objects.broadphase import Broadphase, can_collide
+
+class Endpoint:
+    """
+    One end of the x-extent of an object.
+
+    Attributes:
+        owner (Object): The object bounded by this endpoint.
+        ismin (bool): True for the left end, False for the right end.
+        value (float): Current x coordinate of the end.
+    """
+    def __init__(self, owner, ismin):
+        self.owner = owner
+        self.ismin = ismin
+        self.value = float("inf")
+
+
+class SweepAndPrune(Broadphase):
+    """
+    Sweep-and-prune along the x axis.
+
+    The endpoints of every object are kept sorted by x. When two adjacent endpoints swap, a left
+    end passing over a right end means two x-extents start to overlap, and a right end passing over
+    a left end means they stop to overlap: the set of overlapping pairs is maintained with the sort.
+    The pairs are then checked on their circles when they are reported.
+
+    Attributes:
+        endpoints (list): Endpoints of every object, sorted by value.
+        handles (dict): Object -> (left Endpoint, right Endpoint).
+        neighbours (dict): Object -> set of the objects whose x-extent overlaps its own.
+        order (dict): Object -> position in the scene, refreshed by pairs to sort the groups.
+
+    Methods:
+        refresh(Object): Copies the current bounds of an object into its endpoints.
+        sort(): Repairs the order of the endpoints and updates the overlapping pairs.
+        insert(Object): Inserts an object.
+        remove(Object): Removes an object.
+        update(Object): Updates an object after it moved.
+        updateall(list): Synchronises the structure with a list of objects.
+        query(Object, found): Finds the objects whose bounds intersect the given object's mincircle.
+        pairs(list): Lists the potential interactions of every active object (see Broadphase).
+    """
+    def __init__(self):
+        self.endpoints = []
+        self.handles = {}
+        self.neighbours = {}
+        self.order = {}
+
+    def refresh(self, Object):
+        """
+        Copies the current x-extent of an object's mincircle into its endpoints.
+
+        Parameters:
+            Object: A stored object.
+        """
+        left, right = self.handles[Object]
+        circle = Object.mincircle
+        left.value = circle.x - circle.radius
+        right.value = circle.x + circle.radius
+
+    def sort(self):
+        """
+        Repairs the order of the endpoints with an insertion sort. Every swap between a left and a
+        right endpoint of two objects creates or retires their pair.
+        """
+        endpoints = self.endpoints
+        for i in range(1, len(endpoints)):
+            current = endpoints[i]
+            j = i - 1
+            while j >= 0 and endpoints[j].value > current.value:
+                other = endpoints[j]
+                if current.ismin and not other.ismin:
+                    # A left end passed over a right end: the extents may now overlap
+                    if self.handles[other.owner][0].value <= self.handles[current.owner][1].value:
+                        self.neighbours[current.owner].add(other.owner)
+                        self.neighbours[other.owner].add(current.owner)
+                elif not current.ismin and other.ismin:
+                    # A right end passed over a left end: the extents no longer overlap
+                    self.neighbours[current.owner].discard(other.owner)
+                    self.neighbours[other.owner].discard(current.owner)
+                endpoints[j + 1] = other
+                j -= 1
+            endpoints[j + 1] = current
+
+    def insert(self, Object):
+        """
+        Inserts an object. Its endpoints enter the list at +infinity and are sorted into place,
+        which creates its pairs.
+
+        Parameters:
+            Object: An object with a .mincircle attribute representing its bounds.
+        """
+        if Object in self.handles:
+            return
+        self.handles[Object] = (Endpoint(Object, True), Endpoint(Object, False))
+        self.neighbours[Object] = set()
+        self.order[Object] = -1 # Until pairs finds it in the scene
+        self.endpoints.extend(self.handles[Object])
+        self.refresh(Object)
+        self.sort()
+
+    def remove(self, Object):
+        """
+        Removes an object and retires its pairs. Does nothing if the object is not stored.
+
+        Parameters:
+            Object: Object to remove.
+        """
+        handle = self.handles.pop(Object, None)
+        if handle is None:
+            return
+        self.endpoints.remove(handle[0])
+        self.endpoints.remove(handle[1])
+        self.order.pop(Object, None)
+        for other in self.neighbours.pop(Object):
+            self.neighbours[other].discard(Object)
+
+    def update(self, Object):
+        """
+        Updates an object after its mincircle changed (inserts it if it is not stored yet).
+
+        Parameters:
+            Object: Object to update.
+        """
+        if Object not in self.handles:
+            self.insert(Object)
+            return
+        self.refresh(Object)
+        self.sort()
+
+    def updateall(self, listofobjects):
+        """
+        Synchronises the structure with a list of objects: objects missing from the list are
+        removed, then every endpoint is refreshed and a single sort repairs the order and the pairs.
+
+        Parameters:
+            listofobjects (list): List of objects.
+        """
+        for elements in self.handles.keys() - set(listofobjects):
+            self.remove(elements)
+        for elements in listofobjects:
+            if elements not in self.handles:
+                # Sorted into place with everything else below
+                self.handles[elements] = (Endpoint(elements, True), Endpoint(elements, False))
+                self.neighbours[elements] = set()
+                self.order[elements] = -1 # Until pairs finds it in the scene
+                self.endpoints.extend(self.handles[elements])
+            self.refresh(elements)
+        self.sort()
+
+    def query(self, Object, found=None):
+        """
+        Finds all stored objects whose bounds intersect the given object's mincircle.
+
+        Parameters:
+            Object: The querying object with .mincircle (CircleQ).
+            found (list): Optional list to populate with results.
+
+        Returns:
+            list: List of matching objects.
+        """
+        if found is None:
+            found = []
+        circle = Object.mincircle
+        right = circle.x + circle.radius
+        for endpoint in self.endpoints:
+            if endpoint.value > right:
+                break
+            if endpoint.ismin and circle.contains(endpoint.owner.mincircle):
+                found.append(endpoint.owner)
+        return found
+
+    def pairs(self, elements):
+        """
+        Lists the potential interactions of all elements from the maintained pairs, without
+        querying the structure. Same conventions as Broadphase.pairs.
+
+        Parameters:
+            elements (list): List of objects (stored in the structure) to report.
+
+        Returns:
+            list: List of interactions for every active object, for a given frame.
+        """
+        buffers = self.pairbuffers()
+        done = buffers.done
+        found = buffers.found
+        order = self.order
+        for i, element in enumerate(elements):
+            order[element] = i
+        for element in elements:
+            if not element.active or element not in self.neighbours:
+                continue
+            circle = element.mincircle
+            found.clear()
+            for other in self.neighbours[element]:
+                if other not in done and can_collide(element, other) and circle.contains(other.mincircle):
+                    found.append(other)
+            found.sort(key=order.get) # Sets have no stable order, keep the order of the scene
+            group = buffers.group(element)
+            group.extend(found)
+            done.add(element)
+        return buffers.interactions
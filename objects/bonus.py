@@ -39,7 +39,9 @@ class Bonus:
         # Load and scale the Bonus image
         for i in range (0, len(sprites_utils.phantoms_names)):
             if (sprites_utils.phantoms_names[i] == target) :
-                self.image = pygame.image.load(self.sprite_path[i]).convert_alpha()
+                self.image = pygame.image.load(self.sprite_path[i])
+                if pygame.display.get_surface() is not None: # Headless worlds (core/world.py) have no display
+                    self.image = self.image.convert_alpha()
                 self.image = pygame.transform.scale(self.image, (100, 100))
         
         # Define the position of the image on screen
@@ -67,6 +69,17 @@ class Bonus:
         """
         if self.enabled :
             self.display(screen)
+        self.detect(objects)
+
+    def detect(self, objects):
+        """
+        Sets `detected` to True if the associated object is within detection radius, without drawing.
+        The object can then be shot once more, and the bonus is disabled.
+
+        Parameters:
+        objects (list): List of game objects to check for interaction.
+        """
+        if self.enabled :
             for object in objects:
                 if object.name == self.target:
                     if self.center.distance_to(object.shape.centroid) <= self.detection_radius:
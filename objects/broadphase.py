@@ -0,0 +1,247 @@
+"""
+POLTERPHYSICS
+broadphase.py
+
+Defines the interface shared by the broadphase structures, which find the pairs of objects
+that may collide before the narrowphase (GJK/EPA) tests them.
+
+Features :
+- Broadphase abstract base class: insert, update, remove, updateall, query and pair generation
+- Shared pair generation skipping static and sleeping pairs
+- Pair lists reused from one frame to the next (PairBuffers)
+- Rejection of the pairs filtered out by the collision categories and masks
+- Creation of a broadphase from its description in levels.json
+
+Last Updated: May 2025
+Python Version: 3.12+
+Dependencies: abc, objects.Quadtree, objects.FlatQuadtree, objects.SpatialHash, objects.SweepAndPrune, objects.AABBTree (loaded on demand)
+"""
+
+from abc import ABC, abstractmethod
+
+# Area covered by the broadphase structures that need bounds
+WORLD_BOUNDS = (-1000, -1000, 3400, 2200)
+
+# Used by the levels that do not describe their broadphase
+DEFAULT_BROADPHASE = {"type": "flatquadtree", "capacity": 20, "loose": True}
+
+
+def can_collide(a, b):
+    """
+    Checks the collision categories and masks of two objects (see objects/object.py).
+
+    Returns:
+        bool: True if each object's category is in the other object's mask.
+    """
+    return (a.category & b.mask) != 0 and (b.category & a.mask) != 0
+
+
+class PairBuffers:
+    """
+    Containers filled by Broadphase.pairs, kept by the structure and reused at every call, so that
+    listing the pairs does not create new lists and sets every frame.
+
+    Attributes:
+        interactions (list): Groups reported by the last call.
+        groups (list): Every group list created so far, reused in order.
+        done (set): Active objects already reported during the current call.
+        found (list): Results of the current query.
+
+    Methods:
+        reset(): Empties the buffers before a new call.
+        group(Object): Starts the next group with the queried object.
+    """
+    __slots__ = ("interactions", "groups", "done", "found")
+
+    def __init__(self):
+        self.interactions = []
+        self.groups = []
+        self.done = set()
+        self.found = []
+
+    def reset(self):
+        """
+        Empties the buffers before a new call. The groups are emptied when they are reused, and
+        the objects of the last call are discarded one by one, which keeps the table of the set.
+        """
+        done = self.done
+        for group in self.interactions:
+            done.discard(group[0])
+        self.interactions.clear()
+
+    def group(self, Object):
+        """
+        Starts the next group with the queried object and adds it to the interactions.
+
+        Parameters:
+            Object: The queried object.
+
+        Returns:
+            list: The group, to be completed with the objects it may touch.
+        """
+        interactions = self.interactions
+        groups = self.groups
+        if len(interactions) == len(groups):
+            groups.append([])
+        group = groups[len(interactions)]
+        group.clear()
+        group.append(Object)
+        interactions.append(group)
+        return group
+
+
+class Broadphase(ABC):
+    """
+    Interface of a broadphase structure. Objects are described by their minimum enclosing
+    circle (`Object.mincircle`, a CircleQ) and are kept from one frame to the next.
+
+    A structure must implement insert, update, remove, updateall and query: an incomplete one
+    raises a TypeError when it is created. pairs is shared and may be overridden.
+
+    A query must report every stored object whose circle intersects the circle of the queried
+    object: pairs are only looked for from the active objects, which must therefore find the
+    static and sleeping objects they touch however large these are (see benchmarks/broadphase_check.py).
+
+    Methods:
+        insert(Object): Inserts an object.
+        update(Object): Moves an object after its mincircle changed (inserts it if needed).
+        remove(Object): Removes an object.
+        updateall(list): Synchronises the structure with the objects of the scene.
+        query(Object, found): Lists the stored objects whose mincircle intersects the object's.
+        pairs(list): Lists the potential interactions of every active object.
+        pairbuffers(): Returns the reused containers of pairs, emptied.
+    """
+    __slots__ = ("buffers",) # Lets slot-based structures (e.g. Quadtree nodes) stay without a __dict__
+
+    @abstractmethod
+    def insert(self, Object):
+        """
+        Inserts an object.
+
+        Parameters:
+            Object: An object with a .mincircle attribute representing its bounds.
+        """
+
+    @abstractmethod
+    def update(self, Object):
+        """
+        Moves an object after its mincircle changed, and inserts it if it is not stored yet.
+
+        Parameters:
+            Object: The object that moved.
+        """
+
+    @abstractmethod
+    def remove(self, Object):
+        """
+        Removes an object. Does nothing if the object is not stored.
+
+        Parameters:
+            Object: Object to remove.
+        """
+
+    @abstractmethod
+    def updateall(self, listofobjects):
+        """
+        Synchronises the structure with the objects of the scene: inserts the new ones, moves the
+        others and removes the objects that left the list.
+
+        Parameters:
+            listofobjects (list): Every object of the scene.
+        """
+
+    @abstractmethod
+    def query(self, Object, found=None):
+        """
+        Lists the stored objects whose mincircle intersects the object's (the object itself included
+        if it is stored).
+
+        Parameters:
+            Object: The querying object with .mincircle (CircleQ).
+            found (list): Optional list to populate with results.
+
+        Returns:
+            list: The objects found (the quadtrees only return it when `found` is None).
+        """
+
+    def pairbuffers(self):
+        """
+        Returns the containers reused by pairs, created at the first call.
+
+        Returns:
+            PairBuffers: The buffers of the structure, emptied.
+        """
+        buffers = getattr(self, "buffers", None)
+        if buffers is None:
+            buffers = self.buffers = PairBuffers()
+        buffers.reset()
+        return buffers
+
+    def pairs(self, elements):
+        """
+        Lists the potential interactions of all elements, without modifying the structure.
+
+        Only active (awake and grabable) elements query the structure: pairs made of two static
+        or sleeping elements are never generated, nor the pairs rejected by the collision masks,
+        so no narrowphase work is spent on them. An active element is not reported again by the
+        active elements queried after it, so that every pair is reported once.
+
+        The returned lists are reused by the next call (see PairBuffers): they must be consumed
+        before the structure lists the pairs again.
+
+        Parameters:
+            elements (list): List of objects to query.
+
+        Returns:
+            list: List of interactions for every active object, for a given frame.
+                  Each group starts with the queried object, followed by the objects it may touch.
+        """
+        buffers = self.pairbuffers()
+        done = buffers.done
+        found = buffers.found
+        for element in elements:
+            if not element.active:
+                continue
+            found.clear()
+            self.query(element, found)
+            group = buffers.group(element)
+            for other in found:
+                if other is not element and other not in done and can_collide(element, other):
+                    group.append(other)
+            done.add(element)
+        return buffers.interactions
+
+
+def create_broadphase(config=None):
+    """
+    Creates a broadphase structure from its description in levels.json, e.g.
+    {"type": "quadtree", "capacity": 20, "loose": true}, {"type": "flatquadtree", "capacity": 20, "loose": true},
+    {"type": "grid", "cell_size": 150},
+    {"type": "sap"} or {"type": "aabbtree", "margin": 10}.
+
+    Parameters:
+        config (dict, optional): Description of the broadphase. Default is DEFAULT_BROADPHASE.
+
+    Returns:
+        Broadphase: The new, empty structure.
+    """
+    from objects.Quadtree import Quadtree, RectangleQ
+    from objects.FlatQuadtree import FlatQuadtree
+    from objects.SpatialHash import SpatialHashGrid
+    from objects.SweepAndPrune import SweepAndPrune
+    from objects.AABBTree import AABBTree
+
+    if config is None:
+        config = DEFAULT_BROADPHASE
+    match config["type"]:
+        case "quadtree":
+            return Quadtree(RectangleQ(*WORLD_BOUNDS), config.get("capacity", 20), loose=config.get("loose", False))
+        case "flatquadtree":
+            return FlatQuadtree(RectangleQ(*WORLD_BOUNDS), config.get("capacity", 20), loose=config.get("loose", False))
+        case "grid":
+            return SpatialHashGrid(config.get("cell_size", 150))
+        case "sap":
+            return SweepAndPrune()
+        case "aabbtree":
+            return AABBTree(config.get("margin", 10))
+    raise ValueError("Unknown broadphase type: {}".format(config["type"]))
@@ -36,7 +36,9 @@ class Key:
         # Load and scale the key image
         for i in range (0, len(sprites_utils.phantoms_names)):
             if (sprites_utils.phantoms_names[i] == end_object_name) :
-                self.image = pygame.image.load(self.sprite_path[i]).convert_alpha()
+                self.image = pygame.image.load(self.sprite_path[i])
+                if pygame.display.get_surface() is not None: # Headless worlds (core/world.py) have no display
+                    self.image = self.image.convert_alpha()
                 self.image = pygame.transform.scale(self.image, (100, 100))
         
         # Define the position of the image on screen
@@ -63,6 +65,15 @@ class Key:
         screen (pygame.Surface): Surface on which to draw the key.
         """
         self.display(screen)
+        self.detect(objects)
+
+    def detect(self, objects):
+        """
+        Sets `detected` to True if the associated object is within detection radius, without drawing.
+
+        Parameters:
+        objects (list): List of game objects to check for interaction.
+        """
         for object in objects:
             if object.name == self.end_object_name:
                 if self.center.distance_to(object.shape.centroid) <= self.detection_radius:
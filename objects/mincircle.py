@@ -7,16 +7,21 @@ A module for computing the Minimum Enclosing Circle (MEC) using Welzl's algorith
 Features :  
 - Support for points and circles in 2D space  
 - Computation of exact MEC for 1-3 points  
-- Recursive randomized algorithm (Welzl's) for larger sets  
-- Output in polar coordinates relative to a shape's centroid  
+- Iterative randomized algorithm (Welzl's, with the move-to-front heuristic) for larger sets  
+- MEC of local-frame point sets memoized by the set of points  
 
 Last Updated: May 2025
 Python Version: 3.12+
-Dependencies: math, random  
+Dependencies: math, random, functools  
 """
 
 import math
 import random
+from functools import lru_cache
+
+EPSILON = 1e-7 # Tolerance of the point-in-circle test, for the points lying on the boundary
+MEMO_SIZE = 1024 # Distinct point sets whose MEC is remembered
+MEMO_DIGITS = 6 # Rounding of the points identifying a set
 
 class Point:
     """
@@ -66,7 +71,7 @@ def isInside(c, p):
     Returns:
         bool: True if point is inside or on the circle, False otherwise.
     """
-    return dist(c.c, p) <= c.r
+    return dist(c.c, p) <= c.r + EPSILON
 
 def getCircleCenter(bx, by, cx, cy):
     """
@@ -157,63 +162,80 @@ def minCircleTrivial(p):
                 return c
     return circleFrom(p[0], p[1], p[2])
 
-def welzlHelper(p, r, n):
+def circleOnBoundary(a, b, c):
     """
-    Recursive helper for Welzl's algorithm.
+    Computes the smallest circle with a and b on its boundary that encloses c.
 
     Parameters:
-        p (list of Point): Points to process.
-        r (list of Point): Boundary points of the MEC.
-        n (int): Current number of points considered in p.
+        a (Point): First boundary point.
+        b (Point): Second boundary point.
+        c (Point): Point to enclose.
 
     Returns:
-        Circle: The MEC for the given subset of points.
+        Circle: The circle through the three points, or the smallest circle around them if they are aligned.
     """
-    if n == 0 or len(r) == 3:
-        return minCircleTrivial(r[:])  # Ensure we pass a copy
-
-    # Randomly select a point to exclude
-    idx = random.randint(0, n - 1)
-    pnt = p[idx]
-    p[idx], p[n - 1] = p[n - 1], p[idx]
-    # Recurse without pnt
-    d = welzlHelper(p, r, n - 1)
+    if (b.x - a.x) * (c.y - a.y) - (b.y - a.y) * (c.x - a.x) == 0:
+        return minCircleTrivial([a, b, c])
+    return circleFrom(a, b, c)
 
-    if isInside(d, pnt):
-        return d
+def moveToFront(p):
+    """
+    Iterative Welzl's algorithm with the move-to-front heuristic: the points found outside the
+    current circle are moved to the front of the list, where the next passes meet them first.
 
-    return welzlHelper(p, r + [pnt], n - 1)  # Append without modifying original r
+    Parameters:
+        p (list of Point): Points to enclose, reordered in place.
 
-def welzl(shape):
+    Returns:
+        Circle: The MEC of the points.
     """
-    Computes the minimum enclosing circle of a shape using Welzl's algorithm.
+    c = Circle(Point(0, 0), 0)
+    if not p:
+        return c
+    c = Circle(p[0], 0)
+    for i in range(1, len(p)):
+        a = p[i]
+        if isInside(c, a):
+            continue
+        # a is on the boundary of the MEC of p[:i + 1]
+        c = Circle(a, 0)
+        for j in range(i):
+            b = p[j]
+            if isInside(c, b):
+                continue
+            # a and b are on the boundary of the MEC of p[:j + 1] and a
+            c = circleFromTwo(a, b)
+            for k in range(j):
+                if not isInside(c, p[k]):
+                    c = circleOnBoundary(a, b, p[k])
+        p.insert(0, p.pop(i))
+    return c
+
+@lru_cache(maxsize=MEMO_SIZE)
+def memoized(points):
+    """
+    MEC of a set of points, computed once for every distinct set.
 
     Parameters:
-        shape (object): An object with a .vertices attribute (list of Points).
+        points (frozenset of tuple): (x, y) points.
 
     Returns:
-        Circle: The minimum enclosing circle.
+        tuple: (x, y, radius) of the MEC.
     """
-    polygon = list(shape.vertices)
-    random.shuffle(polygon)
-    return welzlHelper(polygon, [], len(polygon))
+    p = [Point(x, y) for x, y in points]
+    random.shuffle(p)
+    c = moveToFront(p)
+    return (c.c.x, c.c.y, c.r)
 
-def convert(shape):
+def enclose(points):
     """
-    Converts the MEC of a shape to polar coordinates relative to the centroid of the shape it encloses
+    Computes the MEC of points given in the local frame of a shape. Shapes sharing the same
+    vertices (e.g. the same object in several levels, or a restarted level) share the result.
 
     Parameters:
-        shape (object): An object.
+        points (iterable of tuple): (x, y) points, e.g. the local vertices of a polygon.
 
     Returns:
-        tuple: (Circle, float radius, float angle in radians)
+        tuple: (x, y, radius) of the MEC.
     """
-    mec = welzl(shape)
-    dx = mec.c.x - shape.centroid.x
-    dy = mec.c.y - shape.centroid.y
-    r = math.hypot(dx,dy)
-    theta = math.atan2(dy,dx)
-    # Returns the relative distance to the centroid of the object and the angle relative to the centroid of the object
-    return (mec,r,theta)
-
-
+    return memoized(frozenset((round(x, MEMO_DIGITS), round(y, MEMO_DIGITS)) for x, y in points))
@@ -8,6 +8,12 @@ Features include:
 - Application of forces (including gravity)
 - Handling of damping and velocity limits
 - Collision detection with a ground level and bounce effect
+- Collision categories and masks filtering the pairs of objects that may collide
+- Hill-climbing support queries on large convex polygons
+- Body-local polygon vertices, transformed to world space lazily when read after a move
+- Cached area, inertia, bounding box and minimum enclosing circle, forgotten only when the shape is edited
+- Trig-free bounding volume updates from the rotation cached for the vertices
+- Compact slot-based objects and shapes, sharing immutable defaults instead of per-object lists
 
 Last Updated: May 2025
 Python Version: 3.12+
@@ -17,9 +23,19 @@ Dependencies: math, pygame.math.Vector2, core.collision, objects.mincircle, obje
 import pygame
 from pygame.math import Vector2
 from core.collision import * 
-from objects.mincircle import convert
+from objects.mincircle import enclose
 from objects.Quadtree import CircleQ
 
+# Collision categories (bit flags). An object collides with another one if each object's
+# category is in the other object's mask.
+STATIC = 0x0001
+DYNAMIC = 0x0002
+ALL_CATEGORIES = 0xFFFF
+
+HILL_CLIMB_VERTICES = 6 # Smaller polygons are scanned entirely by support queries
+
+NO_VECTOR = (0, 0) # Mouse position and applied vector of the objects the player has not touched
+
 class Object:
     """
     A class representing a physical object with mass, velocity, and rotation.
@@ -27,8 +43,11 @@ class Object:
     Attributes:
         TO UPDATE
     """
+    __slots__ = ("name", "polygon", "restitution_coefficient", "grabable", "mouse", "applied_coords", "applied_angle",
+                 "simulated", "zone", "playable", "sleeping", "sleep_time", "island", "quadnode", "category", "mask",
+                 "ccd", "shape", "mincircle")
     
-    def __init__(self, polygon=True, grabable =False, mass=1, restitution_coefficient=0.8, vertices=None, radius=None, centroid=None,name='Object', mouse=[0,0], applied_coords =[0,0], applied_angle = 500, simulated =[], zone =[], playable = True):
+    def __init__(self, polygon=True, grabable =False, mass=1, restitution_coefficient=0.8, vertices=None, radius=None, centroid=None,name='Object', mouse=None, applied_coords =None, applied_angle = 500, simulated =None, zone =None, playable = True, category = None, mask = None, ccd = False):
         """
         Initializes an Object instance with the specified properties.
 
@@ -39,80 +58,334 @@ class Object:
         self.polygon = polygon
         self.restitution_coefficient = restitution_coefficient
         self.grabable = grabable
-        self.mouse = mouse
-        self.applied_coords = applied_coords
+        # Only ever replaced, never edited in place (see utils/vector_utils.py): objects without a vector share NO_VECTOR
+        self.mouse = tuple(mouse) if mouse and any(mouse) else NO_VECTOR
+        self.applied_coords = tuple(applied_coords) if applied_coords and any(applied_coords) else NO_VECTOR
         self.applied_angle = applied_angle
-        self.simulated = simulated
-        self.zone = zone
+        # Only ever replaced, never edited in place: an empty tuple can be shared
+        self.simulated = list(simulated) if simulated else ()
+        self.zone = list(zone) if zone else ()
         self.playable = True
+        self.sleeping = False # Sleeping objects are neither integrated nor tested against static or sleeping objects
+        self.sleep_time = 0 # Time spent below the sleep velocity thresholds
+        self.island = None # Objects put to sleep together, woken up together
+        self.quadnode = None # Leaf of the quadtree holding the object
+        # By default grabable objects collide with everything and static objects never collide with each other
+        self.category = category if category is not None else (DYNAMIC if grabable else STATIC)
+        self.mask = mask if mask is not None else (ALL_CATEGORIES if grabable else ALL_CATEGORIES & ~STATIC)
+        self.ccd = ccd # Fast motions are swept against the static objects instead of jumping through thin ones (see core/ccd.py)
         if polygon :
             self.shape = Polygon(vertices, mass)
         else :
             self.shape = Circle(centroid, radius, mass)
-        temp = self.minimumcircle()
-        self.mincircle = temp[0]
-        self.mincircledist = temp[1]
-        self.mincircleangle = temp[2]
+        self.mincircle = self.minimumcircle()
 
     def minimumcircle(self):
         """
-        Computes the minimum enclosing circle for a shape.
-
-        If the shape has a radius attribute (i.e., is a circle), uses that directly.
-        Otherwise, uses a conversion utility to determine the circle.
+        Places the minimum enclosing circle cached by the shape (see `bounding_circle`) around it.
 
         Returns:
-        tuple: (CircleQ object, distance from the MEC to the centroid of the object, angle from the MEC center to the centroid of the object)
+        CircleQ: The minimum enclosing circle of the object, in world space.
         """
-        if hasattr(self.shape,'radius'):
-            return (CircleQ(self.shape.centroid.x,self.shape.centroid.y,self.shape.radius),0,0)
-        else:
-            temp = convert(self.shape)
-            return (CircleQ(temp[0].c.x,temp[0].c.y,temp[0].r),temp[1],temp[2])
+        # The circle is cached by the shape in its local frame, only its pose has to be applied
+        x, y, radius = self.shape.bounding_circle
+        c, s = self.shape.rotation
+        centroid = self.shape.centroid
+        return CircleQ(centroid.x + x * c - y * s, centroid.y + x * s + y * c, radius)
     
+    @property
+    def active(self):
+        """
+        Returns:
+        bool: True if the object is grabable and awake, i.e. moved by the physics engine.
+        """
+        return self.grabable and not self.sleeping
+
+    def sleep(self, island=None):
+        """
+        Puts the object to sleep with the rest of its contact island.
+
+        Parameters:
+        island (list, optional): Objects touching each other that fall asleep together.
+        """
+        self.sleeping = True
+        self.island = island
+        self.shape.velocity = Vector2(0,0)
+        self.shape.angular_velocity = 0
+        if self.shape.store is not None:
+            self.shape.store.set_dynamic(self.shape.index, False)
+
+    def wake(self):
+        """
+        Wakes the object up, along with every object of the island it fell asleep with.
+        """
+        for obj in (self.island or [self]):
+            obj.sleeping = False
+            obj.sleep_time = 0
+            obj.island = None
+            if obj.shape.store is not None:
+                obj.shape.store.set_dynamic(obj.shape.index, obj.grabable)
+
     def updatemc(self,dt):
         """
-        Updates the position of the minimum enclosing circle over time based on angular motion.
+        Moves the minimum enclosing circle with the shape.
+        The local center of the circle is turned by the rotation the shape caches for its vertices,
+        so no trigonometry is needed here.
 
         Parameters:
         dt (float): Time step for the update.
         """
-        self.mincircleangle = (self.mincircleangle + (self.shape.angular_velocity * dt))%(2*pi)
-        self.mincircle.x = self.shape.centroid.x + self.mincircledist * cos(self.mincircleangle)
-        self.mincircle.y = self.shape.centroid.y + self.mincircledist * sin(self.mincircleangle)
+        x, y, _ = self.shape.bounding_circle
+        c, s = self.shape.rotation
+        centroid = self.shape.centroid
+        self.mincircle.x = centroid.x + x * c - y * s
+        self.mincircle.y = centroid.y + x * s + y * c
+
+
+
+class Shape:
+    """
+    Base class holding the rigid body state shared by Polygon and Circle.
+
+    The centroid, velocity and angular velocity live on the shape itself until the shape is
+    bound to a BodyStore. From then on they are read from and written to the store's arrays,
+    so `Object.shape` keeps exposing the same attributes whichever backend integrates it.
+
+    Only whole-value assignments reach the store: once bound, `centroid`, `velocity` and the
+    polygon `vertices` are copies of the arrays, so editing them in place (`velocity.x = 0`,
+    `centroid.update(...)`, `vertices[0].x += 1`) is silently lost. Assign a new value instead
+    (`velocity = Vector2(0, velocity.y)`); augmented assignments such as `velocity += dv` go
+    through the setters and are safe.
+
+    Attributes:
+        centroid (Vector2): The center of mass of the shape.
+        velocity (Vector2): The linear velocity of the shape.
+        angular_velocity (float): The angular velocity of the shape.
+        mass (float): The mass of the shape.
+        store (BodyStore or None): Array store the shape is bound to, if any.
+        index (int): Row of the shape in the store's arrays (-1 when unbound).
+        previous (Vector2): Centroid at the previous physics step, used to interpolate the rendering.
+    """
+    __slots__ = ("store", "index", "_centroid", "_velocity", "_angular_velocity", "mass", "previous")
+
+    def __init__(self, centroid, mass):
+        self.store = None
+        self.index = -1
+        self._centroid = Vector2(centroid) # Never shared with the caller, it is moved in place
+        self._velocity = Vector2(0,0)
+        self._angular_velocity = 0
+        self.mass = mass
+        self.previous = Vector2(centroid)
+
+    def save_state(self):
+        """
+        Remembers the current centroid before a physics step.
+        """
+        self.previous = Vector2(self.centroid)
+
+    def render_offset(self, alpha):
+        """
+        Returns the translation to apply when drawing the shape between two physics steps.
+
+        Parameters:
+        alpha (float): Fraction of a step elapsed since the current physics state (1 = current state).
+
+        Returns:
+        Vector2: Offset from the current centroid to the interpolated one.
+        """
+        return (self.previous - self.centroid) * (1 - alpha)
+
+    @property
+    def centroid(self):
+        if self.store is None:
+            return self._centroid
+        positions = self.store.positions
+        return Vector2(positions[self.index, 0], positions[self.index, 1])
 
+    @centroid.setter
+    def centroid(self, value):
+        if self.store is None:
+            self._centroid = value
+        else:
+            self.store.positions[self.index] = (value[0], value[1])
+
+    @property
+    def velocity(self):
+        if self.store is None:
+            return self._velocity
+        velocities = self.store.velocities
+        return Vector2(velocities[self.index, 0], velocities[self.index, 1])
+
+    @velocity.setter
+    def velocity(self, value):
+        if self.store is None:
+            self._velocity = value
+        else:
+            self.store.velocities[self.index] = (value[0], value[1])
+
+    @property
+    def angular_velocity(self):
+        if self.store is None:
+            return self._angular_velocity
+        return float(self.store.angular_velocities[self.index])
+
+    @angular_velocity.setter
+    def angular_velocity(self, value):
+        if self.store is None:
+            self._angular_velocity = value
+        else:
+            self.store.angular_velocities[self.index] = value
 
 
-class Polygon:
+class Polygon(Shape):
     """
     A class representing a 2D polygon used in physics simulation.
 
     Attributes:
-        vertices (list[Vector2]): The list of vertices of the polygon.
+        vertices (list[Vector2]): World-space vertices, transformed from the local ones only when asked for after a move.
+                                  Read-only: edit the shape by assigning a new list (see Shape).
+        local (tuple of Vector2): Body-local vertices, offsets from the centroid at angle 0, never edited in place.
+        angle (float): Rotation of the polygon from its local frame, in radians (kept by the BodyStore while bound).
+        rotation (tuple): Cosine and sine of the angle, computed once per new angle.
         length (int): The number of vertices.
         centroid (Vector2): The center of mass of the polygon.
         angular_velocity (float): The angular velocity of the polygon.
         mass (float): The mass of the polygon.
-        inertia (float): The rotational inertia of the polygon.
+        inertia (float): The rotational inertia of the polygon (cached).
+        area (float): The area of the polygon (cached).
+        aabb (tuple): World bounding box (min x, min y, max x, max y), cached until the polygon moves.
+        bounding_circle (tuple): Minimum enclosing circle in the local frame (x, y, radius), cached.
         velocity (Vector2): The linear velocity of the polygon.
+        kind (str): Shape type used to pick the collider ("polygon").
+        climbs (bool): Whether support queries hill-climb (convex polygon with at least HILL_CLIMB_VERTICES vertices).
+        support_cache (list of int or None): Last furthest vertex found for each eighth of the directions (climbing polygons only).
 
     Methods:
         calculate_inertia(): Computes and returns the moment of inertia.
+        edited(): Forgets the cached geometry after an edit of the shape.
         center(): Calculates the centroid of the polygon.
         rotate(rad): Rotates the polygon by the specified radians.
         add(vector): Translates the polygon by a given vector.
-        draw(surface, color): Draws the polygon on a Pygame surface.
-        support(direction): Returns the furthest point in the specified direction.
+        draw(surface, color, alpha): Draws the polygon on a Pygame surface.
+        support(direction): Returns the furthest point in the specified direction (hill climbing on large convex polygons).
+        support_index(direction): Returns the index of that point.
         apply_force(force): Modifies velocity based on the applied force.
     """
-    def __init__(self, vertices=[], mass=1):
-        self.vertices = vertices
+    kind = "polygon"
+    __slots__ = ("_generation", "length", "_angle", "_rotation", "_turned", "_world", "_moved", "local",
+                 "_area", "_unit_inertia", "_bounding_circle", "_aabb", "climbs", "support_cache")
+
+    def __init__(self, vertices=None, mass=1):
+        if vertices is None:
+            vertices = []
+        Shape.__init__(self, Vector2(0,0), mass)
+        self._generation = -1
         self.length = len(vertices)
+        self.angle = 0
+        self._rotation = (1.0, 0.0)
+        self._turned = False
+        self._world = vertices
+        self._moved = False
         self.centroid = self.center()
-        self.angular_velocity = 0
-        self.mass = mass
-        self.inertia = self.calculate_inertia()
-        self.velocity = Vector2(0,0)
+        self.vertices = vertices # Body-local frame around the centroid
+        self.save_state()
+
+    @property
+    def vertices(self):
+        if self.store is not None:
+            # Vertices are materialised from the store's array only when the store has moved them
+            if self._generation != self.store.generation:
+                self._world = self.store.polygon_vertices(self.index)
+                self._generation = self.store.generation
+            return self._world
+        # World vertices are only transformed when asked for after a move
+        if self._moved:
+            c, s = self.rotation
+            cx, cy = self.centroid
+            self._world = [Vector2(cx + v.x * c - v.y * s, cy + v.x * s + v.y * c) for v in self.local]
+            self._moved = False
+        return self._world
+
+    @vertices.setter
+    def vertices(self, value):
+        # The given world vertices become the local frame, at the current centroid and no angle
+        cx, cy = self.centroid
+        self.local = tuple(Vector2(v[0] - cx, v[1] - cy) for v in value) # Vector2s hold their coordinates unboxed
+        self.angle = 0
+        self._rotation = (1.0, 0.0)
+        self._turned = False
+        self._world = list(value)
+        self._moved = False
+        self.length = len(self.local)
+        self.edited()
+
+    def edited(self):
+        """
+        Forgets the derived geometry after an edit of the shape itself (not after a move).
+        """
+        self._area = None
+        self._unit_inertia = None
+        self._bounding_circle = None
+        self._aabb = None
+        # Convex polygons with enough vertices answer support queries by hill climbing along
+        # adjacent vertices, from the last answer given for a similar direction
+        self.climbs = self.length >= HILL_CLIMB_VERTICES and is_convex(self.local)
+        self.support_cache = [0] * 8 if self.climbs else None
+
+    @property
+    def angle(self):
+        if self.store is None:
+            return self._angle
+        return float(self.store.angles[self.index])
+
+    @angle.setter
+    def angle(self, value):
+        if self.store is None:
+            self._angle = value
+            self._moved = True
+            self._turned = True
+            self._aabb = None
+        else:
+            self.store.angles[self.index] = value
+
+    @property
+    def rotation(self):
+        if self.store is not None:
+            angle = self.angle
+            return (cos(angle), sin(angle))
+        # Computed once per new angle, shared by the vertices and the bounding circle
+        if self._turned:
+            self._rotation = (cos(self._angle), sin(self._angle))
+            self._turned = False
+        return self._rotation
+
+    @property
+    def area(self):
+        if self._area is None:
+            self._area = abs(sum(x0 * y1 - x1 * y0 for (x0, y0), (x1, y1) in zip(self.local, self.local[1:] + self.local[:1]))) / 2
+        return self._area
+
+    @property
+    def inertia(self):
+        # Cached for a unit mass, so that the mass can change without invalidating it
+        if self._unit_inertia is None:
+            self._unit_inertia = self.calculate_inertia() / self.mass if self.mass else 0
+        return self.mass * self._unit_inertia
+
+    @property
+    def aabb(self):
+        if self._aabb is None or self.store is not None:
+            vertices = self.vertices
+            xs = [v.x for v in vertices]
+            ys = [v.y for v in vertices]
+            self._aabb = (min(xs), min(ys), max(xs), max(ys))
+        return self._aabb
+
+    @property
+    def bounding_circle(self):
+        if self._bounding_circle is None:
+            self._bounding_circle = enclose(self.local)
+        return self._bounding_circle
 
     def calculate_inertia(self):
         """
@@ -124,9 +397,10 @@ class Polygon:
         I = 0
         A_total = 0
 
+        # Local vertices are already relative to the centroid
         for i in range(self.length):
             j = (i+1) % self.length
-            v1, v2 = self.vertices[i] - self.centroid, self.vertices[j] - self.centroid
+            v1, v2 = Vector2(self.local[i]), Vector2(self.local[j])
             cross = v1.cross(v2)
             area = 0.5 * cross
             A_total += area
@@ -163,45 +437,53 @@ class Polygon:
 
     def rotate(self, rad):
         """
-        Rotates the polygon around its centroid by a given angle.
+        Rotates the polygon around its centroid by a given angle. Only the angle changes, the
+        world vertices are transformed the next time they are read.
 
         Parameters:
         rad (float): The angle to rotate in radians.
         """
-        angle_rad = rad
-        for i in range(self.length):
-            # Shift the point so that center_point becomes the origin
-            new_point = (self.vertices[i][0] - self.centroid[0], self.vertices[i][1] - self.centroid[1])
-            new_point = (new_point[0] * cos(angle_rad) - new_point[1] * sin(angle_rad),
-                    new_point[0] * sin(angle_rad) + new_point[1] * cos(angle_rad))
-            # Reverse the shifting we have done
-            new_point = Vector2(new_point[0] + self.centroid[0], new_point[1] + self.centroid[1])
-            self.vertices[i] = new_point
+        if self.store is not None:
+            self.store.rotate(self.index, rad)
+            self._generation = -1
+            return
+        if rad:
+            self._angle = (self._angle + rad) % (2*pi)
+            self._moved = True
+            self._turned = True
+            self._aabb = None
         return
     
     def add(self, vector):
         """
-        Translates the polygon by a given vector.
+        Translates the polygon by a given vector. Only the centroid moves, the world vertices are
+        transformed the next time they are read.
 
         Parameters:
         vector (Vector2): The translation vector.
         """
-        for i in range(self.length):
-            self.vertices[i] += vector
-        self.centroid += vector
+        if self.store is not None:
+            self.store.translate(self.index, vector)
+            self._generation = -1
+            return
+        if vector:
+            self.centroid += vector
+            self._moved = True
+            self._aabb = None
         return
     
-    def draw(self, surface, color):
+    def draw(self, surface, color, alpha=1):
         """
         Draws the polygon and its centroid on a Pygame surface.
 
         Parameters:
         surface (pygame.Surface): The surface to draw on.
         color (tuple): RGB color value.
+        alpha (float, optional): Interpolation factor between the previous and the current physics step.
         """
-        centerpos = self.centroid
-        pygame.draw.polygon(surface,color,self.vertices)
-        pygame.draw.circle(surface,(194,86,63),self.center(),3)
+        offset = self.render_offset(alpha)
+        pygame.draw.polygon(surface,color,[vertex + offset for vertex in self.vertices])
+        pygame.draw.circle(surface,(194,86,63),self.centroid + offset,3)
         return
             
     def support(self, direction):
@@ -214,7 +496,28 @@ class Polygon:
         Returns:
         Vector2: The vertex furthest in the specified direction.
         """
-        return find_furthest(direction,self.vertices)
+        if not self.climbs:
+            return find_furthest(direction,self.vertices)
+        return self.vertices[self.support_index(direction)]
+
+    def support_index(self, direction):
+        """
+        Returns the index of the farthest vertex in a given direction (see support).
+
+        Parameters:
+        direction (Vector2): The direction vector.
+
+        Returns:
+        int: Index of the vertex furthest in the specified direction.
+        """
+        if not self.climbs:
+            return find_furthest_index(direction,self.vertices)
+        # One cached start per eighth of the directions (signs of x and y, steeper or flatter than 45°)
+        x, y = direction
+        sector = (x < 0) * 4 + (y < 0) * 2 + (abs(x) < abs(y))
+        index = climb_furthest(direction, self.vertices, self.support_cache[sector])
+        self.support_cache[sector] = index
+        return index
     
     def apply_force(self, force):
         """
@@ -225,7 +528,7 @@ class Polygon:
         """
         self.velocity += force / self.mass #this is the acceleration vector of the object --> you add an acceleration not a force
 
-class Circle:
+class Circle(Shape):
     """
     A class representing a circle used in 2D physics simulation.
 
@@ -235,24 +538,69 @@ class Circle:
         angular_velocity (float): The angular velocity of the circle.
         mass (float): The mass of the circle.
         velocity (Vector2): The linear velocity of the circle.
-        inertia (float): The moment of inertia of the circle.
+        inertia (float): The moment of inertia of the circle (cached).
+        area (float): The area of the circle.
+        aabb (tuple): World bounding box (min x, min y, max x, max y), cached until the circle moves.
+        bounding_circle (tuple): Enclosing circle in the local frame (x, y, radius).
+        kind (str): Shape type used to pick the collider ("circle").
 
     Methods:
         support(direction): Returns the furthest point in the given direction.
         calculate_inertia(): Computes and returns the moment of inertia.
+        edited(): Forgets the cached geometry after an edit of the shape.
         add(vector): Translates the circle by the given vector.
         rotate(rad): No-op for circles.
-        draw(surface, color): Draws the circle and its centroid.
+        draw(surface, color, alpha): Draws the circle and its centroid.
         move_center(position): Moves the circle to a new position.
         apply_force(force): Applies a force vector to the circle.
     """
-    def __init__(self, centre=Vector2(0,0), radius=10, mass=1):
-        self.radius = radius
-        self.centroid = centre
-        self.angular_velocity = 0
-        self.mass = mass
-        self.velocity = Vector2(0,0)
-        self.inertia = self.calculate_inertia()
+    kind = "circle"
+    rotation = (1.0, 0.0) # Circles never turn their vertices nor their bounding circle
+    __slots__ = ("_radius", "_unit_inertia", "_aabb")
+
+    def __init__(self, centre=None, radius=10, mass=1):
+        Shape.__init__(self, centre if centre is not None else Vector2(0,0), mass)
+        self._radius = radius
+        self.edited()
+
+    def edited(self):
+        """
+        Forgets the derived geometry after an edit of the shape itself (not after a move).
+        """
+        self._unit_inertia = None
+        self._aabb = None
+
+    @property
+    def radius(self):
+        return self._radius
+
+    @radius.setter
+    def radius(self, value):
+        self._radius = value
+        self.edited()
+
+    @property
+    def area(self):
+        return pi * self._radius ** 2
+
+    @property
+    def inertia(self):
+        # Cached for a unit mass, so that the mass can change without invalidating it
+        if self._unit_inertia is None:
+            self._unit_inertia = self.calculate_inertia() / self.mass if self.mass else 0
+        return self.mass * self._unit_inertia
+
+    @property
+    def aabb(self):
+        if self._aabb is None or self.store is not None:
+            x, y = self.centroid
+            r = self._radius
+            self._aabb = (x - r, y - r, x + r, y + r)
+        return self._aabb
+
+    @property
+    def bounding_circle(self):
+        return (0, 0, self._radius)
 
     def support(self, direction):
         """
@@ -286,6 +634,7 @@ class Circle:
         vector (Vector2): The translation vector.
         """
         self.centroid += vector
+        self._aabb = None
         return
     
     def rotate(self, rad):
@@ -294,16 +643,18 @@ class Circle:
         """
         return
     
-    def draw(self, surface, color):
+    def draw(self, surface, color, alpha=1):
         """
         Draws the circle and its centroid on a Pygame surface.
 
         Parameters:
         surface (pygame.Surface): The surface to draw on.
         color (tuple): RGB color value.
+        alpha (float, optional): Interpolation factor between the previous and the current physics step.
         """
-        pygame.draw.circle(surface,color,self.centroid,self.radius)
-        pygame.draw.circle(surface,(0,255,0),self.centroid,3)
+        center = self.centroid + self.render_offset(alpha)
+        pygame.draw.circle(surface,color,center,self.radius)
+        pygame.draw.circle(surface,(0,255,0),center,3)
         return
 
     def move_center(self, position):
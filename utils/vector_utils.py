@@ -14,7 +14,7 @@ Features include:
 
 Last Updated: May 2025
 Python Version: 3.12+
-Dependencies: math, utils.maths_utils, pygame.math, pygame, random
+Dependencies: math, utils.maths_utils, pygame.math, pygame, random, objects.object
 """
 
 from math import degrees, atan2, radians, cos, sin
@@ -22,6 +22,7 @@ from utils.math_utils import newton_to_force
 import pygame
 from pygame.math import Vector2
 import random 
+from objects.object import NO_VECTOR
 
 
 
@@ -63,8 +64,8 @@ def update_vector(obj, coords = Vector2(0,0), angle = 0.0) :
         coords (Vector2) : coordinates of the vector
         angle (int/float) : angle of the vector
     """
-    obj.applied_coords[0] = round(coords[0])
-    obj.applied_coords[1] = round(coords[1])
+    applied_coords = (round(coords[0]), round(coords[1]))
+    obj.applied_coords = applied_coords if any(applied_coords) else NO_VECTOR
     obj.applied_angle = angle
 
 
@@ -77,8 +78,8 @@ def update_mouse(obj, position = Vector2(0,0)) :
         obj (Object) : reference of the object to update (in physics_engine.objects)
         position (Vector2) : coordinates of the mouse
     """
-    obj.mouse[0] = round(position[0])
-    obj.mouse[1] = round(position[1])
+    mouse = (round(position[0]), round(position[1]))
+    obj.mouse = mouse if any(mouse) else NO_VECTOR
 
 
 
@@ -90,8 +91,7 @@ def reset_level_vectors(list_obj) :
         list_obj (we need to give physics_engine.objects): list of all the initialized objects of a scene
     """
     for obj in list_obj :
-        obj.applied_coords[0] = 0
-        obj.applied_coords[1] = 0
+        obj.applied_coords = NO_VECTOR
         obj.applied_angle = 0
 
 
@@ -253,7 +253,7 @@ def lines_and_positions(objects_list, screen, game_state="running", realistic =
     """
     if game_state == "paused":
         for obj in objects_list:
-            if (obj.applied_coords != [0, 0]) and obj.grabable == True and obj.playable == True:
+            if (obj.applied_coords != NO_VECTOR) and obj.grabable == True and obj.playable == True:
                 # Recalculate positions on each frame, allowing dynamic updates
                 computes_positions(obj, realistic)
 